@@ -1,6 +1,17 @@
 import bpy
+import bpy.utils.previews
+import numpy as np
 import os
-from mathutils import Vector
+import re
+import ast
+import struct
+import time
+import hashlib
+import math
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from mathutils import Matrix, Vector
 from bpy.props import (
     StringProperty,
     CollectionProperty,
@@ -15,6 +26,12 @@ from bpy.types import (
     PropertyGroup,
     UIList
 )
+from .library_index import LibraryIndex, INDEXED_DATABLOCKS, classify_asset
+from .blend_reader import BlendFileError, read_blend_info
+from .scanner import LibraryScan
+from .search_index import SearchIndex
+from .local_cache import LocalCache
+from . import diagnostics, geometry_cache, texture_store, thumbnails
 
 # Constantes
 SUPPORTED_ASSET_TYPES = {
@@ -25,14 +42,483 @@ SUPPORTED_ASSET_TYPES = {
 }
 FILE_EXTENSION = '.blend'
 
+# Propiedad con la disposición relativa de los objetos de un asset (nombres + offsets
+# empaquetados) y la antigua, un str() de un dict de Vectors en cada objeto
+LAYOUT_PROPERTY = "asset_layout"
+LEGACY_LAYOUT_PROPERTY = "relative_positions"
+LEGACY_LAYOUT_PATTERN = re.compile(
+    r"""(?P<quote>['"])(?P<name>(?:\\.|(?!(?P=quote)).)*)(?P=quote)\s*:\s*Vector\(\((?P<co>[^)]*)\)\)"""
+)
+
+# Icono de la lista para cada tipo de asset detectado al escanear
+ASSET_TYPE_ICONS = {
+    'MATERIAL': 'MATERIAL',
+    'NODES': 'NODETREE',
+    'MESH': 'OBJECT_DATA',
+}
+DEFAULT_ASSET_ICON = 'OBJECT_DATA'
+
+# Categoría del índice para cada tipo de datablock guardado
+ID_TYPE_CATEGORIES = {
+    'OBJECT': 'objects',
+    'MESH': 'meshes',
+    'MATERIAL': 'materials',
+    'NODETREE': 'node_groups',
+    'IMAGE': 'images',
+    'COLLECTION': 'collections',
+}
+
+# Escaneo en segundo plano: a partir de cuántos archivos pendientes se usa y cada cuánto
+# se vuelcan sus resultados a la lista
+SYNC_SCAN_LIMIT = 16
+SCAN_BATCH_SIZE = 200
+SCAN_TIMER_INTERVAL = 0.1
+# Cada cuántos segundos se comprueba si otros han cambiado los archivos de la biblioteca
+WATCH_INTERVAL = 5.0
+
+# Colecciones de bpy.data que se deduplican al cargar, en orden de dependencia
+DEDUP_COLLECTIONS = ('images', 'node_groups', 'materials')
+# Colecciones en las que se buscan datos huérfanos tras una carga, de usuario a dependencia
+LOADED_COLLECTIONS = ('objects', 'collections', 'meshes', 'materials', 'node_groups', 'images')
+# Tipos de objeto que admiten modificadores de geometry nodes
+GEOMETRY_NODES_OBJECT_TYPES = {'MESH', 'CURVE', 'CURVES', 'POINTCLOUD', 'VOLUME', 'FONT', 'SURFACE', 'GREASEPENCIL'}
+# Propiedades RNA que no afectan al resultado de un nodo y se ignoran en la huella
+FINGERPRINT_IGNORED_PROPS = {
+    'rna_type', 'name', 'label', 'location', 'location_absolute', 'width', 'height', 'dimensions',
+    'select', 'hide', 'show_options', 'show_preview', 'show_texture', 'color', 'use_custom_color',
+    'parent', 'is_active_output', 'warning_propagation', 'use_fake_user', 'is_evaluated',
+    'is_editmode', 'is_runtime_data', 'is_missing', 'is_embedded_data', 'is_library_indirect',
+    'session_uid', 'users', 'tag', 'name_full', 'id_type', 'library_weak_reference',
+    'original', 'use_extra_user', 'pixels', 'bindcode', 'has_data', 'is_dirty',
+    # Los sockets se comparan aparte; las previews y los datos empaquetados no son contenido comparable
+    'inputs', 'outputs', 'internal_links', 'preview', 'packed_file', 'packed_files',
+    'texture_paint_images', 'texture_paint_slots',
+}
+# Profundidad máxima al recorrer structs anidados (ColorRamp, CurveMapping, ImageUser...)
+FINGERPRINT_MAX_DEPTH = 4
+# Sufijo numérico que Blender añade a los nombres repetidos (Material.001)
+NAME_SUFFIX_PATTERN = re.compile(r'\.\d{3,}$')
+
+# Colección oculta con los datos de los assets cargados como instancias y propiedades que
+# identifican el asset (archivo, modo de carga y mtime) de cada colección de origen
+INSTANCE_ROOT_COLLECTION = "Asset Instances"
+INSTANCE_SOURCE_PROPERTY = "asset_source"
+INSTANCE_MODE_PROPERTY = "asset_load_mode"
+INSTANCE_MTIME_PROPERTY = "asset_mtime"
+
+# Miniaturas: cuántas se mantienen cargadas como previews, cuántos assets se preparan en
+# cada paso del trabajo en segundo plano y cada cuánto se ejecuta
+PREVIEW_CACHE_SIZE = 256
+THUMBNAIL_BATCH_SIZE = 4
+THUMBNAIL_TIMER_INTERVAL = 0.2
+# Carpeta de la caché local por defecto, dentro de la carpeta temporal del sistema
+LOCAL_CACHE_DIRNAME = "asset_manager_cache"
+
+# Operaciones que muestra el panel de diagnóstico (las de mayor tiempo total)
+DIAGNOSTICS_PANEL_ROWS = 12
+
+# Fracción mínima de bpy.data.objects seleccionada para leer las matrices de todos los
+# objetos de una vez con foreach_get en lugar de objeto a objeto
+BULK_GATHER_RATIO = 0.25
+
+_library_indexes = {}
+_search_indexes = {}
+_image_hashes = {}
+_active_scan = None
+# Por biblioteca, {ruta: (mtime, tamaño)} de los archivos tal y como se vieron por última vez
+_library_snapshots = {}
+_local_caches = {}
+_previews = None
+_preview_order = OrderedDict()
+_thumbnail_requests = OrderedDict()
+_thumbnail_jobs = {}
+_thumbnail_failed = set()
+_thumbnail_executor = None
+
+def _library_key(library_path):
+    return os.path.normcase(os.path.abspath(library_path))
+
+def get_library_index(library_path):
+    """Devuelve el índice persistente de la biblioteca, abriéndolo una sola vez por sesión"""
+    key = _library_key(library_path)
+    index = _library_indexes.get(key)
+    if index is None:
+        index = _library_indexes[key] = LibraryIndex(library_path)
+    return index
+
+def get_local_cache(library_props):
+    """Caché local de lectura de la biblioteca, o None si no está activada"""
+    if not library_props.use_local_cache or not library_props.library_path:
+        return None
+    if library_props.local_cache_path:
+        cache_root = bpy.path.abspath(library_props.local_cache_path)
+    else:
+        cache_root = os.path.join(tempfile.gettempdir(), LOCAL_CACHE_DIRNAME)
+    key = (os.path.normcase(os.path.abspath(cache_root)), _library_key(library_props.library_path))
+    cache = _local_caches.get(key)
+    if cache is None:
+        cache = _local_caches[key] = LocalCache(cache_root, library_props.library_path, 0)
+    cache.max_bytes = library_props.local_cache_size * 1024 * 1024
+    return cache
+
+def prefetch_assets(library_props, filepaths):
+    """Copia por adelantado a la caché local los archivos que necesitará la carga"""
+    cache = get_local_cache(library_props)
+    # Los assets vinculados se leen siempre desde la biblioteca
+    if cache is None or (library_props.link_assets and library_props.load_mode == 'COLLECTION'):
+        return
+    paths = list(filepaths)
+    if library_props.load_mode == 'MESH':
+        paths += [geometry_cache.geometry_path(library_props.library_path, path) for path in filepaths]
+    cache.prefetch(paths)
+
+def get_search_index(library_props):
+    """Devuelve el índice de búsqueda en memoria de la lista de assets
+
+    Hay uno por biblioteca y escena. Se construye a partir de los AssetItem la primera vez
+    que se pide (por ejemplo tras abrir un .blend que ya guardaba la lista) y después lo
+    mantienen al día los métodos que añaden y quitan assets de la lista. Los cambios de la
+    colección que no pasan por ellos (abrir otro archivo, deshacer) lo descartan.
+    """
+    key = (_library_key(library_props.library_path), library_props.id_data.name)
+    search_index = _search_indexes.get(key)
+    if search_index is None:
+        # La escena ha cambiado de biblioteca: el índice de la anterior ya no se usa
+        for stale in [other for other in _search_indexes if other[1] == key[1]]:
+            del _search_indexes[stale]
+        search_index = _search_indexes[key] = SearchIndex()
+        for item in library_props.assets:
+            search_index.add(item.filepath, item.name, item.asset_type, item.datablock_names.split('\n'))
+    return search_index
+
+@bpy.app.handlers.persistent
+def _clear_search_indexes(*args):
+    """Al abrir otro .blend o deshacer, las listas ya no son las indexadas: se descartan los índices"""
+    _search_indexes.clear()
+    ASSET_LIBRARY_UL_items._filter_cache = None
+
+def filter_asset_scores(library_props):
+    """Puntuación de los assets que pasan el filtro actual, o None si no hay filtro"""
+    asset_type = None if library_props.type_filter == 'ALL' else library_props.type_filter
+    if not library_props.search_term.strip() and asset_type is None:
+        return None
+    return get_search_index(library_props).search(library_props.search_term, asset_type)
+
+def get_active_scan(library_path=None):
+    """Devuelve el escaneo en segundo plano en curso (opcionalmente solo si es de esa biblioteca)"""
+    if _active_scan is not None and (library_path is None or _active_scan.library_path == library_path):
+        return _active_scan
+    return None
+
+def _scan_worker(filepath):
+    with diagnostics.span("scan.inspect_file"):
+        info = read_blend_info(filepath)
+        diagnostics.count(files=1, bytes_read=info.bytes_read)
+        return info.datablocks
+
+def start_library_scan(scene, library_path, pending):
+    """Inspecciona en segundo plano los archivos pendientes y los va añadiendo a la lista
+
+    Si ya hay un escaneo de la misma lista en curso (por ejemplo al desplegar varias
+    categorías seguidas) los archivos se añaden a él.
+    """
+    global _active_scan
+    scan = get_active_scan(library_path)
+    if scan is not None and scan.owner == scene.name and not scan.finished:
+        scan.extend(pending)
+        return
+    cancel_library_scan()
+    _active_scan = LibraryScan(library_path, pending, _scan_worker, owner=scene.name)
+    bpy.app.timers.register(_library_scan_timer, first_interval=SCAN_TIMER_INTERVAL)
+
+def cancel_library_scan():
+    global _active_scan
+    if _active_scan is not None:
+        _active_scan.cancel()
+        _active_scan = None
+    if bpy.app.timers.is_registered(_library_scan_timer):
+        bpy.app.timers.unregister(_library_scan_timer)
+
+def scan_folder(library_path, folder=''):
+    """Lista una carpeta de la biblioteca sin entrar en sus subcarpetas
+
+    ``folder`` es la ruta relativa a la biblioteca separada por '/' ('' para la raíz).
+    Devuelve ({ruta: (mtime, tamaño)} de sus assets, [(ruta relativa, nombre, mtime)] de
+    sus subcarpetas). Las carpetas ocultas, como la del índice, se ignoran.
+    """
+    directory = os.path.join(library_path, *folder.split('/')) if folder else library_path
+    files = {}
+    subfolders = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.name.startswith('.'):
+                    relpath = f"{folder}/{entry.name}" if folder else entry.name
+                    subfolders.append((relpath, entry.name, entry.stat().st_mtime_ns))
+            elif entry.name.endswith(FILE_EXTENSION) and entry.is_file():
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    subfolders.sort(key=lambda subfolder: subfolder[1].lower())
+    return files, subfolders
+
+def scan_library_files(library_path, folders=('',)):
+    """Devuelve {ruta: (mtime, tamaño)} de los archivos de asset de las carpetas indicadas"""
+    files = {}
+    for folder in folders:
+        try:
+            files.update(scan_folder(library_path, folder)[0])
+        except FileNotFoundError:
+            continue
+    return files
+
+def folder_of(library_path, filepath):
+    """Categoría (carpeta relativa a la biblioteca, separada por '/') de un archivo"""
+    folder = os.path.relpath(os.path.dirname(os.path.abspath(filepath)), os.path.abspath(library_path))
+    return '' if folder == os.curdir else folder.replace(os.sep, '/')
+
+def get_folder_summary(index, library_path, folder, mtime):
+    """(número de assets, si tiene subcarpetas) de una carpeta, desde el índice si está al día"""
+    summary = index.folder_summary(folder, mtime)
+    if summary is None:
+        files, subfolders = scan_folder(library_path, folder)
+        summary = (len(files), bool(subfolders))
+        index.set_folder_summary(folder, mtime, *summary)
+    return summary
+
+def _tag_redraw_asset_panels():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def _library_scan_timer():
+    """Vuelca por lotes los resultados del escaneo en segundo plano a la lista de assets"""
+    global _active_scan
+    scan = _active_scan
+    if scan is None:
+        return None
+    
+    scene = bpy.data.scenes.get(scan.owner)
+    library_props = scene.asset_library if scene else None
+    if library_props is None or library_props.library_path != scan.library_path:
+        cancel_library_scan()
+        return None
+    
+    results = scan.drain(SCAN_BATCH_SIZE)
+    if results:
+        index = get_library_index(scan.library_path)
+        listed = library_props.listed_folders()
+        snapshot = _library_snapshots.setdefault(_library_key(scan.library_path), {})
+        for (filepath, mtime, size), datablocks, error in results:
+            if error is None:
+                asset_type = classify_asset(datablocks)
+            else:
+                asset_type, datablocks = AssetManager.inspect_asset_bpy(filepath)
+            entry = index.upsert(filepath, mtime, size, asset_type, datablocks)
+            snapshot[filepath] = (mtime, size)
+            # La categoría puede haberse plegado mientras se escaneaba
+            if folder_of(scan.library_path, filepath) in listed:
+                library_props.set_asset_item(filepath, entry)
+        index.commit()
+    
+    if scan.finished:
+        _active_scan = None
+        _tag_redraw_asset_panels()
+        return None
+    if results:
+        _tag_redraw_asset_panels()
+    return SCAN_TIMER_INTERVAL
+
+def _library_watch_timer():
+    """Aplica a las listas abiertas los archivos que otros han añadido, cambiado o borrado
+
+    Solo compara un os.scandir con lo visto la última vez; los archivos afectados se
+    actualizan uno a uno sin reconstruir la lista.
+    """
+    libraries = {}
+    for scene in bpy.data.scenes:
+        library_props = scene.asset_library
+        if library_props.watch_library and library_props.library_path:
+            libraries.setdefault(_library_key(library_props.library_path), []).append((scene, library_props))
+    
+    for key, users in libraries.items():
+        library_path = users[0][1].library_path
+        snapshot = _library_snapshots.get(key)
+        if snapshot is None or get_active_scan(library_path) is not None or not os.path.isdir(library_path):
+            continue
+        try:
+            folders = set().union(*(library_props.listed_folders() for _, library_props in users))
+            current = scan_library_files(library_path, folders)
+            changed = [(path, *stat) for path, stat in current.items() if snapshot.get(path) != stat]
+            removed = [path for path in snapshot if path not in current]
+            if not changed and not removed:
+                continue
+            
+            scene, library_props = users[0]
+            if library_props.background_scan and len(changed) > SYNC_SCAN_LIMIT and len(users) == 1:
+                library_props.refresh_asset_files(removed)
+                start_library_scan(scene, library_path, changed)
+            else:
+                paths = [path for path, _, _ in changed] + removed
+                for _, library_props in users:
+                    listed = library_props.listed_folders()
+                    library_props.refresh_asset_files(
+                        [path for path in paths if folder_of(library_path, path) in listed])
+            _tag_redraw_asset_panels()
+        except Exception as e:
+            print(f"Asset Manager: error al comprobar los cambios de '{library_path}': {e}")
+    return WATCH_INTERVAL
+
+def get_preview_icon(library_path, filepath):
+    """icon_id de la miniatura de un asset
+
+    Solo se piden las de las filas que se dibujan y se mantienen como mucho
+    PREVIEW_CACHE_SIZE cargadas, liberando las usadas hace más tiempo.
+    """
+    global _previews
+    if _previews is None:
+        _previews = bpy.utils.previews.new()
+    preview = _previews.get(filepath)
+    if preview is None:
+        preview = _previews.load(filepath, thumbnails.thumbnail_path(library_path, filepath), 'IMAGE')
+    _preview_order[filepath] = None
+    _preview_order.move_to_end(filepath)
+    while len(_preview_order) > PREVIEW_CACHE_SIZE:
+        oldest, _ = _preview_order.popitem(last=False)
+        if oldest in _previews:
+            del _previews[oldest]
+    return preview.icon_id
+
+def asset_preview_icon(library_props, item, generate=True):
+    """icon_id de la miniatura de un asset de la lista, o 0 si aún no la tiene
+
+    Con ``generate`` se encola la generación de las que faltan (nunca se generan al
+    dibujar); sin él solo se muestran las que ya existen.
+    """
+    if not library_props.library_path:
+        return 0
+    if item.has_preview:
+        return get_preview_icon(library_props.library_path, item.filepath)
+    if generate:
+        request_thumbnail(library_props.library_path, item.filepath, get_local_cache(library_props))
+    return 0
+
+def release_preview(filepath):
+    _preview_order.pop(filepath, None)
+    if _previews is not None and filepath in _previews:
+        del _previews[filepath]
+
+def request_thumbnail(library_path, filepath, cache=None):
+    """Pide la miniatura de un asset al trabajo en segundo plano (se puede llamar al dibujar)
+
+    Con ``cache`` (LocalCache) el asset se lee desde la caché local.
+    """
+    if filepath in _thumbnail_requests or filepath in _thumbnail_jobs or filepath in _thumbnail_failed:
+        return
+    _thumbnail_requests[filepath] = (library_path, cache)
+    if cache is not None:
+        # La copia se hace en segundo plano mientras la petición espera su turno
+        cache.prefetch([filepath])
+    if not bpy.app.timers.is_registered(_thumbnail_timer):
+        bpy.app.timers.register(_thumbnail_timer, first_interval=THUMBNAIL_TIMER_INTERVAL)
+
+def submit_thumbnail(library_path, filepath, geometry):
+    """Rasteriza y guarda la miniatura en un hilo de trabajo a partir de la geometría ya leída"""
+    global _thumbnail_executor
+    if _thumbnail_executor is None:
+        _thumbnail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="asset_thumbnails")
+    path = thumbnails.thumbnail_path(library_path, filepath)
+    _thumbnail_failed.discard(filepath)
+    _thumbnail_requests.pop(filepath, None)
+    _thumbnail_jobs[filepath] = _thumbnail_executor.submit(thumbnails.generate_thumbnail, path, *geometry)
+    if not bpy.app.timers.is_registered(_thumbnail_timer):
+        bpy.app.timers.register(_thumbnail_timer, first_interval=THUMBNAIL_TIMER_INTERVAL)
+
+def _set_has_preview(filepath, value):
+    for scene in bpy.data.scenes:
+        library_props = scene.asset_library
+        if filepath in get_search_index(library_props):
+            i = library_props.find_asset_item(filepath)
+            if i >= 0:
+                library_props.assets[i].has_preview = value
+
+def _thumbnail_timer():
+    """Recoge las miniaturas terminadas y prepara la geometría del siguiente lote de pedidas"""
+    finished = False
+    for filepath, future in list(_thumbnail_jobs.items()):
+        if not future.done():
+            continue
+        del _thumbnail_jobs[filepath]
+        try:
+            path = future.result()
+        except Exception as e:
+            print(f"Asset Manager: no se pudo generar la miniatura de '{filepath}': {e}")
+            path = None
+        if path is None:
+            _thumbnail_failed.add(filepath)
+            continue
+        release_preview(filepath)
+        _set_has_preview(filepath, True)
+        finished = True
+    
+    for _ in range(min(THUMBNAIL_BATCH_SIZE, len(_thumbnail_requests))):
+        filepath, (library_path, cache) = _thumbnail_requests.popitem(last=False)
+        try:
+            geometry = AssetManager.read_thumbnail_geometry(library_path, filepath, cache)
+        except Exception as e:
+            print(f"Asset Manager: no se pudo leer la geometría de '{filepath}': {e}")
+            geometry = None
+        if geometry is None:
+            _thumbnail_failed.add(filepath)
+            continue
+        submit_thumbnail(library_path, filepath, geometry)
+    
+    if finished:
+        _tag_redraw_asset_panels()
+    if _thumbnail_requests or _thumbnail_jobs:
+        return THUMBNAIL_TIMER_INTERVAL
+    return None
+
+def stop_thumbnail_jobs():
+    global _previews, _thumbnail_executor
+    if bpy.app.timers.is_registered(_thumbnail_timer):
+        bpy.app.timers.unregister(_thumbnail_timer)
+    _thumbnail_requests.clear()
+    _thumbnail_jobs.clear()
+    _thumbnail_failed.clear()
+    if _thumbnail_executor is not None:
+        _thumbnail_executor.shutdown(wait=False, cancel_futures=True)
+        _thumbnail_executor = None
+    if _previews is not None:
+        bpy.utils.previews.remove(_previews)
+        _previews = None
+    _preview_order.clear()
+
 class AssetItem(PropertyGroup):
     """Clase para almacenar información de un asset individual"""
     name: StringProperty(name="Nombre", description="Nombre del asset")
     filepath: StringProperty(name="Ruta del archivo", description="Ruta al archivo .blend del asset")
+    category: StringProperty(name="Categoría", description="Carpeta del asset relativa a la biblioteca")
+    has_preview: BoolProperty(name="Tiene miniatura", description="Indica si la miniatura del asset ya está generada", default=False)
     asset_type: StringProperty(name="Tipo de Asset", description="Tipo del asset (mesh, material, etc.)", default="UNKNOWN")
     is_editing: BoolProperty(name="Editando", description="Indica si el asset está siendo editado", default=False)
     edit_name: StringProperty(name="Nombre en edición", description="Nombre temporal durante la edición")
-    is_selected: BoolProperty(name="Seleccionado", description="Indica si el asset está seleccionado para operaciones en masa", default=False)
+    is_selected: BoolProperty(
+        name="Seleccionado",
+        description="Indica si el asset está seleccionado para operaciones en masa",
+        default=False,
+        update=lambda self, context: prefetch_assets(context.scene.asset_library, [self.filepath]) if self.is_selected else None
+    )
+    datablock_names: StringProperty(name="Datablocks", description="Nombres de los datablocks del asset, uno por línea")
+
+class AssetCategory(PropertyGroup):
+    """Subcarpeta de la biblioteca; sus assets solo se listan mientras está desplegada"""
+    name: StringProperty(name="Nombre", description="Nombre de la carpeta")
+    path: StringProperty(name="Ruta", description="Ruta de la carpeta relativa a la biblioteca")
+    depth: IntProperty(name="Profundidad", description="Nivel de la carpeta dentro de la biblioteca")
+    is_expanded: BoolProperty(name="Desplegada", description="Indica si los assets de la carpeta están listados", default=False)
+    asset_count: IntProperty(name="Assets", description="Número de assets directamente en la carpeta")
+    has_children: BoolProperty(name="Tiene subcarpetas", description="Indica si la carpeta contiene otras categorías", default=False)
 
 class ASSET_LIBRARY_Properties(PropertyGroup):
     """Clase principal para gestionar la biblioteca de assets"""
@@ -45,8 +531,37 @@ class ASSET_LIBRARY_Properties(PropertyGroup):
     )
     
     assets: CollectionProperty(type=AssetItem)
-    active_asset_index: IntProperty()
-    search_term: StringProperty(name="Buscar", description="Buscar assets por nombre", default="")
+    active_asset_index: IntProperty(update=lambda self, context: self.prefetch_active_asset())
+    categories: CollectionProperty(type=AssetCategory)
+    active_category_index: IntProperty()
+    search_term: StringProperty(
+        name="Buscar",
+        description="Buscar assets por nombre o por los datablocks que contienen",
+        default="",
+        options={'TEXTEDIT_UPDATE'},
+        update=lambda self, context: _tag_redraw_asset_panels()
+    )
+    type_filter: EnumProperty(
+        name="Tipo",
+        description="Mostrar solo los assets de un tipo",
+        items=[
+            ('ALL', 'Todos', 'Mostrar todos los assets', 'ASSET_MANAGER', 0),
+            ('MESH', 'Mesh', 'Solo assets de objetos', 'OBJECT_DATA', 1),
+            ('MATERIAL', 'Material', 'Solo assets con materiales', 'MATERIAL', 2),
+            ('NODES', 'Geometry Nodes', 'Solo assets con node groups', 'NODETREE', 3),
+            ('UNKNOWN', 'Desconocido', 'Solo assets sin tipo reconocido', 'QUESTION', 4),
+        ],
+        default='ALL'
+    )
+    display_mode: EnumProperty(
+        name="Vista",
+        description="Mostrar los assets en lista o como cuadrícula de miniaturas",
+        items=[
+            ('LIST', 'Lista', 'Mostrar los assets en una lista', 'LINENUMBERS_OFF', 0),
+            ('GRID', 'Miniaturas', 'Mostrar las miniaturas de los assets', 'IMGDISPLAY', 1),
+        ],
+        default='LIST'
+    )
     select_all: BoolProperty(
         name="Seleccionar Todo",
         description="Seleccionar/Deseleccionar todos los assets",
@@ -77,141 +592,1134 @@ class ASSET_LIBRARY_Properties(PropertyGroup):
     )
     
     spacing: FloatProperty(name="Spacing", description="Espacio entre assets cuando se organizan en fila", default=3.0, min=0.0, soft_max=10.0)
+    use_instancing: BoolProperty(
+        name="Instanciar",
+        description="Cargar los datos de cada asset una sola vez en una colección oculta y colocar instancias de colección",
+        default=False
+    )
+    link_assets: BoolProperty(
+        name="Vincular",
+        description="Vincular los objetos desde el archivo del asset en lugar de copiarlos al archivo actual (modo Collection)",
+        default=False
+    )
+    use_overrides: BoolProperty(
+        name="Overrides",
+        description="Crear overrides de biblioteca de los objetos vinculados para poder moverlos; sin ellos se colocan como instancias",
+        default=True
+    )
+    instance_count: IntProperty(
+        name="Copias",
+        description="Número de instancias de cada asset (en rejilla si se organizan en fila)",
+        default=1,
+        min=1,
+        soft_max=100
+    )
     force_mode: BoolProperty(name="Force Mode", description="Sobrescribir materiales/modificadores existentes", default=False)
+    use_texture_store: BoolProperty(
+        name="Almacén de texturas",
+        description="Guardar cada textura una sola vez en un almacén compartido de la biblioteca en lugar de empaquetarla en cada asset",
+        default=False
+    )
+    compress_assets: BoolProperty(
+        name="Comprimir",
+        description="Guardar los assets comprimidos (archivos más pequeños, pero más lentos de guardar y escanear)",
+        default=True
+    )
+    write_geometry_cache: BoolProperty(
+        name="Caché de geometría",
+        description="Guardar también la geometría en bruto de las mallas para cargarlas en modo Mesh sin abrir el .blend",
+        default=False
+    )
+    watch_library: BoolProperty(
+        name="Vigilar carpeta",
+        description="Detectar periódicamente los assets que otros añaden, modifican o eliminan en la carpeta",
+        default=True
+    )
+    background_scan: BoolProperty(
+        name="Escaneo en segundo plano",
+        description="Inspeccionar los archivos nuevos o modificados sin bloquear Blender",
+        default=True
+    )
+    use_local_cache: BoolProperty(
+        name="Caché local",
+        description="Copiar a una carpeta local los archivos de la biblioteca la primera vez que se leen (para bibliotecas en red)",
+        default=False
+    )
+    local_cache_path: StringProperty(
+        name="Carpeta de caché",
+        description="Carpeta local de la caché (vacío: carpeta temporal del sistema)",
+        default="",
+        subtype='DIR_PATH'
+    )
+    local_cache_size: IntProperty(
+        name="Tamaño máximo (MB)",
+        description="Al superarlo se borran las copias usadas hace más tiempo",
+        default=4096,
+        min=64
+    )
+    # El registro de diagnóstico es global (no depende de la escena) y no se guarda en el .blend
+    record_diagnostics: BoolProperty(
+        name="Registrar tiempos",
+        description="Medir la duración, archivos abiertos y bytes leídos de cada operación del addon",
+        get=lambda self: diagnostics.recorder.enabled,
+        set=lambda self, value: setattr(diagnostics.recorder, "enabled", value)
+    )
+    
+    def prefetch_active_asset(self):
+        if 0 <= self.active_asset_index < len(self.assets):
+            prefetch_assets(self, [self.assets[self.active_asset_index].filepath])
     
     def update_all_selections(self, context):
+        visible = filter_asset_scores(self)
         for asset in self.assets:
-            asset.is_selected = self.select_all
+            if visible is None or asset.filepath in visible:
+                asset.is_selected = self.select_all
     
     def load_assets(self, context):
-        """Carga los assets desde el directorio"""
+        """Carga los assets desde el directorio
+
+        Se listan los assets de la raíz y de las categorías desplegadas; el resto de
+        subcarpetas solo aparecen como categorías con su número de assets. Solo se
+        inspeccionan los archivos cuyo mtime o tamaño no coincide con el índice persistente
+        de la biblioteca; el resto se lista directamente desde el índice. Si hay muchos
+        archivos pendientes se inspeccionan en segundo plano.
+        """
+        cancel_library_scan()
+        expanded = sorted((category.path for category in self.categories if category.is_expanded),
+                          key=lambda path: path.count('/'))
+        get_search_index(self).clear()
         self.assets.clear()
+        self.categories.clear()
+        thumbnails.forget_listings()
         
         if not self.library_path or not os.path.exists(self.library_path):
             return
 
         try:
-            for file in os.listdir(self.library_path):
-                if file.endswith(FILE_EXTENSION):
-                    if self.search_term and self.search_term.lower() not in file.lower():
-                        continue
-                        
-                    item = self.assets.add()
-                    item.name = os.path.splitext(file)[0]
-                    item.filepath = os.path.join(self.library_path, file)
-                    
-                    try:
-                        with bpy.data.libraries.load(item.filepath) as (data_from, data_to):
-                            if data_from.materials:
-                                item.asset_type = "MATERIAL"
-                            elif any(mod.type == 'NODES' for obj in data_from.objects for mod in obj.modifiers):
-                                item.asset_type = "NODES"
-                            elif data_from.objects:
-                                item.asset_type = "MESH"
-                            else:
-                                item.asset_type = "UNKNOWN"
-                    except:
-                        item.asset_type = "UNKNOWN"
+            with diagnostics.span("library.load_assets"):
+                index = get_library_index(self.library_path)
+                _library_snapshots[_library_key(self.library_path)] = {}
+                pending = self.list_folder('', 0, 0, index)
+                for path in expanded:
+                    i = self.find_category(path)
+                    if i >= 0:
+                        pending += self._expand_category(i, index)
+                self.inspect_pending(context, index, pending)
+                index.commit()
                         
         except Exception as e:
-            self.report({'ERROR'}, f"Error al cargar los assets: {str(e)}")
+            print(f"Error al cargar los assets: {str(e)}")
+    
+    def list_folder(self, folder, depth, insert_at, index):
+        """Lista los assets de una carpeta y añade sus subcarpetas como categorías en ``insert_at``
+
+        Devuelve los archivos que el índice no tiene al día, para inspect_pending.
+        """
+        files, subfolders = scan_folder(self.library_path, folder)
+        # Los pendientes entran en la instantánea del vigilante cuando se inspeccionen; si el
+        # escaneo se cancela antes, el vigilante los verá como cambiados
+        snapshot = _library_snapshots.setdefault(_library_key(self.library_path), {})
+        pending = []
+        for filepath, (mtime, size) in files.items():
+            cached = index.lookup(filepath, mtime, size)
+            if cached is None:
+                pending.append((filepath, mtime, size))
+            else:
+                snapshot[filepath] = (mtime, size)
+                self.add_asset_item(filepath, cached)
+        index.prune(files, folder)
+        
+        for offset, (path, name, mtime) in enumerate(subfolders):
+            asset_count, has_children = get_folder_summary(index, self.library_path, path, mtime)
+            category = self.categories.add()
+            category.name = name
+            category.path = path
+            category.depth = depth
+            category.asset_count = asset_count
+            category.has_children = has_children
+            self.categories.move(len(self.categories) - 1, insert_at + offset)
+        return pending
+    
+    def inspect_pending(self, context, index, pending):
+        """Inspecciona los archivos pendientes, en segundo plano si son muchos"""
+        if self.background_scan and len(pending) > SYNC_SCAN_LIMIT:
+            start_library_scan(context.scene, self.library_path, pending)
+        else:
+            snapshot = _library_snapshots.setdefault(_library_key(self.library_path), {})
+            for filepath, mtime, size in pending:
+                asset_type, datablocks = AssetManager.inspect_asset(filepath)
+                self.set_asset_item(filepath, index.upsert(filepath, mtime, size, asset_type, datablocks))
+                snapshot[filepath] = (mtime, size)
+    
+    def listed_folders(self):
+        """Carpetas cuyos assets están en la lista: la raíz y las categorías desplegadas"""
+        return {''} | {category.path for category in self.categories if category.is_expanded}
+    
+    def find_category(self, path):
+        for i, category in enumerate(self.categories):
+            if category.path == path:
+                return i
+        return -1
+    
+    def _expand_category(self, i, index):
+        category = self.categories[i]
+        category.is_expanded = True
+        return self.list_folder(category.path, category.depth + 1, i + 1, index)
+    
+    def expand_category(self, context, i):
+        """Lista los assets de la categoría y muestra sus subcarpetas"""
+        index = get_library_index(self.library_path)
+        self.inspect_pending(context, index, self._expand_category(i, index))
+        index.commit()
+    
+    def collapse_category(self, i):
+        """Oculta las subcarpetas de la categoría y quita de la lista sus assets y los de estas"""
+        category = self.categories[i]
+        category.is_expanded = False
+        path, depth = category.path, category.depth
+        prefix = path + '/'
+        while i + 1 < len(self.categories) and self.categories[i + 1].depth > depth:
+            self.categories.remove(i + 1)
+        
+        search_index = get_search_index(self)
+        snapshot = _library_snapshots.get(_library_key(self.library_path), {})
+        for j in reversed(range(len(self.assets))):
+            item = self.assets[j]
+            if item.category == path or item.category.startswith(prefix):
+                search_index.remove(item.filepath)
+                snapshot.pop(item.filepath, None)
+                self.assets.remove(j)
+        if self.active_asset_index >= len(self.assets):
+            self.active_asset_index = max(0, len(self.assets) - 1)
+    
+    def add_asset_item(self, filepath, entry):
+        """Añade a la lista un asset con los metadatos de su entrada del índice"""
+        names = [name for key in INDEXED_DATABLOCKS for name in entry.datablocks.get(key, ())]
+        # Antes de añadir el AssetItem, para que no se indexe dos veces si el índice aún no existe
+        search_index = get_search_index(self)
+        item = self.assets.add()
+        item.name = os.path.splitext(os.path.basename(filepath))[0]
+        item.filepath = filepath
+        item.category = folder_of(self.library_path, filepath)
+        item.has_preview = thumbnails.has_thumbnail(thumbnails.thumbnail_path(self.library_path, filepath))
+        item.asset_type = entry.asset_type
+        item.datablock_names = '\n'.join(names)
+        search_index.add(filepath, item.name, item.asset_type, names)
+        return item
+    
+    def find_asset_item(self, filepath):
+        """Posición del asset en la lista, o -1"""
+        for i, item in enumerate(self.assets):
+            if item.filepath == filepath:
+                return i
+        return -1
+    
+    def set_asset_item(self, filepath, entry):
+        """Actualiza el asset si ya está en la lista o lo añade si no"""
+        # El índice de búsqueda refleja la lista, así que evita recorrerla para los nuevos
+        i = self.find_asset_item(filepath) if filepath in get_search_index(self) else -1
+        if i < 0:
+            return self.add_asset_item(filepath, entry)
+        names = [name for key in INDEXED_DATABLOCKS for name in entry.datablocks.get(key, ())]
+        item = self.assets[i]
+        item.asset_type = entry.asset_type
+        # El archivo ha cambiado: la miniatura se regenera salvo que ya se esté generando
+        if filepath not in _thumbnail_jobs:
+            item.has_preview = False
+            _thumbnail_failed.discard(filepath)
+        item.datablock_names = '\n'.join(names)
+        get_search_index(self).add(filepath, item.name, item.asset_type, names)
+        return item
+    
+    def remove_asset_item(self, filepath):
+        search_index = get_search_index(self)
+        i = self.find_asset_item(filepath)
+        if i < 0:
+            return
+        self.assets.remove(i)
+        search_index.remove(filepath)
+        if self.active_asset_index >= len(self.assets):
+            self.active_asset_index = max(0, len(self.assets) - 1)
+    
+    def refresh_asset_files(self, filepaths):
+        """Sincroniza con el disco solo los archivos indicados (índice y lista)
+
+        Los que ya no existen se quitan; el resto se inspecciona si el índice no está al día.
+        """
+        if not self.library_path:
+            return
+        index = get_library_index(self.library_path)
+        snapshot = _library_snapshots.setdefault(_library_key(self.library_path), {})
+        for filepath in filepaths:
+            try:
+                stat = os.stat(filepath)
+            except FileNotFoundError:
+                index.remove(filepath)
+                snapshot.pop(filepath, None)
+                self.remove_asset_item(filepath)
+                continue
+            entry = index.lookup(filepath, stat.st_mtime_ns, stat.st_size)
+            if entry is None:
+                asset_type, datablocks = AssetManager.inspect_asset(filepath)
+                entry = index.upsert(filepath, stat.st_mtime_ns, stat.st_size, asset_type, datablocks)
+            snapshot[filepath] = (stat.st_mtime_ns, stat.st_size)
+            self.set_asset_item(filepath, entry)
+        index.commit()
+
+class DependencyCollector:
+    """Dependencias de los objetos a guardar, memorizadas por material y node tree
+
+    Cada material y node tree se recorre una sola vez y se recuerda su cierre (él mismo,
+    sus node groups anidados y sus imágenes), de modo que un guardado por lotes escala con
+    los datablocks distintos y no con el número de veces que se usan.
+    """
+    
+    def __init__(self, pack_images=True):
+        self.pack_images = pack_images
+        self._closures = {}
+    
+    def __len__(self):
+        return len(self._closures)
+    
+    def node_tree(self, node_tree):
+        key = node_tree.as_pointer()
+        closure = self._closures.get(key)
+        if closure is not None:
+            return closure
+        # Se registra antes de recorrerlo para cortar cualquier referencia circular
+        closure = self._closures[key] = {node_tree}
+        with diagnostics.span("save.process_node_tree", nodes=len(node_tree.nodes)):
+            for node in node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image:
+                    closure.add(node.image)
+                    if self.pack_images and node.image.packed_file is None and node.image.filepath:
+                        node.image.pack()
+                if getattr(node, "node_tree", None):
+                    closure |= self.node_tree(node.node_tree)
+        return closure
+    
+    def material(self, material):
+        key = material.as_pointer()
+        closure = self._closures.get(key)
+        if closure is None:
+            closure = self._closures[key] = {material}
+            if material.use_nodes and material.node_tree:
+                closure |= self.node_tree(material.node_tree)
+        return closure
+    
+    def object(self, obj):
+        data_blocks = {obj}
+        if obj.data:
+            data_blocks.add(obj.data)
+        if hasattr(obj.data, "materials"):
+            for mat_slot in obj.material_slots:
+                if mat_slot.material:
+                    data_blocks |= self.material(mat_slot.material)
+        for mod in obj.modifiers:
+            if mod.type == 'NODES' and mod.node_group:
+                data_blocks |= self.node_tree(mod.node_group)
+        return data_blocks
+    
+    def collect(self, objects):
+        """Todos los datablocks que hay que escribir para guardar los objetos"""
+        data_blocks = set()
+        for obj in objects:
+            data_blocks |= self.object(obj)
+        return data_blocks
 
 class AssetManager:
     """Clase para manejar operaciones comunes de assets"""
     
+    @staticmethod
+    def inspect_asset(filepath):
+        """Devuelve el tipo de un archivo de asset y los nombres de sus datablocks
+
+        Se usa el lector de .blend en Python puro; solo si este no puede leer el archivo
+        se recurre a bpy.data.libraries.load.
+        """
+        try:
+            info = read_blend_info(filepath)
+            diagnostics.count(files=1, bytes_read=info.bytes_read)
+            return classify_asset(info.datablocks), info.datablocks
+        except (BlendFileError, OSError, ValueError, struct.error):
+            return AssetManager.inspect_asset_bpy(filepath)
+    
+    @staticmethod
+    def inspect_asset_bpy(filepath):
+        """Igual que inspect_asset pero abriendo el archivo con bpy (solo en el hilo principal)"""
+        diagnostics.count_file(filepath)
+        try:
+            with bpy.data.libraries.load(filepath) as (data_from, _):
+                datablocks = {key: list(getattr(data_from, key)) for key in INDEXED_DATABLOCKS}
+        except Exception:
+            return "UNKNOWN", {}
+        return classify_asset(datablocks), datablocks
+    
+    @staticmethod
+    def _rna_signature(rna_struct, memo, depth=0, visited=None):
+        """Valores de las propiedades de un struct RNA, para calcular huellas
+
+        Los structs anidados que no son IDs (ColorRamp y sus elementos, CurveMapping y sus
+        puntos, ImageUser...) se recorren hasta FINGERPRINT_MAX_DEPTH niveles.
+        """
+        visited = visited if visited is not None else set()
+        visited.add(rna_struct.as_pointer())
+        signature = []
+        
+        def nested(value):
+            if isinstance(value, (bpy.types.Image, bpy.types.NodeTree)):
+                return AssetManager.datablock_fingerprint(value, memo)
+            if isinstance(value, bpy.types.ID):
+                return value.name
+            if value is None or depth >= FINGERPRINT_MAX_DEPTH or value.as_pointer() in visited:
+                return None
+            return tuple(AssetManager._rna_signature(value, memo, depth + 1, visited))
+        
+        for prop in rna_struct.bl_rna.properties:
+            key = prop.identifier
+            if key in FINGERPRINT_IGNORED_PROPS:
+                continue
+            if prop.type == 'POINTER':
+                signature.append((key, nested(getattr(rna_struct, key, None))))
+                continue
+            if prop.type == 'COLLECTION':
+                items = getattr(rna_struct, key, None)
+                if items is not None:
+                    signature.append((key, tuple(nested(item) for item in items)))
+                continue
+            value = getattr(rna_struct, key, None)
+            if isinstance(value, set):
+                value = tuple(sorted(value))
+            elif getattr(prop, "is_array", False) or hasattr(value, "__len__") and not isinstance(value, str):
+                try:
+                    value = tuple(value)
+                except TypeError:
+                    continue
+            if isinstance(value, float):
+                value = round(value, 6)
+            elif isinstance(value, tuple):
+                value = tuple(round(v, 6) if isinstance(v, float) else v for v in value)
+            signature.append((key, value))
+        return signature
+    
+    @staticmethod
+    def _socket_value(socket):
+        value = getattr(socket, "default_value", None)
+        if value is None or isinstance(value, bpy.types.ID):
+            return getattr(value, "name", None)
+        if hasattr(value, "__len__") and not isinstance(value, str):
+            return tuple(round(v, 6) for v in value)
+        return round(value, 6) if isinstance(value, float) else value
+    
+    @staticmethod
+    def datablock_fingerprint(block, memo):
+        """Huella del contenido de una imagen, node group o material
+
+        Dos datablocks con la misma huella son intercambiables aunque tengan nombres
+        distintos (por ejemplo ``Material`` y ``Material.001``). ``memo`` guarda las huellas
+        ya calculadas durante una misma operación.
+        """
+        key = block.as_pointer()
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+        
+        if isinstance(block, bpy.types.Image):
+            if block.packed_file:
+                session_key = (block.session_uid, block.packed_file.size)
+                digest = _image_hashes.get(session_key)
+                if digest is None:
+                    digest = _image_hashes[session_key] = hashlib.blake2b(block.packed_file.data).hexdigest()
+                signature = ('PACKED', digest)
+            elif block.source == 'FILE' and block.filepath:
+                signature = ('FILE', os.path.normcase(os.path.abspath(bpy.path.abspath(block.filepath, library=block.library))))
+            else:
+                signature = ('IMAGE', block.name, tuple(AssetManager._rna_signature(block, memo)))
+            signature += (block.colorspace_settings.name, block.alpha_mode)
+        elif isinstance(block, bpy.types.NodeTree):
+            nodes = []
+            for node in sorted(block.nodes, key=lambda n: n.name):
+                nodes.append((
+                    node.name,
+                    tuple(AssetManager._rna_signature(node, memo)),
+                    tuple(AssetManager._socket_value(socket) for socket in node.inputs),
+                    # Los nodos Value y RGB guardan su valor en la salida
+                    tuple(AssetManager._socket_value(socket) for socket in node.outputs),
+                ))
+            links = sorted(
+                (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+                for link in block.links
+            )
+            interface = []
+            if hasattr(block, "interface"):
+                for item in block.interface.items_tree:
+                    interface.append((item.item_type, getattr(item, "in_out", None), getattr(item, "socket_type", None),
+                                      item.name, AssetManager._socket_value(item)))
+            signature = ('NODETREE', block.bl_idname, tuple(nodes), tuple(links), tuple(interface))
+        elif isinstance(block, bpy.types.Material):
+            signature = (
+                'MATERIAL',
+                tuple(AssetManager._rna_signature(block, memo)),
+                AssetManager.datablock_fingerprint(block.node_tree, memo) if block.node_tree else None,
+            )
+        else:
+            signature = (block.id_type, block.name_full)
+        
+        fingerprint = hashlib.blake2b(repr(signature).encode(), digest_size=16).hexdigest()
+        memo[key] = fingerprint
+        return fingerprint
+    
+    @staticmethod
+    def snapshot_datablocks(keys=DEDUP_COLLECTIONS):
+        """Punteros de los datablocks presentes antes de una carga"""
+        return {key: {block.as_pointer() for block in getattr(bpy.data, key)} for key in keys}
+    
+    @staticmethod
+    def apply_materials(targets, materials, force):
+        """Asigna los materiales cargados a los objetos en una sola pasada
+
+        Los objetos que comparten malla solo se procesan una vez.
+        """
+        materials = list({mat.as_pointer(): mat for mat in materials}.values())
+        for mat in materials:
+            if not mat.use_nodes:
+                mat.use_nodes = True
+        
+        processed = set()
+        for target in targets:
+            data = target.data
+            if not hasattr(data, "materials") or data.as_pointer() in processed:
+                continue
+            processed.add(data.as_pointer())
+            if force:
+                data.materials.clear()
+            existing = {mat.name for mat in data.materials if mat is not None}
+            for mat in materials:
+                if mat.name not in existing:
+                    data.materials.append(mat)
+                    existing.add(mat.name)
+    
+    @staticmethod
+    def apply_node_groups(targets, node_groups, force):
+        """Añade un modificador por cada node group de geometría de primer nivel cargado
+
+        Los node groups que solo se usan dentro de otros del mismo asset no se aplican.
+        """
+        groups = [
+            group for group in {group.as_pointer(): group for group in node_groups}.values()
+            if group.bl_idname == 'GeometryNodeTree' and getattr(group, "is_modifier", True)
+        ]
+        nested = {
+            node.node_tree.as_pointer()
+            for group in groups for node in group.nodes
+            if node.type == 'GROUP' and node.node_tree
+        }
+        groups = [group for group in groups if group.as_pointer() not in nested]
+        
+        for target in targets:
+            if target.type not in GEOMETRY_NODES_OBJECT_TYPES:
+                continue
+            if force:
+                for modifier in [mod for mod in target.modifiers if mod.type == 'NODES']:
+                    target.modifiers.remove(modifier)
+            for group in groups:
+                modifier = target.modifiers.new(name=group.name, type='NODES')
+                modifier.node_group = group
+    
+    @staticmethod
+    def release_loaded_datablocks(initial):
+        """Quita el fake user a los datablocks recién cargados y elimina los que no se usan
+
+        Los assets se guardan con fake user, así que sin esto los datos que el modo de
+        carga no utiliza se quedarían en el archivo para siempre.
+        """
+        removed = 0
+        for key in LOADED_COLLECTIONS:
+            collection = getattr(bpy.data, key)
+            # Los datos vinculados no se tocan: pueden ser la referencia de un override
+            new_blocks = [block for block in collection
+                          if block.as_pointer() not in initial[key] and block.library is None]
+            for block in new_blocks:
+                if block.use_fake_user:
+                    block.use_fake_user = False
+            # Los node groups anidados quedan libres al borrar el que los contiene
+            while True:
+                unused = [block for block in collection
+                          if block.as_pointer() not in initial[key] and block.library is None and block.users == 0]
+                if not unused:
+                    break
+                bpy.data.batch_remove(unused)
+                removed += len(unused)
+        return removed
+    
+    @staticmethod
+    def _candidate_key(block):
+        """Tipo y nombre sin sufijo numérico; solo se comparan huellas de datablocks con la misma clave"""
+        if isinstance(block, bpy.types.NodeTree):
+            kind = block.bl_idname
+        elif isinstance(block, bpy.types.Image):
+            kind = block.source
+        else:
+            kind = block.id_type
+        return kind, NAME_SUFFIX_PATTERN.sub('', block.name)
+    
+    @staticmethod
+    def deduplicate_datablocks(before, known, memo):
+        """Sustituye los datablocks recién cargados por otros idénticos que ya estaban en el archivo
+
+        ``known`` guarda por colección las huellas ya calculadas ({huella: datablock}) y los
+        datablocks previos aún sin huella, agrupados por tipo y nombre; se reutiliza entre
+        assets de una misma carga, de modo que cada dependencia compartida solo queda una vez.
+        De los datablocks previos solo se calcula la huella de los que se llaman como el
+        recién cargado (``Material`` para ``Material.001``). Devuelve {puntero del datablock
+        eliminado: datablock que lo sustituye}.
+        """
+        replacements = {}
+        for key in DEDUP_COLLECTIONS:
+            collection = getattr(bpy.data, key)
+            if key not in known:
+                candidates = {}
+                for block in collection:
+                    if block.as_pointer() in before[key] and block.library is None:
+                        candidates.setdefault(AssetManager._candidate_key(block), []).append(block)
+                known[key] = ({}, candidates)
+            known_blocks, candidates = known[key]
+            
+            new_blocks = [block for block in collection if block.as_pointer() not in before[key]]
+            for block in new_blocks:
+                pointer = block.as_pointer()
+                # Los datos vinculados pertenecen a su biblioteca y no se sustituyen
+                if block.library is not None:
+                    before[key].add(pointer)
+                    continue
+                fingerprint = AssetManager.datablock_fingerprint(block, memo)
+                original = known_blocks.get(fingerprint)
+                pending = candidates.get(AssetManager._candidate_key(block), [])
+                while original is None and pending:
+                    candidate = pending.pop()
+                    candidate_fingerprint = AssetManager.datablock_fingerprint(candidate, memo)
+                    known_blocks.setdefault(candidate_fingerprint, candidate)
+                    if candidate_fingerprint == fingerprint:
+                        original = candidate
+                if original is None:
+                    known_blocks[fingerprint] = block
+                    before[key].add(pointer)
+                    continue
+                block.user_remap(original)
+                collection.remove(block)
+                memo.pop(pointer, None)
+                replacements[pointer] = original
+        return replacements
+    
+    @staticmethod
+    def collect_datablock_names(data_blocks):
+        """Agrupa los nombres de los datablocks guardados por categoría del índice"""
+        datablocks = {key: [] for key in INDEXED_DATABLOCKS}
+        for block in data_blocks:
+            key = ID_TYPE_CATEGORIES.get(block.id_type)
+            if key and not getattr(block, "is_embedded_data", False):
+                datablocks[key].append(block.name)
+        for names in datablocks.values():
+            names.sort()
+        return datablocks
+    
     @staticmethod
     def save_asset(context, library_props):
         """Guarda el objeto seleccionado como un asset en la biblioteca"""
         if not library_props.library_path:
-            return {'CANCELLED', "Por favor seleccione una carpeta para la biblioteca"}
+            return {'CANCELLED'}, "Por favor seleccione una carpeta para la biblioteca"
         
         if not os.path.exists(library_props.library_path):
             try:
                 os.makedirs(library_props.library_path)
             except Exception as e:
-                return {'CANCELLED', f"Error al crear la carpeta de la biblioteca: {str(e)}"}
+                return {'CANCELLED'}, f"Error al crear la carpeta de la biblioteca: {str(e)}"
         
         if not context.selected_objects:
-            return {'CANCELLED', "Por favor seleccione al menos un objeto para guardar"}
+            return {'CANCELLED'}, "Por favor seleccione al menos un objeto para guardar"
         
         if not context.active_object:
-            return {'CANCELLED', "Por favor seleccione un objeto activo"}
+            return {'CANCELLED'}, "Por favor seleccione un objeto activo"
         
         asset_name = context.active_object.name
         asset_filepath = os.path.join(library_props.library_path, asset_name + FILE_EXTENSION)
         
         try:
-            data_blocks = set()
-            selected_objects = context.selected_objects
-            min_co, max_co = AssetManager.calculate_bounds(selected_objects)
-            center = (min_co + max_co) / 2
-            positions = {obj.name: obj.matrix_world.translation - center for obj in selected_objects}
-            
-            for obj in selected_objects:
-                data_blocks.add(obj)
-                if obj.data:
-                    data_blocks.add(obj.data)
-                if hasattr(obj.data, "materials"):
-                    for mat_slot in obj.material_slots:
-                        mat = mat_slot.material
-                        if mat:
-                            data_blocks.add(mat)
-                            if mat.use_nodes and mat.node_tree:
-                                data_blocks.add(mat.node_tree)
-                                AssetManager.process_node_tree(mat.node_tree, data_blocks)
-                for mod in obj.modifiers:
-                    if mod.type == 'NODES' and mod.node_group:
-                        data_blocks.add(mod.node_group)
-                        AssetManager.process_node_tree(mod.node_group, data_blocks)
+            with diagnostics.span("save.save_asset", objects=len(context.selected_objects)):
+                AssetManager.save_assets(library_props, [(asset_filepath, list(context.selected_objects), context.active_object)])
+                library_props.refresh_asset_files([asset_filepath])
+            return {'FINISHED'}, f"Asset '{asset_name}' guardado correctamente"
+        
+        except Exception as e:
+            return {'CANCELLED'}, f"Error al guardar el asset: {str(e)}"
+    
+    @staticmethod
+    def save_assets(library_props, groups, collector=None, index=None, on_error=None):
+        """Escribe varios assets sin depender del contexto
+
+        ``groups`` es una lista de ``(ruta del asset, objetos, objeto ancla)``. Todas las
+        salidas comparten un mismo DependencyCollector, así que cada material, node tree e
+        imagen se recorre una sola vez aunque lo usen muchos assets. Basta con que
+        ``library_props`` tenga las opciones de guardado, y ``index`` puede ser cualquier
+        objeto con ``upsert`` y ``commit`` (por defecto el índice de la biblioteca). Si se
+        indica ``on_error(ruta, excepción)``, un asset que no se puede guardar no detiene el
+        resto del lote. Devuelve el collector.
+        """
+        pack_images = not library_props.use_texture_store
+        collector = collector or DependencyCollector(pack_images)
+        library_path = library_props.library_path
+        if index is None:
+            index = get_library_index(library_path)
+        with diagnostics.span("save.collect_dependencies", groups=len(groups)):
+            outputs = [(asset_filepath, objects, anchor, collector.collect(objects))
+                       for asset_filepath, objects, anchor in groups if objects]
+        
+        stored_images = []
+        try:
+            # Las imágenes se llevan al almacén una sola vez para todo el lote
+            if not pack_images and outputs:
+                images = {block for *_, data_blocks in outputs for block in data_blocks if isinstance(block, bpy.types.Image)}
+                stored_images = AssetManager.store_images(images, library_path, outputs[0][0])
             
-            for obj in selected_objects:
-                obj["relative_positions"] = str(positions)
+            for asset_filepath, objects, anchor, data_blocks in outputs:
+                try:
+                    with diagnostics.span("save.calculate_layout", objects=len(objects)):
+                        min_co, max_co, offsets = AssetManager.calculate_layout(objects)
+                    # La disposición se guarda una sola vez, en el objeto ancla, y solo en el archivo del asset
+                    if anchor not in data_blocks:
+                        anchor = objects[0]
+                    AssetManager.write_layout(anchor, [obj.name for obj in objects], offsets)
+                    with diagnostics.span("save.write_asset", datablocks=len(data_blocks)) as write_span:
+                        try:
+                            bpy.data.libraries.write(asset_filepath, data_blocks, fake_user=True, compress=library_props.compress_assets)
+                        finally:
+                            del anchor[LAYOUT_PROPERTY]
+                        stat = os.stat(asset_filepath)
+                        write_span.count(files_written=1, bytes_written=stat.st_size)
+                    
+                    datablocks = AssetManager.collect_datablock_names(data_blocks)
+                    index.upsert(asset_filepath, stat.st_mtime_ns, stat.st_size, classify_asset(datablocks),
+                                 datablocks, bounds=(*min_co, *max_co))
+                    
+                    geometry_path = geometry_cache.geometry_path(library_path, asset_filepath)
+                    if library_props.write_geometry_cache and all(obj.type == 'MESH' for obj in objects):
+                        meshes = [AssetManager.gather_geometry(obj, offset) for obj, offset in zip(objects, offsets)]
+                        geometry_cache.write_geometry(geometry_path, meshes, stat.st_size, stat.st_mtime_ns)
+                    elif os.path.exists(geometry_path):
+                        os.remove(geometry_path)
+                    
+                    thumbnail_geometry = AssetManager.gather_thumbnail_geometry(objects)
+                    if thumbnail_geometry is not None:
+                        submit_thumbnail(library_path, asset_filepath, thumbnail_geometry)
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    on_error(asset_filepath, e)
+        finally:
+            AssetManager.restore_stored_images(stored_images)
+            index.commit()
+        return collector
+    
+    @staticmethod
+    def gather_transforms(objects):
+        """Lee en bloque las matrices de mundo y esquinas de bound_box de los objetos
+
+        Devuelve dos arrays (n, 4, 4) y (n, 8, 3). Las matrices quedan traspuestas (tal y
+        como las guarda Blender), de modo que ``esquina @ m[:3, :3] + m[3, :3]`` es la
+        posición en el mundo.
+        """
+        count = len(objects)
+        matrices = np.empty((count, 4, 4), dtype=np.float32)
+        corners = np.empty((count, 8, 3), dtype=np.float32)
+        all_objects = bpy.data.objects
+        total = len(all_objects)
+        
+        if count and count >= total * BULK_GATHER_RATIO:
+            lookup = {obj.as_pointer(): i for i, obj in enumerate(all_objects)}
+            indices = np.fromiter((lookup.get(obj.as_pointer(), -1) for obj in objects), dtype=np.int64, count=count)
+            if (indices >= 0).all():
+                all_matrices = np.empty(total * 16, dtype=np.float32)
+                all_corners = np.empty(total * 24, dtype=np.float32)
+                all_objects.foreach_get("matrix_world", all_matrices)
+                all_objects.foreach_get("bound_box", all_corners)
+                matrices[:] = all_matrices.reshape(total, 4, 4)[indices]
+                corners[:] = all_corners.reshape(total, 8, 3)[indices]
+                return matrices, corners
+        
+        for i, obj in enumerate(objects):
+            matrices[i] = np.array(obj.matrix_world, dtype=np.float32).T
+            corners[i] = np.array(obj.bound_box, dtype=np.float32)
+        return matrices, corners
+    
+    @staticmethod
+    def calculate_layout(selected_objects):
+        """Calcula los límites de los objetos y su posición relativa al centro
+
+        Devuelve ``(min_co, max_co, offsets)``, donde ``offsets`` es un array (n, 3) con la
+        posición de cada objeto respecto al centro de los límites, en el mismo orden.
+        """
+        matrices, corners = AssetManager.gather_transforms(selected_objects)
+        if not len(selected_objects):
+            return Vector((float('inf'),) * 3), Vector((float('-inf'),) * 3), np.empty((0, 3))
+        
+        matrices = matrices.astype(np.float64)
+        world = np.matmul(corners, matrices[:, :3, :3]) + matrices[:, None, 3, :3]
+        world = world.reshape(-1, 3)
+        min_co = world.min(axis=0)
+        max_co = world.max(axis=0)
+        offsets = matrices[:, 3, :3] - (min_co + max_co) / 2
+        return Vector(min_co), Vector(max_co), offsets
+    
+    @staticmethod
+    def write_layout(anchor, names, offsets):
+        """Guarda en el objeto la tabla de nombres y los offsets empaquetados como array de floats"""
+        anchor[LAYOUT_PROPERTY] = {
+            "names": list(names),
+            "offsets": np.asarray(offsets, dtype=np.float64).ravel().tolist(),
+        }
+    
+    @staticmethod
+    def read_layout(objects):
+        """Devuelve {nombre original: offset} de la disposición guardada en los objetos de un asset
+
+        Entiende también el formato antiguo (un dict de Vectors convertido a texto) sin
+        evaluarlo. Las propiedades se eliminan de los objetos añadidos; los vinculados no se
+        pueden modificar y las conservan.
+        """
+        layout = {}
+        for obj in objects:
+            if obj is None:
+                continue
+            if not layout and LAYOUT_PROPERTY in obj:
+                data = obj[LAYOUT_PROPERTY]
+                offsets = np.array(data["offsets"].to_list(), dtype=np.float64).reshape(-1, 3)
+                layout = {name: Vector(offset) for name, offset in zip(data["names"], offsets)}
+            if not layout and LEGACY_LAYOUT_PROPERTY in obj:
+                layout = AssetManager.parse_legacy_layout(obj[LEGACY_LAYOUT_PROPERTY])
+            if obj.library is not None:
+                continue
+            for key in (LAYOUT_PROPERTY, LEGACY_LAYOUT_PROPERTY):
+                if key in obj:
+                    del obj[key]
+        return layout
+    
+    @staticmethod
+    def parse_legacy_layout(text):
+        """Interpreta el antiguo ``str(dict)`` de posiciones relativas"""
+        layout = {}
+        for match in LEGACY_LAYOUT_PATTERN.finditer(str(text)):
+            quote = match.group('quote')
+            try:
+                name = ast.literal_eval(quote + match.group('name') + quote)
+                layout[name] = Vector(float(value) for value in match.group('co').split(','))
+            except (ValueError, SyntaxError):
+                continue
+        return layout
+    
+    @staticmethod
+    def gather_geometry(obj, offset):
+        """Lee con foreach_get la geometría de la malla de un objeto para el archivo de geometría"""
+        mesh = obj.data
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        loops = np.empty(len(mesh.loops), dtype=np.int32)
+        loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+        smooth = np.empty(len(mesh.polygons), dtype=bool)
+        mesh.vertices.foreach_get("co", co)
+        mesh.edges.foreach_get("vertices", edges)
+        mesh.loops.foreach_get("vertex_index", loops)
+        mesh.polygons.foreach_get("loop_start", loop_start)
+        mesh.polygons.foreach_get("use_smooth", smooth)
+        arrays = {
+            "co": co.reshape(-1, 3),
+            "edges": edges.reshape(-1, 2),
+            "loops": loops,
+            "loop_start": loop_start,
+            "smooth": smooth,
+        }
+        for layer in mesh.uv_layers:
+            uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+            layer.data.foreach_get("uv", uv)
+            arrays["uv:" + layer.name] = uv.reshape(-1, 2)
+        return {
+            "name": obj.name,
+            "mesh": mesh.name,
+            "matrix": [value for row in obj.matrix_world for value in row],
+            "offset": offset,
+            "arrays": arrays,
+        }
+    
+    @staticmethod
+    def build_mesh(geometry, entry):
+        """Crea una malla con foreach_set directamente desde los arrays mapeados en memoria"""
+        co = geometry.array(entry, "co")
+        edges = geometry.array(entry, "edges")
+        loops = geometry.array(entry, "loops")
+        loop_start = geometry.array(entry, "loop_start")
+        if co is None or edges is None or loops is None or loop_start is None:
+            raise geometry_cache.GeometryCacheError(f"faltan datos de la malla '{entry['mesh']}'")
+        if (edges.size and edges.max() >= len(co)) or (loops.size and loops.max() >= len(co)) \
+                or (loop_start.size and loop_start.max() >= len(loops)):
+            raise geometry_cache.GeometryCacheError(f"índices fuera de rango en la malla '{entry['mesh']}'")
+        
+        mesh = bpy.data.meshes.new(entry["mesh"])
+        mesh.vertices.add(len(co))
+        mesh.vertices.foreach_set("co", co.ravel())
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set("vertices", edges.ravel())
+        mesh.loops.add(len(loops))
+        mesh.loops.foreach_set("vertex_index", loops)
+        mesh.polygons.add(len(loop_start))
+        mesh.polygons.foreach_set("loop_start", loop_start)
+        smooth = geometry.array(entry, "smooth")
+        if smooth is not None:
+            mesh.polygons.foreach_set("use_smooth", smooth)
+        for key in entry["arrays"]:
+            if key.startswith("uv:"):
+                layer = mesh.uv_layers.new(name=key[3:])
+                layer.data.foreach_set("uv", geometry.array(entry, key).ravel())
+        mesh.update()
+        return mesh
+    
+    @staticmethod
+    def load_geometry(asset_filepath, library_path, cache=None):
+        """Crea los objetos de un asset desde su archivo de geometría, sin abrir el .blend
+
+        Devuelve ``(nombres originales, objetos, disposición)`` o None si no hay archivo de
+        geometría o no corresponde a la versión actual del asset. Con ``cache`` (LocalCache)
+        el archivo de geometría se lee desde la caché local.
+        """
+        path = geometry_cache.geometry_path(library_path, asset_filepath)
+        if cache is not None:
+            path = cache.fetch(path)
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(asset_filepath)
+        names, objects, layout = [], [], {}
+        meshes = []
+        diagnostics.count_file(path)
+        try:
+            with geometry_cache.GeometryFile(path) as geometry:
+                if not geometry.matches(stat.st_size, stat.st_mtime_ns):
+                    return None
+                for entry in geometry.objects:
+                    meshes.append(AssetManager.build_mesh(geometry, entry))
+                    names.append(entry["name"])
+                    layout[entry["name"]] = Vector(entry["offset"])
+        except (geometry_cache.GeometryCacheError, RuntimeError, TypeError, ValueError) as e:
+            print(f"Asset Manager: archivo de geometría no válido '{path}': {e}")
+            bpy.data.batch_remove(meshes)
+            return None
+        
+        for name, mesh, entry in zip(names, meshes, geometry.objects):
+            obj = bpy.data.objects.new(name, mesh)
+            matrix = entry["matrix"]
+            obj.matrix_world = Matrix([matrix[0:4], matrix[4:8], matrix[8:12], matrix[12:16]])
+            objects.append(obj)
+        return names, objects, layout
+    
+    @staticmethod
+    def remap_cached_images(cache, initial):
+        """Apunta a la biblioteca las imágenes recién cargadas cuya ruta quedó en la caché local
+
+        Al añadir datos desde una copia local, Blender resuelve las rutas relativas de las
+        imágenes desde la carpeta de la caché; la escena no debe depender de esas copias.
+        ``initial`` son los punteros de las imágenes que ya estaban antes de la lectura.
+        """
+        for image in bpy.data.images:
+            if image.as_pointer() in initial['images'] or image.library is not None or not image.filepath:
+                continue
+            original = cache.original_path(bpy.path.abspath(image.filepath))
+            if original is None:
+                continue
+            try:
+                image.filepath = bpy.path.relpath(original) if bpy.data.filepath else original
+            except ValueError:
+                # Otra unidad en Windows: no se puede expresar como ruta relativa
+                image.filepath = original
+    
+    @staticmethod
+    def instance_root(scene):
+        """Colección donde se guardan los orígenes de las instancias, excluida de las view layers"""
+        root = bpy.data.collections.get(INSTANCE_ROOT_COLLECTION)
+        if root is None or root.library is not None:
+            root = bpy.data.collections.new(INSTANCE_ROOT_COLLECTION)
+        if scene.collection.children.get(root.name) is None:
+            scene.collection.children.link(root)
+        for view_layer in scene.view_layers:
+            layer_collection = view_layer.layer_collection.children.get(root.name)
+            if layer_collection is not None:
+                layer_collection.exclude = True
+        return root
+    
+    @staticmethod
+    def find_instance_source(asset_filepath, load_mode):
+        """Colección de origen ya cargada para el asset, si sigue al día con su archivo"""
+        root = bpy.data.collections.get(INSTANCE_ROOT_COLLECTION)
+        if root is None:
+            return None
+        mtime = str(os.stat(asset_filepath).st_mtime_ns)
+        for source in root.children:
+            if (source.get(INSTANCE_SOURCE_PROPERTY) == asset_filepath
+                    and source.get(INSTANCE_MODE_PROPERTY) == load_mode
+                    and source.get(INSTANCE_MTIME_PROPERTY) == mtime):
+                return source
+        return None
+    
+    @staticmethod
+    def create_instance_source(scene, name, asset_filepath, load_mode, object_names, objects, layout):
+        """Mete los objetos cargados en una colección de origen oculta, centrada en su disposición"""
+        source = bpy.data.collections.new(name)
+        source[INSTANCE_SOURCE_PROPERTY] = asset_filepath
+        source[INSTANCE_MODE_PROPERTY] = load_mode
+        source[INSTANCE_MTIME_PROPERTY] = str(os.stat(asset_filepath).st_mtime_ns)
+        AssetManager.instance_root(scene).children.link(source)
+        
+        placed = []
+        for object_name, obj in zip(object_names, objects):
+            if obj is None:
+                continue
+            source.objects.link(obj)
+            offset = layout.get(object_name)
+            if offset is not None:
+                if obj.library is None:
+                    obj.location = offset
+                else:
+                    # Los objetos vinculados no se pueden mover; se desplaza la instancia
+                    source.instance_offset = obj.location - offset
+            placed.append(obj)
+        # Sin disposición guardada los objetos conservan su posición y se centra la instancia
+        if placed and not layout:
+            center = sum((obj.location for obj in placed), Vector()) / len(placed)
+            source.instance_offset = center
+        return source
+    
+    @staticmethod
+    def place_instance(collection, source, location):
+        """Crea un empty que instancia la colección de origen"""
+        empty = bpy.data.objects.new(source.name, None)
+        empty.instance_type = 'COLLECTION'
+        empty.instance_collection = source
+        empty.location = location
+        collection.objects.link(empty)
+        return empty
+    
+    @staticmethod
+    def delete_asset_file(library_path, asset_filepath):
+        """Borra el archivo de un asset junto con sus archivos auxiliares"""
+        os.remove(asset_filepath)
+        geometry_path = geometry_cache.geometry_path(library_path, asset_filepath)
+        if os.path.exists(geometry_path):
+            os.remove(geometry_path)
+        thumbnails.remove_thumbnail(thumbnails.thumbnail_path(library_path, asset_filepath))
+        release_preview(asset_filepath)
+    
+    @staticmethod
+    def gather_thumbnail_geometry(objects):
+        """Triángulos en coordenadas de mundo y color de material de los objetos de malla
+
+        Devuelve ``(vértices, triángulos, colores)`` para thumbnails.generate_thumbnail, o
+        None si no hay ninguna malla.
+        """
+        vertices, triangles, colors = [], [], []
+        offset = 0
+        for obj in objects:
+            if obj.type != 'MESH' or obj.data is None:
+                continue
+            mesh = obj.data
+            mesh.calc_loop_triangles()
+            co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+            tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+            material_index = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+            mesh.vertices.foreach_get("co", co)
+            mesh.loop_triangles.foreach_get("vertices", tris)
+            mesh.loop_triangles.foreach_get("material_index", material_index)
             
-            bpy.data.libraries.write(asset_filepath, data_blocks, fake_user=True, compress=True)
-            library_props.load_assets(context)
-            return {'FINISHED', f"Asset '{asset_name}' guardado correctamente"}
+            matrix = np.array(obj.matrix_world, dtype=np.float64)
+            palette = np.array([
+                slot.material.diffuse_color[:3] if slot.material else thumbnails.DEFAULT_COLOR
+                for slot in obj.material_slots
+            ] or [thumbnails.DEFAULT_COLOR], dtype=np.float32)
+            vertices.append(co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3])
+            triangles.append(tris.reshape(-1, 3) + offset)
+            colors.append(palette[np.clip(material_index, 0, len(palette) - 1)])
+            offset += len(mesh.vertices)
+        if not triangles:
+            return None
+        return np.concatenate(vertices), np.concatenate(triangles), np.concatenate(colors)
+    
+    @staticmethod
+    def read_thumbnail_geometry(library_path, filepath, cache=None):
+        """Geometría para la miniatura de un asset guardado
+
+        Sale del archivo de geometría si está al día; si no, los objetos se cargan en datos
+        temporales que no tocan el archivo actual. Con ``cache`` (LocalCache) ambos archivos
+        se leen desde la caché local.
+        """
+        path = geometry_cache.geometry_path(library_path, filepath)
+        if cache is not None:
+            path = cache.fetch(path)
+        if os.path.exists(path):
+            stat = os.stat(filepath)
+            with geometry_cache.GeometryFile(path) as geometry:
+                if geometry.matches(stat.st_size, stat.st_mtime_ns):
+                    vertices, triangles = [], []
+                    offset = 0
+                    for entry in geometry.objects:
+                        matrix = np.array(entry["matrix"], dtype=np.float64).reshape(4, 4)
+                        co = geometry.array(entry, "co") @ matrix[:3, :3].T + matrix[:3, 3]
+                        vertices.append(co)
+                        triangles.append(thumbnails.triangulate(
+                            geometry.array(entry, "loops"), geometry.array(entry, "loop_start")) + offset)
+                        offset += len(co)
+                    if triangles:
+                        return np.concatenate(vertices), np.concatenate(triangles), None
         
-        except Exception as e:
-            return {'CANCELLED', f"Error al guardar el asset: {str(e)}"}
-    
-    @staticmethod
-    def calculate_bounds(selected_objects):
-        """Calcula los límites de los objetos seleccionados"""
-        min_co = Vector((float('inf'),) * 3)
-        max_co = Vector((float('-inf'),) * 3)
-        for obj in selected_objects:
-            if hasattr(obj, "bound_box"):
-                for v in obj.bound_box:
-                    world_co = obj.matrix_world @ Vector(v)
-                    min_co.x = min(min_co.x, world_co.x)
-                    min_co.y = min(min_co.y, world_co.y)
-                    min_co.z = min(min_co.z, world_co.z)
-                    max_co.x = max(max_co.x, world_co.x)
-                    max_co.y = max(max_co.y, world_co.y)
-                    max_co.z = max(max_co.z, world_co.z)
+        read_path = cache.fetch(filepath) if cache is not None else filepath
+        diagnostics.count_file(read_path)
+        with bpy.data.temp_data() as temp_data:
+            with temp_data.libraries.load(read_path) as (data_from, data_to):
+                data_to.objects = data_from.objects
+            return AssetManager.gather_thumbnail_geometry([obj for obj in data_to.objects if obj is not None])
+    
+    @staticmethod
+    def store_images(images, library_path, asset_filepath):
+        """Lleva las imágenes al almacén de texturas y las apunta a él mientras se escribe el asset
+
+        Las imágenes empaquetadas se desempaquetan temporalmente para que el asset no
+        incluya sus píxeles. Devuelve el estado necesario para restore_stored_images.
+        """
+        asset_dir = os.path.dirname(os.path.abspath(asset_filepath))
+        stored = []
+        for image in images:
+            if image.library is not None:
+                continue
+            if image.packed_file:
+                extension = os.path.splitext(image.filepath_raw)[1] or texture_store.FORMAT_EXTENSIONS.get(image.file_format, '.png')
+                path, _ = texture_store.store_bytes(library_path, image.packed_file.data, extension)
+            elif image.source == 'FILE' and image.filepath:
+                source = bpy.path.abspath(image.filepath)
+                if not os.path.isfile(source):
+                    continue
+                path, _ = texture_store.store_file(library_path, source)
             else:
-                world_co = obj.matrix_world.translation
-                min_co.x = min(min_co.x, world_co.x)
-                min_co.y = min(min_co.y, world_co.y)
-                min_co.z = min(min_co.z, world_co.z)
-                max_co.x = max(max_co.x, world_co.x)
-                max_co.y = max(max_co.y, world_co.y)
-                max_co.z = max(max_co.z, world_co.z)
-        return min_co, max_co
-    
-    @staticmethod
-    def process_node_tree(node_tree, data_blocks):
-        """Procesa un árbol de nodos y agrega los bloques de datos necesarios"""
-        if not node_tree:
-            return
-        for node in node_tree.nodes:
-            if node.type == 'TEX_IMAGE' and node.image:
-                data_blocks.add(node.image)
-                if node.image.packed_file is None and node.image.filepath:
-                    node.image.pack()
-            if hasattr(node, "node_tree") and node.node_tree:
-                data_blocks.add(node.node_tree)
-                AssetManager.process_node_tree(node.node_tree, data_blocks)
+                continue
+            
+            was_packed = image.packed_file is not None
+            stored.append((image, image.filepath_raw, was_packed, path))
+            if was_packed:
+                image.unpack(method='REMOVE')
+            image.filepath_raw = "//" + os.path.relpath(path, asset_dir).replace(os.sep, '/')
+        return stored
+    
+    @staticmethod
+    def restore_stored_images(stored):
+        """Deja las imágenes como estaban antes de store_images"""
+        for image, filepath_raw, was_packed, path in stored:
+            if was_packed:
+                image.filepath_raw = path
+                image.pack()
+            image.filepath_raw = filepath_raw
 
 class ASSET_LIBRARY_OT_save_asset(Operator):
     """Guarda el objeto seleccionado como un asset en la biblioteca"""
@@ -227,6 +1735,78 @@ class ASSET_LIBRARY_OT_save_asset(Operator):
         self.report(result, message)
         return result
 
+class ASSET_LIBRARY_OT_save_batch(Operator):
+    """Guarda cada objeto o colección seleccionada como un asset independiente"""
+    bl_idname = "asset.save_batch"
+    bl_label = "Guardar por Lotes"
+    bl_description = "Guarda cada objeto seleccionado (o cada colección de primer nivel que los contiene) como un asset independiente"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    group_by: EnumProperty(
+        name="Un asset por",
+        items=[
+            ('OBJECT', 'Objeto', 'Un asset por cada objeto seleccionado', 'OBJECT_DATA', 0),
+            ('COLLECTION', 'Colección', 'Un asset por cada colección de primer nivel con objetos seleccionados', 'OUTLINER_COLLECTION', 1),
+        ],
+        default='OBJECT'
+    )
+    
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+    
+    @staticmethod
+    def top_level_groups(scene, objects):
+        """Colecciones hijas directas de la escena que contienen alguno de los objetos"""
+        selected = set(objects)
+        groups = []
+        for collection in scene.collection.children:
+            if any(obj in selected for obj in collection.all_objects):
+                groups.append((collection.name, list(collection.all_objects)))
+        return groups
+    
+    def execute(self, context):
+        library_props = context.scene.asset_library
+        if not library_props.library_path:
+            self.report({'ERROR'}, "Por favor seleccione una carpeta para la biblioteca")
+            return {'CANCELLED'}
+        if not context.selected_objects:
+            self.report({'ERROR'}, "Por favor seleccione al menos un objeto para guardar")
+            return {'CANCELLED'}
+        
+        if self.group_by == 'COLLECTION':
+            named_groups = self.top_level_groups(context.scene, context.selected_objects)
+        else:
+            named_groups = [(obj.name, [obj]) for obj in context.selected_objects]
+        if not named_groups:
+            self.report({'ERROR'}, "Los objetos seleccionados no pertenecen a ninguna colección")
+            return {'CANCELLED'}
+        
+        start_time = time.perf_counter()
+        # Los nombres de objetos y colecciones pueden tener caracteres no válidos en un archivo
+        groups = [(os.path.join(library_props.library_path, bpy.path.clean_name(name) + FILE_EXTENSION), objects, objects[0])
+                  for name, objects in named_groups]
+        failures = []
+        try:
+            os.makedirs(library_props.library_path, exist_ok=True)
+            collector = AssetManager.save_assets(library_props, groups,
+                                                 on_error=lambda path, e: failures.append((path, e)))
+        except Exception as e:
+            self.report({'ERROR'}, f"Error al guardar los assets: {str(e)}")
+            return {'CANCELLED'}
+        finally:
+            # Aunque el lote se interrumpa, la lista refleja los archivos que sí se han escrito
+            library_props.refresh_asset_files([path for path, _, _ in groups])
+        
+        for path, e in failures:
+            self.report({'WARNING'}, f"No se pudo guardar '{os.path.basename(path)}': {str(e)}")
+        saved = len(groups) - len(failures)
+        if not saved:
+            self.report({'ERROR'}, "No se ha podido guardar ningún asset")
+            return {'CANCELLED'}
+        elapsed = time.perf_counter() - start_time
+        self.report({'INFO'}, f"{saved} de {len(groups)} assets guardados en {elapsed:.2f} s ({len(collector)} materiales y node trees distintos)")
+        return {'FINISHED'}
+
 class ASSET_LIBRARY_OT_load_asset(Operator):
     """Carga los assets seleccionados en la escena actual"""
     bl_idname = "asset.load_from_library"
@@ -246,85 +1826,152 @@ class ASSET_LIBRARY_OT_load_asset(Operator):
                 return {'CANCELLED'}
             selected_assets = [library_props.assets[library_props.active_asset_index]]
 
+        # Planificación: cada archivo se abre una sola vez aunque esté seleccionado varias veces
+        plan = []
+        seen_paths = set()
+        with diagnostics.span("load.plan", selected=len(selected_assets)):
+            for asset in selected_assets:
+                if asset.filepath in seen_paths:
+                    continue
+                if not os.path.exists(asset.filepath):
+                    self.report({'WARNING'}, f"No se encontró el archivo del asset '{asset.name}'")
+                    continue
+                seen_paths.add(asset.filepath)
+                plan.append(asset)
+        
+        start_time = time.perf_counter()
+        load_mode = library_props.load_mode
+        initial = AssetManager.snapshot_datablocks(LOADED_COLLECTIONS)
+        before = AssetManager.snapshot_datablocks()
+        known_blocks = {}
+        fingerprints = {}
+        reused_count = 0
+        loaded_materials = []
+        loaded_node_groups = []
+        # Los objetos vinculados sin override no se pueden mover, así que se colocan como instancias
+        linking = library_props.link_assets and load_mode == 'COLLECTION'
+        instancing = (library_props.use_instancing and load_mode in {'COLLECTION', 'MESH'}) \
+            or (linking and not library_props.use_overrides)
+        source_mode = load_mode + ('_LINK' if linking else '')
+        # Los assets vinculados se leen desde la biblioteca: el archivo guardado apunta a ellos
+        cache = None if linking else get_local_cache(library_props)
+        instance_count = library_props.instance_count if instancing else 1
+        grid_columns = math.ceil(math.sqrt(len(plan) * instance_count)) if plan else 1
+        placed_instances = 0
+
+        def instance_location(i, copy):
+            """Posición de cada instancia: en fila, rejilla de todas las copias; si no, copias en X desde el cursor"""
+            if library_props.arrange_mode == 'ROW':
+                cell = i * instance_count + copy
+                return cursor_location + Vector((cell % grid_columns, cell // grid_columns, 0)) * library_props.spacing
+            return cursor_location + Vector((copy * library_props.spacing, 0, 0))
+
         try:
-            for i, asset in enumerate(selected_assets):
-                with bpy.data.libraries.load(asset.filepath) as (data_from, data_to):
-                    data_to.objects = data_from.objects
-                    
-                    if library_props.load_mode == 'MATERIAL':
-                        data_to.materials = data_from.materials
-                        data_to.node_groups = [ng for ng in data_from.node_groups 
-                                             if any(hasattr(mat, 'node_tree') and mat.node_tree == ng 
-                                                  for mat in data_from.materials)]
+            with diagnostics.span("load", mode=source_mode, assets=len(plan)):
+                for i, asset in enumerate(plan):
+                    # Un asset ya cargado como instancia se vuelve a instanciar sin abrir su archivo
+                    source = AssetManager.find_instance_source(asset.filepath, source_mode) if instancing else None
+                    if source is not None:
+                        with diagnostics.span("load.instance", reused=True):
+                            for copy in range(instance_count):
+                                AssetManager.place_instance(scene.collection, source, instance_location(i, copy))
+                        placed_instances += instance_count
+                        continue
+
+                    # En modo Mesh la geometría sale del archivo auxiliar si está al día
+                    from_geometry = None
+                    if load_mode == 'MESH':
+                        with diagnostics.span("load.read_geometry"):
+                            from_geometry = AssetManager.load_geometry(asset.filepath, library_props.library_path, cache)
                     
-                    elif library_props.load_mode == 'NODES':
-                        data_to.node_groups = data_from.node_groups
+                    if from_geometry is not None:
+                        object_names, objects, relative_positions = from_geometry
+                    else:
+                        # Cada modo pide solo los datablocks que necesita; las dependencias
+                        # (texturas, node groups anidados...) las añade Blender
+                        object_names = []
+                        with diagnostics.span("load.read_file", link=linking):
+                            read_path = cache.fetch(asset.filepath) if cache is not None else asset.filepath
+                            diagnostics.count_file(read_path)
+                            with bpy.data.libraries.load(read_path, link=linking) as (data_from, data_to):
+                                if load_mode in {'COLLECTION', 'MESH'}:
+                                    object_names = list(data_from.objects)
+                                    data_to.objects = object_names
+                                elif load_mode == 'MATERIAL':
+                                    data_to.materials = data_from.materials
+                                elif load_mode == 'NODES':
+                                    data_to.node_groups = data_from.node_groups
+                            # Antes de calcular las huellas, para que las imágenes de la copia local
+                            # y las de la biblioteca tengan la misma ruta
+                            if cache is not None:
+                                AssetManager.remap_cached_images(cache, before)
 
-                loaded_objects = []
-                relative_positions = {}
-                
-                for obj in data_to.objects:
-                    if obj is not None and "relative_positions" in obj:
-                        try:
-                            relative_positions = eval(obj["relative_positions"])
-                            break
-                        except:
-                            pass
-
-                for obj in data_to.objects:
-                    if obj is not None:
-                        if library_props.load_mode in {'COLLECTION', 'MESH'}:
+                        # Los datablocks idénticos a otros ya presentes se sustituyen por estos
+                        with diagnostics.span("load.deduplicate"):
+                            requested = [(block.as_pointer(), block) for block in (*data_to.materials, *data_to.node_groups) if block is not None]
+                            replacements = AssetManager.deduplicate_datablocks(before, known_blocks, fingerprints)
+                        reused_count += len(replacements)
+                        for pointer, block in requested:
+                            block = replacements.get(pointer, block)
+                            if isinstance(block, bpy.types.Material):
+                                loaded_materials.append(block)
+                            else:
+                                loaded_node_groups.append(block)
+
+                        if load_mode not in {'COLLECTION', 'MESH'}:
+                            continue
+
+                        # Los objetos pueden renombrarse al añadirse, así que la disposición se busca
+                        # por el nombre que tenían en el archivo del asset
+                        objects = data_to.objects
+                        relative_positions = AssetManager.read_layout(objects)
+                    
+                    if load_mode == 'MESH' and from_geometry is None:
+                        for obj in objects:
+                            if obj is None:
+                                continue
+                            if hasattr(obj.data, "materials"):
+                                obj.data.materials.clear()
+                            obj.modifiers.clear()
+                    
+                    if instancing:
+                        with diagnostics.span("load.instance", reused=False):
+                            source = AssetManager.create_instance_source(
+                                scene, asset.name, asset.filepath, source_mode, object_names, objects, relative_positions)
+                            for copy in range(instance_count):
+                                AssetManager.place_instance(scene.collection, source, instance_location(i, copy))
+                        placed_instances += instance_count
+                        continue
+                    
+                    with diagnostics.span("load.place", objects=len(objects)):
+                        for name, obj in zip(object_names, objects):
+                            if obj is None:
+                                continue
+                            if obj.library is not None:
+                                obj = obj.override_create(remap_local_usages=True)
                             scene.collection.objects.link(obj)
-                            loaded_objects.append(obj)
                             
                             if library_props.arrange_mode == 'RELATIVE' and relative_positions:
-                                if obj.name in relative_positions:
-                                    rel_pos = relative_positions[obj.name]
-                                    if isinstance(rel_pos, Vector):
-                                        obj.location = cursor_location + rel_pos
+                                rel_pos = relative_positions.get(name)
+                                if rel_pos is not None:
+                                    obj.location = cursor_location + rel_pos
                             else:  # ROW mode
                                 obj.location = cursor_location + Vector((i * library_props.spacing, 0, 0))
-                            
-                            if library_props.load_mode == 'MESH':
-                                if hasattr(obj.data, "materials"):
-                                    obj.data.materials.clear()
-                                while obj.modifiers:
-                                    obj.modifiers.remove(obj.modifiers[0])
-                        
-                        if library_props.load_mode == 'MATERIAL':
-                            for target_obj in context.selected_objects:
-                                if hasattr(target_obj.data, "materials"):
-                                    if library_props.force_mode:
-                                        while len(target_obj.data.materials):
-                                            target_obj.data.materials.pop()
-                                    
-                                    for mat in data_to.materials:
-                                        if mat is not None and isinstance(mat, bpy.types.Material):
-                                            if not library_props.force_mode and mat.name in target_obj.data.materials:
-                                                continue
-                                            
-                                            if not mat.use_nodes:
-                                                mat.use_nodes = True
-                                            
-                                            target_obj.data.materials.append(mat)
-
-                        if library_props.load_mode == 'NODES':
-                            for target_obj in context.selected_objects:
-                                for mod in obj.modifiers:
-                                    if mod.type == 'NODES':
-                                        if library_props.force_mode:
-                                            for existing_mod in target_obj.modifiers:
-                                                if existing_mod.type == 'NODES':
-                                                    target_obj.modifiers.remove(existing_mod)
-                                        
-                                        new_mod = target_obj.modifiers.new(name=mod.name, type='NODES')
-                                        new_mod.node_group = mod.node_group
-
-                if library_props.load_mode not in {'COLLECTION', 'MESH'}:
-                    for obj in loaded_objects:
-                        bpy.data.objects.remove(obj, do_unlink=True)
-
-            self.report({'INFO'}, f"Assets cargados correctamente")
+
+                with diagnostics.span("load.apply"):
+                    if load_mode == 'MATERIAL':
+                        AssetManager.apply_materials(context.selected_objects, loaded_materials, library_props.force_mode)
+                    elif load_mode == 'NODES':
+                        AssetManager.apply_node_groups(context.selected_objects, loaded_node_groups, library_props.force_mode)
+                
+                with diagnostics.span("load.release"):
+                    AssetManager.release_loaded_datablocks(initial)
+
+            elapsed = time.perf_counter() - start_time
+            message = f"{len(plan)} assets cargados en {elapsed:.2f} s ({reused_count} datablocks reutilizados)"
+            if instancing:
+                message += f", {placed_instances} instancias"
+            self.report({'INFO'}, message)
             return {'FINISHED'}
 
         except Exception as e:
@@ -339,6 +1986,7 @@ class ASSET_LIBRARY_OT_delete_asset(Operator):
     
     asset_name: StringProperty()
     asset_index: IntProperty()
+    asset_filepath: StringProperty()
     
     def invoke(self, context, event):
         return context.window_manager.invoke_confirm(self, event)
@@ -350,12 +1998,13 @@ class ASSET_LIBRARY_OT_delete_asset(Operator):
             self.report({'ERROR'}, "No se ha seleccionado una carpeta de biblioteca")
             return {'CANCELLED'}
             
-        asset_path = os.path.join(library_props.library_path, self.asset_name + FILE_EXTENSION)
+        # Los assets de las categorías no están en la raíz de la biblioteca
+        asset_path = self.asset_filepath or os.path.join(library_props.library_path, self.asset_name + FILE_EXTENSION)
         
         try:
             if os.path.exists(asset_path):
-                os.remove(asset_path)
-                library_props.load_assets(context)
+                AssetManager.delete_asset_file(library_props.library_path, asset_path)
+                library_props.refresh_asset_files([asset_path])
                 self.report({'INFO'}, f"Asset '{self.asset_name}' eliminado correctamente")
                 return {'FINISHED'}
             else:
@@ -366,31 +2015,79 @@ class ASSET_LIBRARY_OT_delete_asset(Operator):
             return {'CANCELLED'}
 
 class ASSET_LIBRARY_UL_items(UIList):
+    """Lista de assets; el icono sale del tipo guardado en AssetItem, sin acceder a disco"""
+    _filter_cache = None
+    
+    def filter_items(self, context, data, propname):
+        """Filtra y ordena la lista con el índice de búsqueda en memoria"""
+        with diagnostics.span("ui.filter_items", frequent=True):
+            items = getattr(data, propname)
+            scores = filter_asset_scores(data)
+            if scores is None:
+                return [], []
+        
+            search_index = get_search_index(data)
+            cache_key = (data.as_pointer(), search_index.generation, data.search_term, data.type_filter, len(items))
+            cached = ASSET_LIBRARY_UL_items._filter_cache
+            if cached is not None and cached[0] == cache_key:
+                return cached[1], cached[2]
+        
+            filepaths = [item.filepath for item in items]
+            flags = [self.bitflag_filter_item if filepath in scores else 0 for filepath in filepaths]
+            order = []
+            if data.search_term.strip():
+                ranked = sorted(range(len(filepaths)), key=lambda i: (-scores.get(filepaths[i], -1.0), i))
+                order = [0] * len(filepaths)
+                for position, i in enumerate(ranked):
+                    order[i] = position
+        
+            ASSET_LIBRARY_UL_items._filter_cache = (cache_key, flags, order)
+            return flags, order
+    
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             row = layout.row(align=True)
             row.prop(item, "is_selected", text="")
             
-            icon_name = 'OBJECT_DATA'
-            try:
-                with bpy.data.libraries.load(item.filepath) as (data_from, _):
-                    if data_from.materials:
-                        icon_name = 'MATERIAL'
-                    elif data_from.node_groups:
-                        icon_name = 'NODETREE'
-            except:
-                pass
-            
-            row.label(text=item.name, icon=icon_name)
+            icon_name = ASSET_TYPE_ICONS.get(item.asset_type, DEFAULT_ASSET_ICON)
+            # En la lista solo se muestran las miniaturas existentes: generarlas al desplazarse
+            # abriría con bpy cada asset visible
+            icon_value = asset_preview_icon(data, item, generate=False)
+            if icon_value:
+                row.label(text=item.name, icon_value=icon_value)
+            else:
+                row.label(text=item.name, icon=icon_name)
             
             op = row.operator("asset.delete_from_library", text="", icon='TRASH', emboss=False)
             if op:
                 op.asset_name = item.name
                 op.asset_index = index
+                op.asset_filepath = item.filepath
 
         elif self.layout_type in {'GRID'}:
             layout.alignment = 'CENTER'
-            layout.label(text=item.name)
+            icon_value = asset_preview_icon(data, item)
+            if icon_value:
+                layout.template_icon(icon_value=icon_value, scale=4.0)
+                layout.label(text=item.name)
+            else:
+                layout.label(text=item.name, icon=ASSET_TYPE_ICONS.get(item.asset_type, DEFAULT_ASSET_ICON))
+
+class ASSET_LIBRARY_UL_categories(UIList):
+    """Árbol de categorías (subcarpetas) de la biblioteca"""
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        for _ in range(item.depth):
+            row.label(text="", icon='BLANK1')
+        op = row.operator(
+            "asset.toggle_category", text="", emboss=False,
+            icon='DISCLOSURE_TRI_DOWN' if item.is_expanded else 'DISCLOSURE_TRI_RIGHT',
+        )
+        if op:
+            op.category_path = item.path
+        row.label(text=item.name, icon='FILE_FOLDER')
+        row.label(text=str(item.asset_count))
 
 class ASSET_LIBRARY_PT_main(Panel):
     bl_label = "Biblioteca de Assets"
@@ -400,48 +2097,177 @@ class ASSET_LIBRARY_PT_main(Panel):
     bl_category = 'Asset Library'
 
     def draw(self, context):
-        layout = self.layout
-        scene = context.scene
-        library_props = scene.asset_library
+        with diagnostics.span("ui.draw_panel", frequent=True):
+            layout = self.layout
+            scene = context.scene
+            library_props = scene.asset_library
 
-        row = layout.row()
-        row.prop(library_props, "library_path", text="")
+            row = layout.row()
+            row.prop(library_props, "library_path", text="")
         
-        row = layout.row(align=True)
-        row.prop(library_props, "search_term", text="", icon='VIEWZOOM')
-        row.operator("asset.refresh_library", text="", icon='FILE_REFRESH')
+            row = layout.row(align=True)
+            row.prop(library_props, "search_term", text="", icon='VIEWZOOM')
+            row.prop(library_props, "type_filter", text="", icon_only=True)
+            row.prop(library_props, "display_mode", text="", expand=True, icon_only=True)
+            row.operator("asset.refresh_library", text="", icon='FILE_REFRESH')
         
-        row = layout.row(align=True)
-        row.prop(library_props, "select_all", text="Seleccionar Todo")
-        row.operator("asset.delete_selected", text="", icon='TRASH')
+            row = layout.row(align=True)
+            row.prop(library_props, "select_all", text="Seleccionar Todo")
+            row.operator("asset.delete_selected", text="", icon='TRASH')
+        
+            if library_props.categories:
+                row = layout.row()
+                row.template_list("ASSET_LIBRARY_UL_categories", "", library_props, "categories",
+                                  library_props, "active_category_index", rows=3)
+        
+            row = layout.row()
+            row.template_list("ASSET_LIBRARY_UL_items", "", library_props, "assets", library_props, "active_asset_index",
+                              type='GRID' if library_props.display_mode == 'GRID' else 'DEFAULT', columns=3)
         
-        row = layout.row()
-        row.template_list("ASSET_LIBRARY_UL_items", "", library_props, "assets", library_props, "active_asset_index")
+            scan = get_active_scan(library_props.library_path)
+            if scan is not None:
+                row = layout.row(align=True)
+                row.progress(factor=scan.progress, type='BAR', text=f"Escaneando {scan.completed}/{scan.total}")
+                row.operator("asset.cancel_scan", text="", icon='CANCEL')
 
-        box = layout.box()
-        box.label(text="Guardar Asset")
-        row = box.row()
-        row.operator("asset.save_to_library", text="Guardar Seleccionado", icon='EXPORT')
+            box = layout.box()
+            box.label(text="Guardar Asset")
+            row = box.row(align=True)
+            row.operator("asset.save_to_library", text="Guardar Seleccionado", icon='EXPORT')
+            row.operator("asset.save_batch", text="", icon='DOCUMENTS')
+            row = box.row(align=True)
+            row.prop(library_props, "compress_assets")
+            row.prop(library_props, "use_texture_store")
+            row.operator("asset.verify_texture_store", text="", icon='CHECKMARK')
+            row = box.row()
+            row.prop(library_props, "write_geometry_cache")
 
-        box = layout.box()
-        box.label(text="Cargar Asset")
+            box = layout.box()
+            box.label(text="Cargar Asset")
+        
+            row = box.row()
+            row.prop(library_props, "load_mode", text="Modo")
         
-        row = box.row()
-        row.prop(library_props, "load_mode", text="Modo")
+            row = box.row()
+            row.prop(library_props, "force_mode", text="Forzar")
+        
+            row = box.row()
+            row.prop(library_props, "arrange_mode", text="Organización")
         
-        row = box.row()
-        row.prop(library_props, "force_mode", text="Forzar")
+            if library_props.arrange_mode == 'ROW' or (library_props.use_instancing and library_props.instance_count > 1):
+                row = box.row()
+                row.prop(library_props, "spacing", text="Espaciado")
         
-        row = box.row()
-        row.prop(library_props, "arrange_mode", text="Organización")
+            if library_props.load_mode == 'COLLECTION':
+                row = box.row(align=True)
+                row.prop(library_props, "link_assets")
+                sub = row.row(align=True)
+                sub.active = library_props.link_assets
+                sub.prop(library_props, "use_overrides")
         
-        if library_props.arrange_mode == 'ROW':
+            if library_props.load_mode in {'COLLECTION', 'MESH'}:
+                row = box.row(align=True)
+                row.prop(library_props, "use_instancing")
+                sub = row.row(align=True)
+                sub.active = library_props.use_instancing
+                sub.prop(library_props, "instance_count")
+        
+            row = box.row(align=True)
+            row.prop(library_props, "use_local_cache")
+            sub = row.row(align=True)
+            sub.active = library_props.use_local_cache
+            sub.prop(library_props, "local_cache_size", text="MB")
+            sub.operator("asset.clear_local_cache", text="", icon='TRASH')
+            if library_props.use_local_cache:
+                row = box.row()
+                row.prop(library_props, "local_cache_path", text="")
+            
             row = box.row()
-            row.prop(library_props, "spacing", text="Espaciado")
+            row.scale_y = 1.5
+            row.operator("asset.load_from_library", text="Cargar Seleccionados", icon='IMPORT')
+
+class ASSET_LIBRARY_PT_diagnostics(Panel):
+    bl_label = "Diagnóstico"
+    bl_idname = "ASSET_LIBRARY_PT_diagnostics"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Asset Library'
+    bl_parent_id = "ASSET_LIBRARY_PT_main"
+    bl_options = {'DEFAULT_CLOSED'}
+    
+    def draw_header(self, context):
+        self.layout.prop(context.scene.asset_library, "record_diagnostics", text="")
+    
+    def draw(self, context):
+        layout = self.layout
+        recorder = diagnostics.recorder
+        
+        row = layout.row(align=True)
+        row.label(text=f"{len(recorder.events)}/{recorder.events.maxlen} eventos")
+        row.operator("asset.export_diagnostics", text="", icon='FILE_TEXT').format = 'JSON'
+        row.operator("asset.export_diagnostics", text="", icon='SEQ_HISTOGRAM').format = 'CHROME'
+        row.operator("asset.clear_diagnostics", text="", icon='TRASH')
         
-        row = box.row()
-        row.scale_y = 1.5
-        row.operator("asset.load_from_library", text="Cargar Seleccionados", icon='IMPORT')
+        summary = recorder.summary()[:DIAGNOSTICS_PANEL_ROWS]
+        if not summary:
+            return
+        col = layout.column(align=True)
+        table = [("Operación", "N", "Mediana ms", "Máx ms", "Archivos", "MB")]
+        for stats in summary:
+            counters = stats["counters"]
+            table.append((
+                stats["name"], str(stats["count"]), f"{stats['p50_ms']:.1f}", f"{stats['max_ms']:.1f}",
+                str(counters.get("files", 0)), f"{counters.get('bytes_read', 0) / (1024 * 1024):.1f}",
+            ))
+        for name, *values in table:
+            split = col.split(factor=0.4)
+            split.label(text=name)
+            row = split.row(align=True)
+            for value in values:
+                row.label(text=value)
+
+class ASSET_LIBRARY_OT_export_diagnostics(Operator):
+    bl_idname = "asset.export_diagnostics"
+    bl_label = "Exportar Diagnóstico"
+    bl_description = "Guarda los tiempos registrados en JSON o como traza de Chrome (chrome://tracing, Perfetto)"
+    
+    filepath: StringProperty(subtype='FILE_PATH')
+    format: EnumProperty(
+        name="Formato",
+        items=[
+            ('JSON', "JSON", "Eventos y resumen por operación"),
+            ('CHROME', "Traza de Chrome", "Formato Trace Event para chrome://tracing o Perfetto"),
+        ],
+        default='JSON'
+    )
+    
+    def invoke(self, context, event):
+        if not self.filepath:
+            name = "asset_manager_trace.json" if self.format == 'CHROME' else "asset_manager_diagnostics.json"
+            self.filepath = os.path.join(os.path.dirname(bpy.data.filepath) or os.path.expanduser("~"), name)
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def execute(self, context):
+        try:
+            if self.format == 'CHROME':
+                diagnostics.recorder.export_chrome_trace(self.filepath)
+            else:
+                diagnostics.recorder.export_json(self.filepath)
+            self.report({'INFO'}, f"Diagnóstico guardado en '{self.filepath}'")
+            return {'FINISHED'}
+        except Exception as e:
+            self.report({'ERROR'}, f"Error al exportar el diagnóstico: {str(e)}")
+            return {'CANCELLED'}
+
+class ASSET_LIBRARY_OT_clear_diagnostics(Operator):
+    bl_idname = "asset.clear_diagnostics"
+    bl_label = "Vaciar Diagnóstico"
+    bl_description = "Descarta los tiempos registrados"
+    
+    def execute(self, context):
+        diagnostics.recorder.clear()
+        return {'FINISHED'}
 
 class ASSET_LIBRARY_OT_refresh_library(Operator):
     bl_idname = "asset.refresh_library"
@@ -457,6 +2283,102 @@ class ASSET_LIBRARY_OT_refresh_library(Operator):
             self.report({'ERROR'}, f"Error al actualizar la lista: {str(e)}")
             return {'CANCELLED'}
 
+class ASSET_LIBRARY_OT_clear_local_cache(Operator):
+    bl_idname = "asset.clear_local_cache"
+    bl_label = "Vaciar Caché Local"
+    bl_description = "Borra las copias locales de los archivos de la biblioteca"
+    
+    def execute(self, context):
+        cache = get_local_cache(context.scene.asset_library)
+        if cache is None:
+            self.report({'ERROR'}, "La caché local no está activada")
+            return {'CANCELLED'}
+        try:
+            count, size = cache.usage()
+            cache.clear()
+            remaining_count, remaining_size = cache.usage()
+            count -= remaining_count
+            size -= remaining_size
+            self.report({'INFO'}, f"Se eliminaron {count} copias locales ({size / (1024 * 1024):.1f} MB)")
+            return {'FINISHED'}
+        except Exception as e:
+            self.report({'ERROR'}, f"Error al vaciar la caché local: {str(e)}")
+            return {'CANCELLED'}
+
+class ASSET_LIBRARY_OT_toggle_category(Operator):
+    bl_idname = "asset.toggle_category"
+    bl_label = "Desplegar Categoría"
+    bl_description = "Muestra u oculta los assets y subcarpetas de la categoría"
+    
+    category_path: StringProperty()
+    
+    def execute(self, context):
+        library_props = context.scene.asset_library
+        i = library_props.find_category(self.category_path)
+        if i < 0:
+            return {'CANCELLED'}
+        try:
+            if library_props.categories[i].is_expanded:
+                library_props.collapse_category(i)
+            else:
+                library_props.expand_category(context, i)
+        except OSError as e:
+            self.report({'ERROR'}, f"Error al leer la categoría: {str(e)}")
+            return {'CANCELLED'}
+        library_props.active_category_index = library_props.find_category(self.category_path)
+        return {'FINISHED'}
+
+class ASSET_LIBRARY_OT_cancel_scan(Operator):
+    bl_idname = "asset.cancel_scan"
+    bl_label = "Cancelar Escaneo"
+    bl_description = "Detiene el escaneo en segundo plano de la biblioteca"
+    
+    def execute(self, context):
+        if get_active_scan() is None:
+            return {'CANCELLED'}
+        cancel_library_scan()
+        self.report({'INFO'}, "Escaneo cancelado")
+        return {'FINISHED'}
+
+class ASSET_LIBRARY_OT_verify_texture_store(Operator):
+    bl_idname = "asset.verify_texture_store"
+    bl_label = "Verificar Almacén de Texturas"
+    bl_description = "Comprueba las texturas del almacén compartido y elimina las que no usa ningún asset"
+    
+    remove_unreferenced: BoolProperty(name="Eliminar no referenciadas", description="Borrar las texturas que no usa ningún asset", default=False)
+    check_hashes: BoolProperty(name="Comprobar contenido", description="Recalcular el hash de cada textura para detectar archivos corruptos", default=False)
+    
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def execute(self, context):
+        library_props = context.scene.asset_library
+        if not library_props.library_path or not os.path.isdir(library_props.library_path):
+            self.report({'ERROR'}, "No se ha seleccionado una carpeta de biblioteca")
+            return {'CANCELLED'}
+        
+        try:
+            report = texture_store.verify_store(library_props.library_path, check_hashes=self.check_hashes)
+            for asset_path, image_path in report.missing:
+                print(f"Asset Manager: '{asset_path}' referencia una textura que falta: {image_path}")
+            for path in report.corrupt:
+                print(f"Asset Manager: textura corrupta en el almacén: {path}")
+            
+            if self.remove_unreferenced:
+                if not report.safe_to_collect:
+                    self.report({'ERROR'}, f"No se eliminó nada: {len(report.unreadable)} assets no se pudieron leer")
+                    return {'CANCELLED'}
+                texture_store.collect_garbage(library_props.library_path, report)
+                self.report({'INFO'}, f"Se eliminaron {len(report.unreferenced)} texturas no referenciadas "
+                                      f"({report.removed_bytes / (1024 * 1024):.1f} MB)")
+            else:
+                self.report({'INFO'}, f"{len(report.stored)} texturas, {len(report.unreferenced)} sin referenciar, "
+                                      f"{len(report.missing)} referencias rotas, {len(report.corrupt)} corruptas")
+            return {'FINISHED'}
+        except Exception as e:
+            self.report({'ERROR'}, f"Error al verificar el almacén de texturas: {str(e)}")
+            return {'CANCELLED'}
+
 class ASSET_LIBRARY_OT_delete_selected(Operator):
     bl_idname = "asset.delete_selected"
     bl_label = "Eliminar Seleccionados"
@@ -474,14 +2396,14 @@ class ASSET_LIBRARY_OT_delete_selected(Operator):
         deleted_count = 0
         
         try:
-            assets_to_delete = [asset for asset in library_props.assets if asset.is_selected]
+            filepaths = [asset.filepath for asset in library_props.assets if asset.is_selected]
             
-            for asset in assets_to_delete:
-                if os.path.exists(asset.filepath):
-                    os.remove(asset.filepath)
+            for filepath in filepaths:
+                if os.path.exists(filepath):
+                    AssetManager.delete_asset_file(library_props.library_path, filepath)
                     deleted_count += 1
             
-            library_props.load_assets(context)
+            library_props.refresh_asset_files(filepaths)
             
             if deleted_count > 0:
                 self.report({'INFO'}, f"Se eliminaron {deleted_count} assets")
@@ -518,27 +2440,55 @@ class ASSET_LIBRARY_OT_deselect_all(Operator):
 
 classes = (
     AssetItem,
+    AssetCategory,
     ASSET_LIBRARY_Properties,
     ASSET_LIBRARY_OT_save_asset,
+    ASSET_LIBRARY_OT_save_batch,
     ASSET_LIBRARY_OT_load_asset,
     ASSET_LIBRARY_OT_delete_asset,
     ASSET_LIBRARY_UL_items,
+    ASSET_LIBRARY_UL_categories,
     ASSET_LIBRARY_PT_main,
+    ASSET_LIBRARY_PT_diagnostics,
     ASSET_LIBRARY_OT_select_all,
     ASSET_LIBRARY_OT_deselect_all,
     ASSET_LIBRARY_OT_refresh_library,
+    ASSET_LIBRARY_OT_toggle_category,
+    ASSET_LIBRARY_OT_clear_local_cache,
+    ASSET_LIBRARY_OT_cancel_scan,
+    ASSET_LIBRARY_OT_verify_texture_store,
     ASSET_LIBRARY_OT_delete_selected,
+    ASSET_LIBRARY_OT_export_diagnostics,
+    ASSET_LIBRARY_OT_clear_diagnostics,
 )
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.asset_library = bpy.props.PointerProperty(type=ASSET_LIBRARY_Properties)
+    bpy.app.timers.register(_library_watch_timer, first_interval=WATCH_INTERVAL, persistent=True)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(_clear_search_indexes)
 
 def unregister():
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if _clear_search_indexes in handlers:
+            handlers.remove(_clear_search_indexes)
+    if bpy.app.timers.is_registered(_library_watch_timer):
+        bpy.app.timers.unregister(_library_watch_timer)
+    cancel_library_scan()
+    stop_thumbnail_jobs()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.asset_library
+    for index in _library_indexes.values():
+        index.close()
+    _library_indexes.clear()
+    _search_indexes.clear()
+    _library_snapshots.clear()
+    for cache in _local_caches.values():
+        cache.close()
+    _local_caches.clear()
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""Micro-benchmark de AssetManager.calculate_layout.
+
+Compara el bucle original en Python (matriz por esquina y min/max por eje) con la versión
+vectorizada con NumPy sobre una selección de muchos objetos dispersos.
+
+    blender -b --factory-startup --python benchmarks/bench_bounds.py -- --objects 10000
+"""
+import os
+import random
+import sys
+
+import bpy
+from mathutils import Vector
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+
+def legacy_calculate_bounds(selected_objects):
+    """Implementación original, objeto a objeto y esquina a esquina"""
+    min_co = Vector((float('inf'),) * 3)
+    max_co = Vector((float('-inf'),) * 3)
+    for obj in selected_objects:
+        for v in obj.bound_box:
+            world_co = obj.matrix_world @ Vector(v)
+            min_co.x = min(min_co.x, world_co.x)
+            min_co.y = min(min_co.y, world_co.y)
+            min_co.z = min(min_co.z, world_co.z)
+            max_co.x = max(max_co.x, world_co.x)
+            max_co.y = max(max_co.y, world_co.y)
+            max_co.z = max(max_co.z, world_co.z)
+    return min_co, max_co
+
+
+def legacy_layout(selected_objects):
+    min_co, max_co = legacy_calculate_bounds(selected_objects)
+    center = (min_co + max_co) / 2
+    return min_co, max_co, {obj.name: obj.matrix_world.translation - center for obj in selected_objects}
+
+
+def build_scene(count, seed):
+    random.seed(seed)
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    mesh = bpy.data.meshes.new("bench_mesh")
+    mesh.from_pydata([(-1, -1, 0), (1, -1, 0), (1, 1, 2), (-1, 1, 2)], [], [(0, 1, 2, 3)])
+    collection = bpy.context.scene.collection
+    objects = []
+    for i in range(count):
+        obj = bpy.data.objects.new(f"scatter_{i:05d}", mesh)
+        obj.location = (random.uniform(-500, 500), random.uniform(-500, 500), random.uniform(0, 20))
+        obj.rotation_euler = (0, 0, random.uniform(0, 6.28))
+        obj.scale = (random.uniform(0.5, 2.0),) * 3
+        collection.objects.link(obj)
+        objects.append(obj)
+    bpy.context.view_layer.update()
+    return objects
+
+
+def main():
+    parser = common.new_parser(__doc__)
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = common.parse_args(parser)
+
+    objects = build_scene(args.objects, args.seed)
+    addon = common.load_addon()
+
+    legacy_time, (legacy_min, legacy_max, legacy_positions) = common.best_of(lambda: legacy_layout(objects), args.repeat)
+    numpy_time, (min_co, max_co, offsets) = common.best_of(lambda: addon.AssetManager.calculate_layout(objects), args.repeat)
+
+    error = max((legacy_min - min_co).length, (legacy_max - max_co).length)
+    for obj, offset in zip(objects, offsets):
+        error = max(error, (legacy_positions[obj.name] - Vector(offset)).length)
+
+    print(f"objetos: {len(objects)}")
+    print(f"bucle original: {legacy_time * 1000:.2f} ms")
+    print(f"numpy:          {numpy_time * 1000:.2f} ms ({legacy_time / numpy_time:.1f}x)")
+    print(f"diferencia máxima: {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
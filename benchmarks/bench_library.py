@@ -0,0 +1,236 @@
+"""Benchmark de guardado, escaneo, carga y redibujado de la biblioteca.
+
+Genera una biblioteca sintética (mallas, materiales con texturas, geometry nodes y assets de
+varios objetos) con y sin compresión, y mide cada fase. Los resultados se escriben en JSON
+para compararlos entre ejecuciones con ``benchmarks/compare.py``.
+
+    blender -b --factory-startup --python benchmarks/bench_library.py -- \\
+        --assets 200 --output resultados.json
+"""
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+import synthetic
+
+LOAD_MODES = ('COLLECTION', 'MATERIAL', 'NODES', 'MESH')
+
+
+def summarize(name, samples, **params):
+    """Resumen de una serie de tiempos en segundos"""
+    ordered = sorted(samples)
+    return {
+        "name": name,
+        "params": params,
+        "count": len(samples),
+        "total_s": sum(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": ordered[len(ordered) // 2] * 1000 if samples else 0.0,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000 if samples else 0.0,
+        "min_ms": ordered[0] * 1000 if samples else 0.0,
+    }
+
+
+def library_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def snapshot_ids():
+    return {block.as_pointer() for collection in (
+        bpy.data.objects, bpy.data.meshes, bpy.data.materials, bpy.data.node_groups,
+        bpy.data.images, bpy.data.collections,
+    ) for block in collection}
+
+
+def remove_new_ids(before):
+    new_ids = [block for collection in (
+        bpy.data.objects, bpy.data.meshes, bpy.data.materials, bpy.data.node_groups,
+        bpy.data.images, bpy.data.collections,
+    ) for block in collection if block.as_pointer() not in before]
+    bpy.data.batch_remove(new_ids)
+
+
+class _StubLayout:
+    """Layout mínimo para llamar a draw_item fuera de una región de la interfaz"""
+
+    alignment = 'EXPAND'
+    scale_y = 1.0
+
+    def row(self, **kwargs):
+        return self
+
+    def prop(self, *args, **kwargs):
+        pass
+
+    def label(self, *args, **kwargs):
+        pass
+
+    def operator(self, *args, **kwargs):
+        return None
+
+
+class _StubList:
+    layout_type = 'DEFAULT'
+    bitflag_filter_item = 1 << 30
+
+
+def bench_scan(addon, library_props, repeat):
+    results = []
+    index_dir = os.path.join(library_props.library_path, addon.library_index.INDEX_DIRNAME)
+    library_props.background_scan = False
+
+    cold = []
+    for _ in range(repeat):
+        for index in addon._library_indexes.values():
+            index.close()
+        addon._library_indexes.clear()
+        shutil.rmtree(index_dir, ignore_errors=True)
+        start = time.perf_counter()
+        library_props.load_assets(bpy.context)
+        cold.append(time.perf_counter() - start)
+    results.append(summarize("scan", cold, index="cold", assets=len(library_props.assets)))
+
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        library_props.load_assets(bpy.context)
+        warm.append(time.perf_counter() - start)
+    results.append(summarize("scan", warm, index="warm", assets=len(library_props.assets)))
+    return results
+
+
+def bench_load(library_props, batch, repeat):
+    results = []
+    assets = list(library_props.assets)
+    for mode in LOAD_MODES:
+        library_props.load_mode = mode
+        samples = []
+        for run in range(repeat):
+            before = snapshot_ids()
+            bpy.ops.mesh.primitive_plane_add()
+            target = bpy.context.active_object
+            synthetic.select_only([target])
+            for asset in library_props.assets:
+                asset.is_selected = False
+            for asset in assets[run * batch % len(assets):][:batch]:
+                asset.is_selected = True
+            start = time.perf_counter()
+            bpy.ops.asset.load_from_library()
+            samples.append(time.perf_counter() - start)
+            remove_new_ids(before)
+        results.append(summarize("load", samples, mode=mode, batch=batch))
+    return results
+
+
+def bench_redraw(addon, library_props, repeat):
+    ui_list = addon.ASSET_LIBRARY_UL_items
+    stub, layout = _StubList(), _StubLayout()
+    items = library_props.assets
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for index, item in enumerate(items):
+            ui_list.draw_item(stub, bpy.context, layout, library_props, item, 0, library_props, "active_asset_index", index)
+        samples.append(time.perf_counter() - start)
+    results = [summarize("redraw", samples, rows=len(items))]
+
+    samples = []
+    for run in range(repeat):
+        library_props.search_term = f"mesh_{run:03d}"
+        ui_list._filter_cache = None
+        start = time.perf_counter()
+        ui_list.filter_items(stub, bpy.context, library_props, "assets")
+        samples.append(time.perf_counter() - start)
+    library_props.search_term = ""
+    results.append(summarize("filter", samples, rows=len(items)))
+    return results
+
+
+def main():
+    parser = common.new_parser(__doc__)
+    parser.add_argument("--assets", type=int, default=100, help="número de assets a generar")
+    parser.add_argument("--output", default="", help="archivo JSON de resultados")
+    parser.add_argument("--library", default="", help="carpeta donde generar las bibliotecas (temporal por defecto)")
+    parser.add_argument("--compress", choices=("both", "on", "off"), default="both")
+    parser.add_argument("--texture-size", type=int, default=256)
+    parser.add_argument("--subdivisions", type=int, default=3)
+    parser.add_argument("--shared-materials", type=int, default=0,
+                        help="reutilizar N materiales entre los assets de material")
+    parser.add_argument("--load-batch", type=int, default=10, help="assets cargados por operación")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="no borrar las bibliotecas generadas")
+    args = common.parse_args(parser)
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    addon = common.load_addon()
+    library_props = bpy.context.scene.asset_library
+    root = args.library or tempfile.mkdtemp(prefix="asset_manager_bench_")
+    compress_values = {"both": (True, False), "on": (True,), "off": (False,)}[args.compress]
+
+    report = {
+        "meta": {
+            "blender": bpy.app.version_string,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "assets": args.assets,
+            "texture_size": args.texture_size,
+            "subdivisions": args.subdivisions,
+            "shared_materials": args.shared_materials,
+            "load_batch": args.load_batch,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+
+    try:
+        for compress in compress_values:
+            library_path = os.path.join(root, "compressed" if compress else "uncompressed")
+            os.makedirs(library_path, exist_ok=True)
+            library_props.compress_assets = compress
+            library_props.background_scan = False
+            library_props.library_path = library_path
+
+            timings = synthetic.generate_library(
+                addon, library_props, args.assets, seed=args.seed, texture_size=args.texture_size,
+                subdivisions=args.subdivisions, shared_material_count=args.shared_materials,
+            )
+            for kind, samples in timings.items():
+                report["results"].append(summarize("save", samples, kind=kind, compress=compress))
+            report["results"].append({
+                "name": "library_size", "params": {"compress": compress}, "bytes": library_size(library_path),
+            })
+
+            for result in bench_scan(addon, library_props, args.repeat):
+                result["params"]["compress"] = compress
+                report["results"].append(result)
+            for result in bench_load(library_props, args.load_batch, args.repeat):
+                result["params"]["compress"] = compress
+                report["results"].append(result)
+            for result in bench_redraw(addon, library_props, args.repeat):
+                result["params"]["compress"] = compress
+                report["results"].append(result)
+    finally:
+        if not args.keep and not args.library:
+            shutil.rmtree(root, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
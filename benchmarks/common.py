@@ -0,0 +1,49 @@
+"""Utilidades compartidas por los benchmarks del addon.
+
+Los benchmarks se ejecutan con ``blender -b --factory-startup --python <script> -- [args]``
+y cargan el addon directamente desde esta copia del repositorio.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_MODULE = "asset_manager_bench"
+
+
+def load_addon():
+    """Importa y registra el addon desde la carpeta del repositorio"""
+    module = sys.modules.get(ADDON_MODULE)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(
+        ADDON_MODULE, os.path.join(ADDON_DIR, "__init__.py"), submodule_search_locations=[ADDON_DIR]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_MODULE] = module
+    spec.loader.exec_module(module)
+    module.register()
+    return module
+
+
+def parse_args(parser):
+    """Parsea solo los argumentos que van después de ``--`` en la línea de Blender"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    return parser.parse_args(argv)
+
+
+def new_parser(description):
+    return argparse.ArgumentParser(description=description)
+
+
+def best_of(function, repeat):
+    """Ejecuta la función ``repeat`` veces y devuelve (mejor tiempo en segundos, último resultado)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
@@ -0,0 +1,52 @@
+"""Compara dos archivos de resultados de bench_library.py.
+
+No necesita Blender:
+
+    python benchmarks/compare.py antes.json despues.json
+"""
+import argparse
+import json
+
+
+def _key(result):
+    return result["name"], tuple(sorted(result.get("params", {}).items()))
+
+
+def _value(result):
+    if "bytes" in result:
+        return result["bytes"], "bytes"
+    return result["p50_ms"], "ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=5.0,
+                        help="porcentaje a partir del cual un cambio se marca como mejora/regresión")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = {_key(r): r for r in json.load(f)["results"]}
+
+    for key in sorted(baseline.keys() & candidate.keys(), key=str):
+        before, unit = _value(baseline[key])
+        after, _ = _value(candidate[key])
+        change = (after - before) / before * 100 if before else 0.0
+        mark = ""
+        if change <= -args.threshold:
+            mark = "mejora"
+        elif change >= args.threshold:
+            mark = "REGRESIÓN"
+        name, params = key
+        label = name + " " + " ".join(f"{k}={v}" for k, v in params)
+        print(f"{label:<60} {before:>12.2f} {after:>12.2f} {unit:<5} {change:+7.1f}% {mark}")
+
+    for key in sorted(baseline.keys() ^ candidate.keys(), key=str):
+        print(f"{key[0]} {dict(key[1])}: solo en uno de los archivos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Generador de bibliotecas sintéticas para los benchmarks.
+
+Crea en la escena actual objetos representativos de los assets reales (mallas, materiales
+con texturas de imagen, assets de geometry nodes y assets de varios objetos) y los guarda
+en la biblioteca con ``AssetManager.save_asset``.
+"""
+import math
+import random
+import time
+
+import bpy
+
+ASSET_KINDS = ('mesh', 'material', 'geonodes', 'multi')
+
+
+def _new_mesh(name, subdivisions):
+    bpy.ops.mesh.primitive_ico_sphere_add(subdivisions=subdivisions, radius=1.0)
+    obj = bpy.context.active_object
+    obj.name = name
+    obj.data.name = name
+    return obj
+
+
+def _new_image(name, size, rng):
+    image = bpy.data.images.new(name, width=size, height=size)
+    color = [rng.random(), rng.random(), rng.random(), 1.0]
+    image.pixels.foreach_set(color * (size * size))
+    image.pack()
+    return image
+
+
+def _new_material(name, image):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    texture = nodes.new('ShaderNodeTexImage')
+    texture.image = image
+    bsdf = nodes.get("Principled BSDF")
+    material.node_tree.links.new(texture.outputs['Color'], bsdf.inputs['Base Color'])
+    return material
+
+
+def _new_geometry_nodes(name):
+    group = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+    group.is_modifier = True
+    group.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    group.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    group_in = group.nodes.new('NodeGroupInput')
+    group_out = group.nodes.new('NodeGroupOutput')
+    subdivide = group.nodes.new('GeometryNodeSubdivideMesh')
+    group.links.new(group_in.outputs[0], subdivide.inputs['Mesh'])
+    group.links.new(subdivide.outputs['Mesh'], group_out.inputs[0])
+    return group
+
+
+def clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in (bpy.data.meshes, bpy.data.materials, bpy.data.images, bpy.data.node_groups):
+        for block in list(collection):
+            collection.remove(block)
+
+
+def select_only(objects):
+    for obj in bpy.context.view_layer.objects:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    bpy.context.view_layer.objects.active = objects[0]
+
+
+def build_asset(kind, index, rng, texture_size=256, subdivisions=3, shared_materials=None):
+    """Crea en la escena los objetos de un asset del tipo indicado y los devuelve"""
+    name = f"{kind}_{index:05d}"
+    if kind == 'mesh':
+        return [_new_mesh(name, subdivisions)]
+
+    if kind == 'material':
+        obj = _new_mesh(name, subdivisions)
+        if shared_materials:
+            material = shared_materials[index % len(shared_materials)]
+        else:
+            material = _new_material(name, _new_image(name, texture_size, rng))
+        obj.data.materials.append(material)
+        return [obj]
+
+    if kind == 'geonodes':
+        obj = _new_mesh(name, max(1, subdivisions - 1))
+        modifier = obj.modifiers.new("GeometryNodes", 'NODES')
+        modifier.node_group = _new_geometry_nodes(name)
+        return [obj]
+
+    if kind == 'multi':
+        objects = []
+        for part in range(rng.randint(3, 8)):
+            obj = _new_mesh(f"{name}_part{part}", max(1, subdivisions - 1))
+            angle = part * 2 * math.pi / 8
+            obj.location = (math.cos(angle) * 3, math.sin(angle) * 3, rng.uniform(0, 2))
+            objects.append(obj)
+        return objects
+
+    raise ValueError(f"tipo de asset desconocido: {kind}")
+
+
+def generate_library(addon, library_props, count, seed=0, texture_size=256, subdivisions=3, shared_material_count=0):
+    """Genera ``count`` assets en la biblioteca y devuelve los tiempos de guardado por tipo"""
+    rng = random.Random(seed)
+    shared_materials = [
+        _new_material(f"shared_{i:03d}", _new_image(f"shared_{i:03d}", texture_size, rng))
+        for i in range(shared_material_count)
+    ]
+    for material in shared_materials:
+        material.use_fake_user = True
+    timings = {kind: [] for kind in ASSET_KINDS}
+    for index in range(count):
+        kind = ASSET_KINDS[index % len(ASSET_KINDS)]
+        objects = build_asset(kind, index, rng, texture_size, subdivisions, shared_materials)
+        select_only(objects)
+        start = time.perf_counter()
+        result, message = addon.AssetManager.save_asset(bpy.context, library_props)
+        timings[kind].append(time.perf_counter() - start)
+        if 'FINISHED' not in result:
+            raise RuntimeError(message)
+        for obj in objects:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        bpy.data.orphans_purge(do_recursive=True)
+    return timings
@@ -0,0 +1,327 @@
+"""Lector de archivos .blend en Python puro.
+
+Recorre la cabecera y los bloques (BHead) de un archivo .blend sin usar bpy, para poder
+clasificar assets desde hilos o procesos de trabajo y fuera de Blender. Los archivos sin
+comprimir se leen con mmap saltando directamente de cabecera en cabecera; los comprimidos
+con gzip o zstd (los que genera ``bpy.data.libraries.write(..., compress=True)``) se
+descomprimen en streaming sin cargar el archivo entero en memoria.
+
+Los nombres de los IDs (y la ruta de las imágenes) se leen usando el SDNA del propio
+archivo (bloque ``DNA1``), de modo que el lector no depende de la versión de Blender que
+escribió el archivo.
+"""
+import gzip
+import mmap
+import os
+import struct
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+BLEND_MAGIC = b'BLENDER'
+
+# Códigos de bloque de los IDs que interesan y su categoría en el índice
+BLOCK_CATEGORIES = {
+    'OB': 'objects',
+    'ME': 'meshes',
+    'MA': 'materials',
+    'NT': 'node_groups',
+    'IM': 'images',
+    'GR': 'collections',
+}
+
+# Bytes que se guardan del principio de cada ID para leer después su nombre; de las
+# imágenes se guarda más para llegar a su ruta
+ID_HEAD_SIZE = 512
+ID_HEAD_SIZES = {'IM': 4096}
+# Campos de struct que se localizan en el SDNA
+SDNA_FIELDS = (('ID', 'name'), ('Image', 'filepath'))
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Errores de descompresión o de datos truncados (por ejemplo, un archivo que otro usuario
+# aún está guardando); read_blend_info los convierte en BlendFileError
+_READ_ERRORS = (EOFError, zlib.error, gzip.BadGzipFile, struct.error, ValueError, IndexError)
+if zstandard is not None:
+    _READ_ERRORS += (zstandard.ZstdError,)
+
+
+class BlendFileError(Exception):
+    """El archivo no es un .blend válido o no se puede leer con este lector"""
+
+
+class BlendFileInfo:
+    """Resultado de escanear un archivo .blend"""
+
+    def __init__(self, path, version, pointer_size, little_endian, compression):
+        self.path = path
+        self.version = version
+        self.pointer_size = pointer_size
+        self.little_endian = little_endian
+        self.compression = compression
+        self.ids = []
+        self.image_paths = []
+        self.block_count = 0
+        self.bytes_read = 0
+
+    @property
+    def datablocks(self):
+        """Nombres de los IDs agrupados por categoría del índice"""
+        result = {category: [] for category in BLOCK_CATEGORIES.values()}
+        for code, name in self.ids:
+            category = BLOCK_CATEGORIES.get(code)
+            if category:
+                result[category].append(name)
+        for names in result.values():
+            names.sort()
+        return result
+
+
+class _Header:
+    """Formato de la cabecera del archivo y de sus BHead"""
+
+    def __init__(self, header):
+        if not header.startswith(BLEND_MAGIC):
+            raise BlendFileError("no es un archivo .blend")
+        if header[7:9].isdigit():
+            # Formato de Blender 5.0+: BLENDER17-01v0500
+            self.size = int(header[7:9])
+            if len(header) < self.size or header[9:10] != b'-' or header[10:12] != b'01':
+                raise BlendFileError("versión de cabecera .blend no soportada")
+            self.pointer_size = 8
+            endian = header[12:13]
+            self.version = int(header[13:17])
+            self.bhead_format = 'iQqq'
+            self.bhead_fields = ('sdna', 'old', 'len', 'nr')
+        else:
+            self.size = 12
+            self.pointer_size = {b'_': 4, b'-': 8}.get(header[7:8])
+            if self.pointer_size is None:
+                raise BlendFileError("tamaño de puntero desconocido")
+            endian = header[8:9]
+            self.version = int(header[9:12])
+            self.bhead_format = 'iIii' if self.pointer_size == 4 else 'iQii'
+            self.bhead_fields = ('len', 'old', 'sdna', 'nr')
+        if endian not in (b'v', b'V'):
+            raise BlendFileError("endianness desconocido")
+        self.little_endian = endian == b'v'
+        self.endian_prefix = '<' if self.little_endian else '>'
+        self.bhead = struct.Struct(self.endian_prefix + '4s' + self.bhead_format)
+
+    def unpack_bhead(self, data, offset=0):
+        values = self.bhead.unpack_from(data, offset)
+        code = values[0]
+        if code[:2] == b'\0\0':
+            # Códigos de ID de dos letras en archivos big-endian
+            code = code[2:] + code[:2]
+        fields = dict(zip(self.bhead_fields, values[1:]))
+        return code, fields['len']
+
+
+def _parse_sdna(data, endian_prefix, pointer_size):
+    """Devuelve {(struct, campo): (offset, tamaño)} de los campos de SDNA_FIELDS"""
+    def align4(pos):
+        return (pos + 3) & ~3
+
+    def read_int(pos):
+        return struct.unpack_from(endian_prefix + 'i', data, pos)[0]
+
+    def read_strings(pos, count):
+        strings = []
+        for _ in range(count):
+            end = data.index(b'\0', pos)
+            strings.append(data[pos:end].decode('latin-1'))
+            pos = end + 1
+        return strings, pos
+
+    if data[0:4] != b'SDNA' or data[4:8] != b'NAME':
+        raise BlendFileError("bloque DNA1 corrupto")
+    names, pos = read_strings(12, read_int(8))
+    pos = align4(pos)
+    if data[pos:pos + 4] != b'TYPE':
+        raise BlendFileError("bloque DNA1 corrupto")
+    types, pos = read_strings(pos + 8, read_int(pos + 4))
+    pos = align4(pos)
+    if data[pos:pos + 4] != b'TLEN':
+        raise BlendFileError("bloque DNA1 corrupto")
+    type_lengths = struct.unpack_from(f'{endian_prefix}{len(types)}h', data, pos + 4)
+    pos = align4(pos + 4 + 2 * len(types))
+    if data[pos:pos + 4] != b'STRC':
+        raise BlendFileError("bloque DNA1 corrupto")
+    struct_count = read_int(pos + 4)
+    pos += 8
+    short = struct.Struct(endian_prefix + 'hh')
+    wanted = {}
+    for struct_name, field_name in SDNA_FIELDS:
+        wanted.setdefault(struct_name, set()).add(field_name)
+    fields = {}
+    for _ in range(struct_count):
+        type_index, field_count = short.unpack_from(data, pos)
+        pos += 4
+        struct_name = types[type_index]
+        if struct_name not in wanted:
+            pos += 4 * field_count
+            continue
+        offset = 0
+        for field in range(field_count):
+            field_type, field_name = short.unpack_from(data, pos + 4 * field)
+            name = names[field_name]
+            array_size = 1
+            for dim in name.split('[')[1:]:
+                array_size *= int(dim.rstrip(']'))
+            if name.startswith('*') or name.startswith('(*'):
+                size = pointer_size * array_size
+            else:
+                size = type_lengths[field_type] * array_size
+            base_name = name.split('[')[0]
+            if base_name in wanted[struct_name]:
+                fields[(struct_name, base_name)] = (offset, size)
+            offset += size
+        pos += 4 * field_count
+    if ('ID', 'name') not in fields:
+        raise BlendFileError("el SDNA no contiene ID.name")
+    return fields
+
+
+def _decode_string(head, offset, size=None):
+    raw = head[offset:offset + size] if size else head[offset:]
+    end = raw.find(b'\0')
+    if end >= 0:
+        raw = raw[:end]
+    return raw.decode('utf-8', errors='replace')
+
+
+def _finish(info, header, id_heads, dna):
+    if dna is not None:
+        fields = _parse_sdna(dna, header.endian_prefix, header.pointer_size)
+    else:
+        # Sin SDNA se asume la disposición de ID de Blender 2.92 a 4.x
+        fields = {('ID', 'name'): (5 * header.pointer_size, 66)}
+    name_offset = fields[('ID', 'name')][0]
+    image_path = fields.get(('Image', 'filepath'))
+    for code, head in id_heads:
+        # Se salta el prefijo de dos letras del nombre (OBCube -> Cube)
+        name = _decode_string(head, name_offset + 2)
+        info.ids.append((code, name))
+        if code == 'IM' and image_path is not None:
+            info.image_paths.append((name, _decode_string(head, *image_path)))
+    return info
+
+
+def _is_id_code(code):
+    return code[2:] == b'\0\0' and code[:2].isalpha()
+
+
+def _scan_buffer(path, buffer, compression):
+    header = _Header(bytes(buffer[:17]))
+    info = BlendFileInfo(path, header.version, header.pointer_size, header.little_endian, compression)
+    offset = header.size
+    bhead_size = header.bhead.size
+    id_heads = []
+    dna = None
+    end = len(buffer)
+    while offset + bhead_size <= end:
+        code, length = header.unpack_bhead(buffer, offset)
+        offset += bhead_size
+        info.block_count += 1
+        if code == b'ENDB':
+            break
+        if length < 0 or offset + length > end:
+            raise BlendFileError("bloque truncado")
+        if _is_id_code(code):
+            id_code = code[:2].decode('ascii')
+            keep = min(length, ID_HEAD_SIZES.get(id_code, ID_HEAD_SIZE))
+            id_heads.append((id_code, bytes(buffer[offset:offset + keep])))
+        elif code == b'DNA1':
+            dna = bytes(buffer[offset:offset + length])
+        offset += length
+    info.bytes_read = offset
+    return _finish(info, header, id_heads, dna)
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise BlendFileError("archivo truncado")
+    return data
+
+
+def _skip(stream, size):
+    while size > 0:
+        chunk = stream.read(min(size, STREAM_CHUNK_SIZE))
+        if not chunk:
+            raise BlendFileError("archivo truncado")
+        size -= len(chunk)
+
+
+def _scan_stream(path, stream, compression):
+    head = stream.read(12)
+    if head[7:9].isdigit():
+        head += stream.read(int(head[7:9]) - 12)
+    header = _Header(head)
+    info = BlendFileInfo(path, header.version, header.pointer_size, header.little_endian, compression)
+    bhead_size = header.bhead.size
+    id_heads = []
+    dna = None
+    while True:
+        data = stream.read(bhead_size)
+        if len(data) < bhead_size:
+            break
+        code, length = header.unpack_bhead(data)
+        info.block_count += 1
+        if code == b'ENDB':
+            break
+        if length < 0:
+            raise BlendFileError("bloque corrupto")
+        if _is_id_code(code):
+            id_code = code[:2].decode('ascii')
+            keep = min(length, ID_HEAD_SIZES.get(id_code, ID_HEAD_SIZE))
+            id_heads.append((id_code, _read_exact(stream, keep)))
+            _skip(stream, length - keep)
+        elif code == b'DNA1':
+            dna = _read_exact(stream, length)
+        else:
+            _skip(stream, length)
+    return _finish(info, header, id_heads, dna)
+
+
+def read_blend_info(path):
+    """Escanea un archivo .blend y devuelve un BlendFileInfo con sus IDs
+
+    Lanza BlendFileError si el archivo no es un .blend válido, está truncado o usa una
+    compresión que no se puede leer en este entorno, y OSError si no se puede abrir.
+    """
+    try:
+        return _read_blend_info(path)
+    except _READ_ERRORS as e:
+        raise BlendFileError(f"archivo corrupto o incompleto: {type(e).__name__}: {e}") from e
+
+
+def _read_blend_info(path):
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+        f.seek(0)
+        if magic[:2] == GZIP_MAGIC:
+            with gzip.GzipFile(fileobj=f) as stream:
+                info = _scan_stream(path, stream, 'GZIP')
+                info.bytes_read = f.tell()
+            return info
+        if magic == ZSTD_MAGIC:
+            if zstandard is None:
+                raise BlendFileError("el módulo zstandard no está disponible")
+            reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+            with reader as stream:
+                info = _scan_stream(path, stream, 'ZSTD')
+                info.bytes_read = f.tell()
+            return info
+        if magic != BLEND_MAGIC[:4]:
+            raise BlendFileError("no es un archivo .blend")
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            raise BlendFileError("archivo vacío")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _scan_buffer(path, buffer, 'NONE')
@@ -0,0 +1,454 @@
+"""Línea de comandos para preparar bibliotecas sin interfaz.
+
+Reparte el trabajo entre varios procesos de Blender en segundo plano (``--jobs``) con una
+cola de trabajos; solo el proceso principal escribe en el índice de la biblioteca.
+
+    blender -b --factory-startup --python cli.py -- ingest FUENTES... --library BIBLIOTECA \\
+        [--group-by object|collection|file] [--category CARPETA] [--jobs N]
+    blender -b --factory-startup --python cli.py -- index rebuild --library BIBLIOTECA [--jobs N]
+    blender -b --factory-startup --python cli.py -- index verify --library BIBLIOTECA [--deep]
+
+``FUENTES`` pueden ser archivos .blend o carpetas, que se recorren recursivamente. Los
+assets se llaman ``<archivo de origen>_<objeto o colección>`` (o como el archivo de origen
+con ``--group-by file``), así que objetos con el mismo nombre en distintos archivos no se
+pisan. Al agrupar por objeto solo se importan jerarquías con geometría (no cámaras ni luces).
+"""
+import argparse
+import importlib.util
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import bpy
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_MODULE = "asset_manager_cli"
+# Prefijo de las líneas de resultado de los workers; el resto de la salida de Blender se ignora
+RESULT_PREFIX = "@@asset_manager@@ "
+PROGRESS_INTERVAL = 2.0
+# Tipos de objeto que pueden ser un asset por sí mismos al agrupar por objeto (sin cámaras ni luces)
+GEOMETRY_OBJECT_TYPES = {'MESH', 'CURVE', 'CURVES', 'SURFACE', 'META', 'FONT', 'POINTCLOUD', 'VOLUME',
+                         'GPENCIL', 'GREASEPENCIL'}
+
+
+def load_addon():
+    """Importa y registra el addon desde la carpeta de este archivo"""
+    module = sys.modules.get(ADDON_MODULE)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(
+        ADDON_MODULE, os.path.join(ADDON_DIR, "__init__.py"), submodule_search_locations=[ADDON_DIR]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_MODULE] = module
+    spec.loader.exec_module(module)
+    module.register()
+    return module
+
+
+class RecordingIndex:
+    """Sustituto del índice en los workers: recoge las entradas para enviarlas al proceso principal"""
+
+    def __init__(self):
+        self.entries = []
+
+    def upsert(self, filepath, mtime, size, asset_type, datablocks, bounds=None):
+        self.entries.append({
+            "path": filepath, "mtime": mtime, "size": size, "asset_type": asset_type,
+            "datablocks": datablocks, "bounds": list(bounds) if bounds else None,
+        })
+
+    def commit(self):
+        pass
+
+
+# --- Worker -----------------------------------------------------------------------------
+
+def ingest_file(addon, job):
+    """Abre un .blend de origen y guarda sus objetos como assets de la biblioteca"""
+    bpy.ops.wm.open_mainfile(filepath=job["source"], load_ui=False)
+    scene = bpy.context.scene
+    objects = list(scene.objects)
+    group_by = job["group_by"]
+    if group_by == 'FILE':
+        groups = [(job["prefix"], objects)] if objects else []
+    else:
+        if group_by == 'COLLECTION':
+            groups = addon.ASSET_LIBRARY_OT_save_batch.top_level_groups(scene, objects)
+        else:
+            groups = [(obj.name, hierarchy) for obj in objects if obj.parent is None
+                      for hierarchy in [[obj, *obj.children_recursive]]
+                      if any(member.type in GEOMETRY_OBJECT_TYPES for member in hierarchy)]
+        # Objetos con el mismo nombre en distintos archivos de origen no deben ir al mismo asset
+        groups = [(f"{job['prefix']}_{name}", group) for name, group in groups]
+
+    target_dir = os.path.join(job["library"], *job["category"].split('/')) if job["category"] else job["library"]
+    os.makedirs(target_dir, exist_ok=True)
+    options = SimpleNamespace(
+        library_path=job["library"],
+        use_texture_store=job["texture_store"],
+        compress_assets=job["compress"],
+        write_geometry_cache=job["geometry"],
+    )
+    outputs = []
+    used = set()
+    for name, group in groups:
+        if not group:
+            continue
+        # clean_name puede convertir nombres distintos en el mismo ("A.B" y "A_B")
+        filename = base = bpy.path.clean_name(name)
+        suffix = 1
+        while filename.lower() in used:
+            suffix += 1
+            filename = f"{base}_{suffix}"
+        used.add(filename.lower())
+        outputs.append((os.path.join(target_dir, filename + addon.FILE_EXTENSION), group, group[0]))
+    index = RecordingIndex()
+    addon.AssetManager.save_assets(options, outputs, index=index)
+    # Las miniaturas se escriben en hilos; hay que esperarlas antes del siguiente archivo
+    for future in list(addon._thumbnail_jobs.values()):
+        future.exception()
+    addon._thumbnail_jobs.clear()
+    return {"assets": index.entries}
+
+
+def inspect_file(addon, job):
+    stat = os.stat(job["path"])
+    asset_type, datablocks = addon.AssetManager.inspect_asset(job["path"])
+    return {"assets": [{
+        "path": job["path"], "mtime": stat.st_mtime_ns, "size": stat.st_size,
+        "asset_type": asset_type, "datablocks": datablocks, "bounds": None,
+    }]}
+
+
+WORKER_OPERATIONS = {
+    'ingest': ingest_file,
+    'inspect': inspect_file,
+}
+
+
+def run_worker():
+    """Procesa los trabajos que llegan por la entrada estándar, uno por línea en JSON"""
+    addon = load_addon()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        start = time.perf_counter()
+        try:
+            result = WORKER_OPERATIONS[job["op"]](addon, job)
+            result["error"] = None
+        except Exception as e:
+            result = {"assets": [], "error": f"{type(e).__name__}: {e}"}
+        result["seconds"] = time.perf_counter() - start
+        sys.stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+# --- Proceso principal ------------------------------------------------------------------
+
+class WorkerPool:
+    """Procesos de Blender en segundo plano que van tomando trabajos de una cola común"""
+
+    def __init__(self, count, blender=None):
+        self.count = max(1, count)
+        self.command = [blender or bpy.app.binary_path, "-b", "--factory-startup", "--python", __file__, "--", "worker"]
+
+    def _spawn(self):
+        return subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding='utf-8', bufsize=1,
+        )
+
+    def _serve(self, jobs, on_result):
+        process = self._spawn()
+        try:
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    process.stdin.write(json.dumps(job) + "\n")
+                    process.stdin.flush()
+                    result = None
+                    for line in process.stdout:
+                        if line.startswith(RESULT_PREFIX):
+                            result = json.loads(line[len(RESULT_PREFIX):])
+                            break
+                except (BrokenPipeError, OSError):
+                    result = None
+                if result is None:
+                    # El worker ha terminado (por ejemplo, al fallar Blender con ese archivo)
+                    on_result(job, {"assets": [], "error": "el proceso de Blender terminó de forma inesperada", "seconds": 0.0})
+                    process.kill()
+                    process = self._spawn()
+                    continue
+                on_result(job, result)
+        finally:
+            process.stdin.close()
+            process.wait()
+
+    def run(self, jobs, on_result):
+        """Ejecuta los trabajos; ``on_result(trabajo, resultado)`` se llama serializado"""
+        pending = queue.Queue()
+        for job in jobs:
+            pending.put(job)
+        lock = threading.Lock()
+
+        def locked(job, result):
+            with lock:
+                on_result(job, result)
+
+        threads = [threading.Thread(target=self._serve, args=(pending, locked), daemon=True)
+                   for _ in range(min(self.count, len(jobs)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+class Throughput:
+    """Progreso y rendimiento de una ejecución"""
+
+    def __init__(self, total, label):
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.assets = 0
+        self.seconds = []
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def add(self, size, result):
+        self.done += 1
+        self.bytes += size
+        self.assets += len(result["assets"])
+        self.seconds.append(result["seconds"])
+        if result["error"]:
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self._last_report >= PROGRESS_INTERVAL or self.done == self.total:
+            self._last_report = now
+            print(self.line(now))
+
+    def line(self, now=None):
+        elapsed = max((now or time.perf_counter()) - self.start, 1e-9)
+        return (f"[{self.done}/{self.total}] {self.label}: {self.done / elapsed:.2f} archivos/s, "
+                f"{self.assets / elapsed:.2f} assets/s, {self.bytes / elapsed / 1e6:.1f} MB/s, {self.failed} errores")
+
+    def summary(self):
+        ordered = sorted(self.seconds)
+        return {
+            "files": self.done,
+            "failed": self.failed,
+            "assets": self.assets,
+            "bytes": self.bytes,
+            "elapsed_s": time.perf_counter() - self.start,
+            "p50_file_s": ordered[len(ordered) // 2] if ordered else 0.0,
+            "max_file_s": ordered[-1] if ordered else 0.0,
+        }
+
+
+def collect_sources(addon, paths):
+    """Archivos .blend indicados directamente o dentro de las carpetas, sin carpetas ocultas"""
+    extension = addon.FILE_EXTENSION
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            sources.extend(sorted(addon.texture_store.iter_asset_files(path, extension)))
+        elif path.endswith(extension) and os.path.isfile(path):
+            sources.append(path)
+        else:
+            print(f"Se ignora '{path}': no es un archivo {extension} ni una carpeta")
+    return sources
+
+
+def source_prefixes(sources):
+    """Nombre de cada archivo de origen, único entre todos, para nombrar sus assets
+
+    Es el nombre del archivo sin extensión; si varios se llaman igual (en distintas
+    carpetas) se numeran en el orden de la lista.
+    """
+    prefixes = []
+    used = set()
+    for path in sources:
+        prefix = base = bpy.path.clean_name(os.path.splitext(os.path.basename(path))[0])
+        suffix = 1
+        while prefix.lower() in used:
+            suffix += 1
+            prefix = f"{base}_{suffix}"
+        used.add(prefix.lower())
+        prefixes.append(prefix)
+    return prefixes
+
+
+def store_results(addon, library_path, results):
+    """Escribe en el índice las entradas devueltas por los workers"""
+    index = addon.get_library_index(library_path)
+    for entry in results:
+        index.upsert(entry["path"], entry["mtime"], entry["size"], entry["asset_type"],
+                     entry["datablocks"], entry["bounds"])
+    index.commit()
+
+
+def run_jobs(args, jobs, sizes, label):
+    """Ejecuta los trabajos en el pool y devuelve (entradas para el índice, rendimiento)"""
+    throughput = Throughput(len(jobs), label)
+    entries = []
+
+    def on_result(job, result):
+        entries.extend(result["assets"])
+        if result["error"]:
+            print(f"Error en '{job.get('source') or job.get('path')}': {result['error']}")
+        throughput.add(sizes.get(job.get('source') or job.get('path'), 0), result)
+
+    WorkerPool(args.jobs, args.blender).run(jobs, on_result)
+    return entries, throughput
+
+
+def command_ingest(addon, args):
+    library_path = os.path.abspath(args.library)
+    sources = collect_sources(addon, args.sources)
+    library_norm = os.path.normcase(library_path) + os.sep
+    sources = [path for path in sources if not os.path.normcase(os.path.abspath(path)).startswith(library_norm)]
+    if not sources:
+        print("No hay archivos de origen que importar")
+        return 1
+    os.makedirs(library_path, exist_ok=True)
+    jobs = [{
+        "op": 'ingest', "source": os.path.abspath(path), "prefix": prefix, "library": library_path,
+        "group_by": args.group_by.upper(), "category": args.category.strip('/'),
+        "texture_store": args.texture_store, "compress": not args.no_compress, "geometry": args.geometry,
+    } for path, prefix in zip(sources, source_prefixes(sources))]
+    sizes = {job["source"]: os.path.getsize(job["source"]) for job in jobs}
+    entries, throughput = run_jobs(args, jobs, sizes, "importación")
+
+    written = {}
+    for entry in entries:
+        written.setdefault(entry["path"], []).append(entry)
+    collisions = [path for path, duplicates in written.items() if len(duplicates) > 1]
+    for path in collisions:
+        print(f"Error: '{path}' se ha escrito {len(written[path])} veces; solo queda una de las versiones")
+    store_results(addon, library_path, entries)
+    status = finish(args, throughput)
+    return 1 if collisions else status
+
+
+def command_index_rebuild(addon, args):
+    library_path = os.path.abspath(args.library)
+    files = collect_sources(addon, [library_path])
+    index = addon.get_library_index(library_path)
+    index.prune(files)
+    index.commit()
+    jobs = [{"op": 'inspect', "path": path} for path in files]
+    sizes = {path: os.path.getsize(path) for path in files}
+    entries, throughput = run_jobs(args, jobs, sizes, "indexado")
+    store_results(addon, library_path, entries)
+    return finish(args, throughput)
+
+
+def command_index_verify(addon, args):
+    """Compara el índice con los archivos; con --deep vuelve a inspeccionarlos"""
+    library_path = os.path.abspath(args.library)
+    files = collect_sources(addon, [library_path])
+    index = addon.get_library_index(library_path)
+    indexed = index.entries()
+    relpaths = {index.relpath(path): path for path in files}
+
+    missing = sorted(path for relpath, path in relpaths.items() if relpath not in indexed)
+    orphaned = sorted(relpath for relpath in indexed if relpath not in relpaths)
+    stale = []
+    for relpath, path in relpaths.items():
+        entry = indexed.get(relpath)
+        stat = os.stat(path)
+        if entry is not None and not entry.is_fresh(stat.st_mtime_ns, stat.st_size):
+            stale.append(path)
+
+    mismatched = []
+    throughput = None
+    if args.deep:
+        jobs = [{"op": 'inspect', "path": path} for path in files]
+        sizes = {path: os.path.getsize(path) for path in files}
+        entries, throughput = run_jobs(args, jobs, sizes, "verificación")
+        for entry in entries:
+            indexed_entry = indexed.get(index.relpath(entry["path"]))
+            if indexed_entry is not None and indexed_entry.datablocks != entry["datablocks"]:
+                mismatched.append(entry["path"])
+
+    for label, paths in (("Sin indexar", missing), ("Entradas huérfanas", orphaned),
+                         ("Entradas obsoletas", stale), ("Contenido distinto", mismatched)):
+        print(f"{label}: {len(paths)}")
+        for path in paths[:args.limit]:
+            print(f"  {path}")
+    problems = len(missing) + len(orphaned) + len(stale) + len(mismatched)
+    if throughput is not None:
+        finish(args, throughput)
+    return 1 if problems else 0
+
+
+def finish(args, throughput):
+    summary = throughput.summary()
+    print(throughput.line())
+    print(f"Total: {summary['files']} archivos, {summary['assets']} assets en {summary['elapsed_s']:.1f} s "
+          f"(mediana {summary['p50_file_s']:.2f} s por archivo, máximo {summary['max_file_s']:.2f} s)")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="número de procesos de Blender en paralelo")
+    common.add_argument("--blender", default=None, help="ejecutable de Blender de los workers (por defecto, el actual)")
+    common.add_argument("--report", default="", help="archivo JSON donde guardar el resumen de rendimiento")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", parents=[common], help="importar archivos .blend de origen a la biblioteca")
+    ingest.add_argument("sources", nargs="+", help="archivos .blend o carpetas de origen")
+    ingest.add_argument("--library", required=True)
+    ingest.add_argument("--group-by", choices=("object", "collection", "file"), default="object",
+                        help="un asset por objeto de primer nivel, por colección de primer nivel o por archivo")
+    ingest.add_argument("--category", default="", help="subcarpeta de la biblioteca donde guardar los assets")
+    ingest.add_argument("--texture-store", action="store_true", help="usar el almacén de texturas compartido")
+    ingest.add_argument("--no-compress", action="store_true", help="guardar los assets sin comprimir")
+    ingest.add_argument("--geometry", action="store_true", help="escribir también la caché de geometría")
+
+    index = commands.add_parser("index", parents=[common], help="reconstruir o verificar el índice de la biblioteca")
+    index.add_argument("action", choices=("rebuild", "verify"))
+    index.add_argument("--library", required=True)
+    index.add_argument("--deep", action="store_true", help="al verificar, volver a inspeccionar cada archivo")
+    index.add_argument("--limit", type=int, default=20, help="rutas a mostrar por cada tipo de problema")
+
+    commands.add_parser("worker", help=argparse.SUPPRESS)
+    return parser
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = build_parser().parse_args(argv)
+    if args.command == "worker":
+        run_worker()
+        return 0
+
+    addon = load_addon()
+    if args.command == "ingest":
+        return command_ingest(addon, args)
+    if args.action == "rebuild":
+        return command_index_rebuild(addon, args)
+    return command_index_verify(addon, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
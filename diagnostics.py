@@ -0,0 +1,268 @@
+"""Instrumentación de rendimiento del addon.
+
+Cada operación medida (un refresco de la lista, un guardado, cada fase de una carga, el
+dibujado del panel...) se guarda como un evento en un buffer circular en memoria, con su
+duración y los contadores que se le hayan sumado (archivos abiertos, bytes leídos...). Los
+contadores de una operación se suman también a la que la contiene. Los eventos se pueden
+resumir por operación o exportar como JSON o como traza de Chrome (chrome://tracing o
+Perfetto). Las operaciones frecuentes (el dibujado de la interfaz, en cada redibujado) se
+acumulan en estadísticas aparte y solo pasan al buffer las lentas, para que no expulsen
+los eventos de cargas y guardados. Este módulo no usa bpy, así que también mide el trabajo
+de los hilos.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+BUFFER_SIZE = 4096
+TRACE_CATEGORY = "asset_manager"
+# Duración a partir de la que una operación frecuente se guarda también como evento
+FREQUENT_THRESHOLD = 0.05
+# Duraciones recientes de cada operación frecuente que se guardan para calcular la mediana
+FREQUENT_SAMPLES = 256
+
+
+class Event:
+    """Operación terminada; ``start`` y ``duration`` en segundos desde el origen del registro"""
+    __slots__ = ('name', 'start', 'duration', 'thread', 'depth', 'counters', 'args')
+
+    def __init__(self, name, start, duration, thread, depth, counters, args):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.thread = thread
+        self.depth = depth
+        self.counters = counters
+        self.args = args
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "start_ms": self.start * 1000,
+            "duration_ms": self.duration * 1000,
+            "thread": self.thread,
+            "depth": self.depth,
+            "counters": self.counters,
+            "args": self.args,
+        }
+
+
+class _Aggregate:
+    """Estadísticas acumuladas de una operación frecuente"""
+    __slots__ = ('count', 'total', 'max', 'samples', 'counters')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=FREQUENT_SAMPLES)
+        self.counters = {}
+
+    def add(self, duration, counters):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.samples.append(duration)
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+class Span:
+    """Operación en curso; se usa como context manager"""
+    __slots__ = ('recorder', 'name', 'args', 'frequent', 'counters', 'start', 'depth')
+
+    def __init__(self, recorder, name, args, frequent=False):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+        self.frequent = frequent
+        self.counters = {}
+        self.start = 0.0
+        self.depth = 0
+
+    def count(self, **counters):
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def __enter__(self):
+        stack = self.recorder._stack()
+        self.depth = len(stack)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        stack = self.recorder._stack()
+        stack.pop()
+        if stack and self.counters:
+            stack[-1].count(**self.counters)
+        self.recorder._record(Event(
+            self.name, self.start - self.recorder.origin, end - self.start,
+            threading.get_ident(), self.depth, self.counters, self.args,
+        ), self.frequent)
+        return False
+
+
+class _NullSpan:
+    """Sustituto de Span cuando el registro está desactivado"""
+
+    def count(self, **counters):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Recorder:
+    """Buffer circular de eventos; seguro para usar desde varios hilos"""
+
+    def __init__(self, size=BUFFER_SIZE):
+        self.enabled = True
+        self.events = deque(maxlen=size)
+        # {nombre: _Aggregate} de las operaciones frecuentes
+        self.aggregates = {}
+        self.origin = time.perf_counter()
+        # Aumenta con cada evento, para saber si un resumen calculado sigue al día
+        self.generation = 0
+        self._local = threading.local()
+        self._thread_names = {}
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+            self._thread_names[threading.get_ident()] = threading.current_thread().name
+        return stack
+
+    def _record(self, event, frequent=False):
+        if frequent:
+            aggregate = self.aggregates.get(event.name)
+            if aggregate is None:
+                aggregate = self.aggregates[event.name] = _Aggregate()
+            aggregate.add(event.duration, event.counters)
+            if event.duration < FREQUENT_THRESHOLD:
+                return
+        self.events.append(event)
+        self.generation += 1
+
+    def span(self, name, frequent=False, **args):
+        """Mide el bloque ``with`` como una operación llamada ``name``
+
+        Con ``frequent`` la operación se suma a sus estadísticas acumuladas y solo se guarda
+        como evento si dura más de FREQUENT_THRESHOLD.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, args, frequent)
+
+    def count(self, **counters):
+        """Suma contadores a la operación en curso de este hilo, si la hay"""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        if stack:
+            stack[-1].count(**counters)
+
+    def count_file(self, path):
+        """Cuenta un archivo abierto y leído entero"""
+        if not self.enabled:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        self.count(files=1, bytes_read=size)
+
+    def clear(self):
+        self.events.clear()
+        self.aggregates.clear()
+        self.generation += 1
+
+    def summary(self):
+        """Estadísticas por operación, ordenadas por tiempo total"""
+        aggregates = dict(self.aggregates)
+        groups = {}
+        for event in list(self.events):
+            # Las operaciones frecuentes lentas ya están en sus estadísticas acumuladas
+            if event.name not in aggregates:
+                groups.setdefault(event.name, []).append(event)
+        rows = []
+        for name, events in groups.items():
+            durations = sorted(event.duration for event in events)
+            counters = {}
+            for event in events:
+                for key, value in event.counters.items():
+                    counters[key] = counters.get(key, 0) + value
+            rows.append({
+                "name": name,
+                "count": len(events),
+                "total_ms": sum(durations) * 1000,
+                "p50_ms": durations[len(durations) // 2] * 1000,
+                "max_ms": durations[-1] * 1000,
+                "counters": counters,
+            })
+        for name, aggregate in aggregates.items():
+            durations = sorted(aggregate.samples)
+            rows.append({
+                "name": name,
+                "count": aggregate.count,
+                "total_ms": aggregate.total * 1000,
+                "p50_ms": durations[len(durations) // 2] * 1000,
+                "max_ms": aggregate.max * 1000,
+                "counters": dict(aggregate.counters),
+            })
+        rows.sort(key=lambda row: -row["total_ms"])
+        return rows
+
+    def export_json(self, path):
+        """Guarda los eventos y su resumen en JSON"""
+        data = {
+            "events": [event.to_dict() for event in list(self.events)],
+            "summary": self.summary(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def export_chrome_trace(self, path):
+        """Guarda los eventos en el formato Trace Event de Chrome"""
+        pid = os.getpid()
+        trace = [{
+            "name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name},
+        } for thread, name in list(self._thread_names.items())]
+        for event in list(self.events):
+            trace.append({
+                "name": event.name,
+                "cat": TRACE_CATEGORY,
+                "ph": "X",
+                "ts": event.start * 1e6,
+                "dur": event.duration * 1e6,
+                "pid": pid,
+                "tid": event.thread,
+                "args": {**event.args, **event.counters},
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+recorder = Recorder()
+
+
+def span(name, frequent=False, **args):
+    return recorder.span(name, frequent, **args)
+
+
+def count(**counters):
+    recorder.count(**counters)
+
+
+def count_file(path):
+    recorder.count_file(path)
@@ -0,0 +1,151 @@
+"""Archivo auxiliar de geometría para las cargas en modo MESH.
+
+Guarda la geometría de las mallas de un asset (vértices, aristas, loops, polígonos y UVs)
+como arrays binarios crudos precedidos de una cabecera JSON, alineados para poder leerlos
+con mmap y ``numpy.frombuffer`` sin copiar ni abrir el .blend. Este módulo solo depende de
+NumPy; la conversión desde y hacia mallas de Blender está en el addon.
+
+Formato::
+
+    b'AMGEO\\0' + versión (uint16) + longitud de la cabecera (uint64) + cabecera JSON
+    + relleno hasta ALIGNMENT + arrays
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from .library_index import INDEX_DIRNAME
+
+GEOMETRY_DIRNAME = "geometry"
+GEOMETRY_EXTENSION = ".amgeo"
+MAGIC = b'AMGEO\0'
+VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<6sHQ')
+
+
+class GeometryCacheError(Exception):
+    """El archivo de geometría no existe, está corrupto o no corresponde al asset"""
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def geometry_path(library_path, asset_filepath):
+    """Ruta del archivo de geometría de un asset, dentro de la carpeta interna de la biblioteca"""
+    relpath = os.path.relpath(os.path.abspath(asset_filepath), os.path.abspath(library_path))
+    return os.path.join(os.path.abspath(library_path), INDEX_DIRNAME, GEOMETRY_DIRNAME, relpath + GEOMETRY_EXTENSION)
+
+
+def write_geometry(path, meshes, source_size=None, source_mtime=None):
+    """Escribe la geometría de un asset
+
+    ``meshes`` es una lista de dicts con ``name`` (nombre del objeto), ``mesh`` (nombre de
+    la malla), ``matrix`` (16 floats, por filas), ``offset`` (posición relativa al centro del
+    asset) y ``arrays`` ({nombre: ndarray}). El tamaño y mtime del .blend de origen se
+    guardan para detectar archivos auxiliares obsoletos.
+    """
+    objects = []
+    blobs = []
+    offset = 0
+    for mesh in meshes:
+        arrays = {}
+        for key, array in mesh['arrays'].items():
+            array = np.ascontiguousarray(array)
+            offset = _align(offset)
+            arrays[key] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            blobs.append((offset, array))
+            offset += array.nbytes
+        objects.append({
+            'name': mesh['name'],
+            'mesh': mesh['mesh'],
+            'matrix': [float(v) for v in mesh['matrix']],
+            'offset': [float(v) for v in mesh['offset']],
+            'arrays': arrays,
+        })
+
+    header = json.dumps({
+        'objects': objects,
+        'source_size': source_size,
+        'source_mtime': source_mtime,
+    }, separators=(',', ':')).encode('utf-8')
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for blob_offset, array in blobs:
+                f.seek(data_start + blob_offset)
+                f.write(array.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class GeometryFile:
+    """Archivo de geometría abierto con mmap; los arrays son vistas de solo lectura"""
+
+    def __init__(self, path):
+        try:
+            self._file = open(path, 'rb')
+        except OSError as e:
+            raise GeometryCacheError(str(e)) from e
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, header_size = _PREAMBLE.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise GeometryCacheError("formato de geometría no reconocido")
+            header = json.loads(self._map[_PREAMBLE.size:_PREAMBLE.size + header_size].decode('utf-8'))
+        except (ValueError, struct.error) as e:
+            self.close()
+            raise GeometryCacheError(str(e)) from e
+        except BaseException:
+            self.close()
+            raise
+        self._data_start = _align(_PREAMBLE.size + header_size)
+        self.objects = header['objects']
+        self.source_size = header.get('source_size')
+        self.source_mtime = header.get('source_mtime')
+
+    def matches(self, source_size, source_mtime):
+        return self.source_size == source_size and self.source_mtime == source_mtime
+
+    def array(self, obj, key):
+        """Vista NumPy sobre el array ``key`` del objeto, o None si no existe"""
+        info = obj['arrays'].get(key)
+        if info is None:
+            return None
+        dtype = np.dtype(info['dtype'])
+        count = int(np.prod(info['shape'])) if info['shape'] else 1
+        if count == 0:
+            return np.empty(info['shape'], dtype=dtype)
+        array = np.frombuffer(self._map, dtype=dtype, count=count, offset=self._data_start + info['offset'])
+        return array.reshape(info['shape'])
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Aún hay vistas NumPy vivas; el mapa se cierra cuando se liberen
+                pass
+            self._map = None
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
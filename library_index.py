@@ -0,0 +1,195 @@
+"""Índice persistente de la biblioteca de assets.
+
+Guarda en un SQLite dentro de la carpeta de la biblioteca el tipo, los nombres de
+datablocks y los límites de cada asset, identificados por ruta relativa + mtime + tamaño.
+Así un refresco solo vuelve a inspeccionar los archivos que han cambiado. También guarda,
+por carpeta y mtime, cuántos assets contiene cada categoría para no tener que listarlas.
+
+Este módulo no depende de bpy para poder usarse desde hilos de trabajo y desde la
+línea de comandos.
+"""
+import json
+import os
+import sqlite3
+
+INDEX_DIRNAME = ".asset_manager"
+INDEX_FILENAME = "index.sqlite"
+SCHEMA_VERSION = 1
+
+# Categorías de datablocks que se guardan en el índice
+INDEXED_DATABLOCKS = ('objects', 'meshes', 'materials', 'node_groups', 'images', 'collections')
+
+
+def classify_asset(datablocks):
+    """Deduce el tipo de asset a partir de los nombres de datablocks que contiene"""
+    if datablocks.get('materials'):
+        return "MATERIAL"
+    if datablocks.get('node_groups'):
+        return "NODES"
+    if datablocks.get('objects'):
+        return "MESH"
+    return "UNKNOWN"
+
+
+class IndexEntry:
+    """Metadatos de un archivo de asset tal y como se guardan en el índice"""
+    __slots__ = ('path', 'mtime', 'size', 'asset_type', 'datablocks', 'bounds')
+
+    def __init__(self, path, mtime, size, asset_type, datablocks, bounds=None):
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.asset_type = asset_type
+        self.datablocks = datablocks
+        self.bounds = bounds
+
+    @property
+    def counts(self):
+        return {key: len(names) for key, names in self.datablocks.items()}
+
+    def is_fresh(self, mtime, size):
+        return self.mtime == mtime and self.size == size
+
+
+class LibraryIndex:
+    """Índice SQLite de una carpeta de biblioteca
+
+    Las rutas se guardan relativas a la carpeta de la biblioteca para que el índice
+    siga siendo válido aunque la carpeta se monte en otra ruta. Si la base de datos no
+    se puede crear (por ejemplo en un recurso compartido de solo lectura) se usa un
+    índice en memoria y el listado sigue funcionando.
+    """
+
+    def __init__(self, library_path):
+        self.library_path = os.path.abspath(library_path)
+        self.db_path = os.path.join(self.library_path, INDEX_DIRNAME, INDEX_FILENAME)
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _connect(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            self._init_schema(conn)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Asset Manager: no se pudo abrir el índice '{self.db_path}', se usará uno en memoria: {e}")
+            conn = sqlite3.connect(":memory:")
+            self._init_schema(conn)
+        return conn
+
+    @staticmethod
+    def _init_schema(conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS assets")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS assets ("
+            " path TEXT PRIMARY KEY,"
+            " mtime INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " asset_type TEXT NOT NULL,"
+            " datablocks TEXT NOT NULL,"
+            " bounds TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS folders ("
+            " path TEXT PRIMARY KEY,"
+            " mtime INTEGER NOT NULL,"
+            " asset_count INTEGER NOT NULL,"
+            " has_children INTEGER NOT NULL)"
+        )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+
+    def relpath(self, filepath):
+        return os.path.relpath(os.path.abspath(filepath), self.library_path).replace(os.sep, '/')
+
+    def abspath(self, relpath):
+        return os.path.join(self.library_path, *relpath.split('/'))
+
+    @staticmethod
+    def _row_to_entry(row):
+        path, mtime, size, asset_type, datablocks, bounds = row
+        return IndexEntry(
+            path, mtime, size, asset_type,
+            json.loads(datablocks),
+            tuple(json.loads(bounds)) if bounds else None,
+        )
+
+    def get(self, filepath):
+        """Devuelve la entrada del archivo o None si no está indexado"""
+        row = self.conn.execute(
+            "SELECT path, mtime, size, asset_type, datablocks, bounds FROM assets WHERE path = ?",
+            (self.relpath(filepath),)
+        ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def lookup(self, filepath, mtime, size):
+        """Devuelve la entrada solo si coincide con el mtime y tamaño actuales del archivo"""
+        entry = self.get(filepath)
+        if entry is not None and entry.is_fresh(mtime, size):
+            return entry
+        return None
+
+    def entries(self):
+        """Devuelve todas las entradas indexadas por ruta relativa"""
+        rows = self.conn.execute("SELECT path, mtime, size, asset_type, datablocks, bounds FROM assets")
+        return {row[0]: self._row_to_entry(row) for row in rows}
+
+    def upsert(self, filepath, mtime, size, asset_type, datablocks, bounds=None):
+        """Inserta o reemplaza la entrada de un archivo y la devuelve"""
+        entry = IndexEntry(self.relpath(filepath), mtime, size, asset_type, datablocks,
+                           tuple(bounds) if bounds else None)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO assets (path, mtime, size, asset_type, datablocks, bounds)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (entry.path, mtime, size, asset_type,
+             json.dumps(datablocks, separators=(',', ':')),
+             json.dumps(list(entry.bounds)) if entry.bounds else None)
+        )
+        return entry
+
+    def remove(self, filepath):
+        self.conn.execute("DELETE FROM assets WHERE path = ?", (self.relpath(filepath),))
+
+    def prune(self, existing_filepaths, folder=None):
+        """Elimina las entradas de archivos que ya no existen
+
+        Con ``folder`` (ruta relativa, '' para la raíz) solo se consideran las entradas
+        de los archivos que están directamente en esa carpeta.
+        """
+        existing = {self.relpath(path) for path in existing_filepaths}
+        stale = [(path,) for (path,) in self.conn.execute("SELECT path FROM assets")
+                 if path not in existing and (folder is None or path.rpartition('/')[0] == folder)]
+        if stale:
+            self.conn.executemany("DELETE FROM assets WHERE path = ?", stale)
+        return len(stale)
+
+    def folder_summary(self, folder, mtime):
+        """Devuelve (número de assets, si tiene subcarpetas) de la carpeta si sigue al día"""
+        row = self.conn.execute(
+            "SELECT asset_count, has_children FROM folders WHERE path = ? AND mtime = ?", (folder, mtime)
+        ).fetchone()
+        return (row[0], bool(row[1])) if row else None
+
+    def set_folder_summary(self, folder, mtime, asset_count, has_children):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO folders (path, mtime, asset_count, has_children) VALUES (?, ?, ?, ?)",
+            (folder, mtime, asset_count, int(has_children))
+        )
+
+    def commit(self):
+        try:
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Asset Manager: no se pudo guardar el índice: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,254 @@
+"""Caché local de lectura para bibliotecas en almacenamiento lento (por ejemplo, de red).
+
+La primera vez que se lee un archivo de la biblioteca se copia a una carpeta local que
+replica su estructura relativa (``<caché>/<id de la biblioteca>/<ruta relativa>``), y las
+lecturas siguientes usan la copia mientras el original conserve su tamaño y mtime. Al copiar
+se guarda el hash del contenido, que se comprueba la primera vez que se usa cada copia en la
+sesión para descartar copias dañadas. Cuando la caché supera su tamaño máximo se borran las
+copias usadas hace más tiempo. Este módulo no usa bpy, así que las copias se pueden hacer
+por adelantado en hilos de trabajo.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import diagnostics
+
+MANIFEST_FILENAME = "cache.sqlite"
+HASH_DIGEST_SIZE = 20
+COPY_CHUNK_SIZE = 1 << 20
+PREFETCH_WORKERS = 2
+# Copias por adelantado en cola como máximo (por ejemplo al seleccionar todos los assets)
+PREFETCH_QUEUE_LIMIT = 32
+
+
+def _hash_file(path):
+    hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class LocalCache:
+    """Copias locales de los archivos de una biblioteca, con expulsión LRU
+
+    El manifiesto (SQLite, en la raíz de la caché de la biblioteca) guarda por ruta relativa
+    el tamaño y mtime del original, el hash y tamaño de la copia y cuándo se usó por última
+    vez. Los métodos se pueden llamar desde varios hilos.
+    """
+
+    def __init__(self, cache_root, library_path, max_bytes):
+        self.library_path = os.path.abspath(library_path)
+        library_id = hashlib.blake2b(os.path.normcase(self.library_path).encode('utf-8'), digest_size=8).hexdigest()
+        self.root = os.path.join(os.path.abspath(cache_root), library_id)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._conn = None
+        self._verified = set()
+        self._pending = {}
+        self._executor = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, MANIFEST_FILENAME), timeout=5.0, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime INTEGER NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " local_size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def relpath(self, filepath):
+        """Ruta relativa a la biblioteca, o None si el archivo está fuera de ella"""
+        relpath = os.path.relpath(os.path.abspath(filepath), self.library_path)
+        if relpath == os.curdir or relpath.startswith(os.pardir):
+            return None
+        return relpath.replace(os.sep, '/')
+
+    def local_path(self, relpath):
+        return os.path.join(self.root, *relpath.split('/'))
+
+    def original_path(self, path):
+        """Ruta en la biblioteca de una copia local, o None si la ruta no está en la caché"""
+        relpath = os.path.relpath(os.path.abspath(path), self.root)
+        if relpath == os.curdir or relpath.startswith(os.pardir):
+            return None
+        return os.path.join(self.library_path, relpath)
+
+    def _valid_copy(self, relpath, local, row):
+        """La copia existe, tiene el tamaño esperado y (una vez por sesión) el hash esperado"""
+        _, _, digest, local_size = row
+        try:
+            if os.path.getsize(local) != local_size:
+                return False
+            if relpath not in self._verified:
+                if _hash_file(local) != digest:
+                    return False
+                self._verified.add(relpath)
+        except OSError:
+            return False
+        return True
+
+    def fetch(self, filepath):
+        """Ruta local del archivo, copiándolo antes si la copia falta o no está al día
+
+        Si el archivo está fuera de la biblioteca o no se puede copiar se devuelve la ruta
+        original. Si el original no es accesible pero hay una copia válida se usa la copia.
+        """
+        relpath = self.relpath(filepath)
+        if relpath is None:
+            return filepath
+        with self._lock:
+            future = self._pending.get(relpath)
+        if future is not None:
+            # Ya se está copiando por adelantado: se espera a esa copia en lugar de repetirla
+            return future.result()
+        return self._fetch(filepath, relpath)
+
+    def _fetch(self, filepath, relpath):
+        local = self.local_path(relpath)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime, hash, local_size FROM files WHERE path = ?", (relpath,)
+            ).fetchone()
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            if row is not None and self._valid_copy(relpath, local, row):
+                self._touch(relpath)
+                return local
+            return filepath
+
+        if row is not None and (row[0], row[1]) == (stat.st_size, stat.st_mtime_ns) and self._valid_copy(relpath, local, row):
+            self._touch(relpath)
+            diagnostics.count(cache_hits=1)
+            return local
+
+        try:
+            digest = self._copy(filepath, local)
+        except OSError as e:
+            print(f"Asset Manager: no se pudo copiar '{filepath}' a la caché local: {e}")
+            return filepath
+        diagnostics.count(cache_misses=1, bytes_copied=stat.st_size)
+        with self._lock:
+            self._verified.add(relpath)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, hash, local_size, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (relpath, stat.st_size, stat.st_mtime_ns, digest, os.path.getsize(local), time.time())
+            )
+            self._evict(keep=relpath)
+            self.conn.commit()
+        return local
+
+    @staticmethod
+    def _copy(source, local):
+        """Copia el archivo calculando el hash de lo que se lee; devuelve el hash"""
+        directory = os.path.dirname(local)
+        os.makedirs(directory, exist_ok=True)
+        hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as dst, open(source, 'rb') as src:
+                for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                    dst.write(chunk)
+            os.replace(tmp_path, local)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return hasher.hexdigest()
+
+    def _touch(self, relpath):
+        with self._lock:
+            self.conn.execute("UPDATE files SET last_used = ? WHERE path = ?", (time.time(), relpath))
+            self.conn.commit()
+
+    def _evict(self, keep=None):
+        """Borra las copias usadas hace más tiempo hasta que la caché quepa en max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(local_size), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT path, local_size FROM files ORDER BY last_used").fetchall()
+        for relpath, local_size in rows:
+            if total <= self.max_bytes:
+                break
+            if relpath == keep or relpath in self._pending:
+                continue
+            try:
+                os.remove(self.local_path(relpath))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Abierto por otro proceso; se intentará en la siguiente expulsión
+                continue
+            self.conn.execute("DELETE FROM files WHERE path = ?", (relpath,))
+            self._verified.discard(relpath)
+            total -= local_size
+
+    def prefetch(self, filepaths):
+        """Copia en segundo plano los archivos que aún no están en la caché"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="asset_cache")
+            for filepath in filepaths:
+                if len(self._pending) >= PREFETCH_QUEUE_LIMIT:
+                    break
+                relpath = self.relpath(filepath)
+                if relpath is None or relpath in self._pending:
+                    continue
+                future = self._executor.submit(self._prefetch, filepath, relpath)
+                self._pending[relpath] = future
+                future.add_done_callback(lambda _, relpath=relpath: self._done(relpath))
+
+    def _prefetch(self, filepath, relpath):
+        with diagnostics.span("cache.prefetch"):
+            try:
+                return self._fetch(filepath, relpath)
+            except Exception as e:
+                print(f"Asset Manager: error al copiar '{filepath}' a la caché local: {e}")
+                return filepath
+
+    def _done(self, relpath):
+        with self._lock:
+            self._pending.pop(relpath, None)
+
+    def usage(self):
+        """Devuelve (número de copias, bytes ocupados)"""
+        with self._lock:
+            count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(local_size), 0) FROM files").fetchone()
+        return count, total
+
+    def clear(self):
+        """Borra todas las copias que no se están copiando ahora mismo"""
+        with self._lock:
+            max_bytes, self.max_bytes = self.max_bytes, 0
+            try:
+                self._evict()
+                self.conn.commit()
+            finally:
+                self.max_bytes = max_bytes
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            self._pending.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,79 @@
+"""Escaneo en segundo plano de archivos de la biblioteca.
+
+Reparte la inspección de archivos entre un pool de hilos y deja los resultados en una
+cola que el hilo principal de Blender vacía por lotes (desde ``bpy.app.timers``). Este
+módulo no usa bpy: la función de inspección que se le pasa tampoco debe usarlo.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LibraryScan:
+    """Trabajo de escaneo cancelable sobre una lista de archivos
+
+    ``jobs`` es una lista de tuplas cuyo primer elemento es la ruta del archivo; cada
+    tupla se devuelve tal cual junto al resultado de ``inspect(ruta)`` o la excepción
+    que haya lanzado.
+    """
+
+    def __init__(self, library_path, jobs, inspect, owner=None, max_workers=None):
+        self.library_path = library_path
+        self.owner = owner
+        self.total = len(jobs)
+        self.completed = 0
+        self._inspect = inspect
+        self._max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+        self._results = queue.SimpleQueue()
+        self._cancelled = threading.Event()
+        self._executors = []
+        self._submit(jobs)
+
+    def _submit(self, jobs):
+        executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="asset_scan")
+        for job in jobs:
+            executor.submit(self._run, job, self._inspect)
+        executor.shutdown(wait=False)
+        self._executors.append(executor)
+
+    def extend(self, jobs):
+        """Añade más archivos a un escaneo en curso"""
+        self.total += len(jobs)
+        self._submit(jobs)
+
+    def _run(self, job, inspect):
+        if self._cancelled.is_set():
+            return
+        try:
+            self._results.put((job, inspect(job[0]), None))
+        except Exception as e:
+            self._results.put((job, None, e))
+
+    def drain(self, max_items):
+        """Devuelve hasta ``max_items`` resultados disponibles sin bloquear"""
+        results = []
+        while len(results) < max_items:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        self.completed += len(results)
+        return results
+
+    def cancel(self):
+        self._cancelled.set()
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def finished(self):
+        return self.cancelled or self.completed >= self.total
+
+    @property
+    def progress(self):
+        return self.completed / self.total if self.total else 1.0
@@ -0,0 +1,136 @@
+"""Índice de búsqueda en memoria para la lista de assets.
+
+Indexa por trigramas el nombre de cada asset y los nombres de los datablocks que contiene
+para filtrar la lista mientras se escribe, sin acceder a disco. Las coincidencias se
+puntúan: coincidencia exacta, prefijo y subcadena en el nombre pesan más que las
+coincidencias en datablocks, y las coincidencias aproximadas (trigramas compartidos, para
+tolerar erratas) quedan al final.
+"""
+from collections import defaultdict
+
+SCORE_EXACT = 100.0
+SCORE_PREFIX = 80.0
+SCORE_NAME = 60.0
+SCORE_DATABLOCK = 40.0
+SCORE_FUZZY = 30.0
+# Fracción mínima de trigramas compartidos para aceptar una coincidencia aproximada
+FUZZY_THRESHOLD = 0.5
+# Búsquedas recientes que se recuerdan mientras el índice no cambia
+CACHE_SIZE = 64
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Document:
+    __slots__ = ('name', 'datablocks', 'asset_type', 'trigrams')
+
+    def __init__(self, name, datablocks, asset_type):
+        self.name = name.lower()
+        self.datablocks = [block.lower() for block in datablocks]
+        self.asset_type = asset_type
+        self.trigrams = trigrams(self.name)
+        for block in self.datablocks:
+            self.trigrams |= trigrams(block)
+
+
+class SearchIndex:
+    """Índice de trigramas sobre los assets de la lista, identificados por una clave"""
+
+    def __init__(self):
+        self._documents = {}
+        self._postings = defaultdict(set)
+        self._cache = {}
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, key):
+        return key in self._documents
+
+    def add(self, key, name, asset_type, datablocks=()):
+        if key in self._documents:
+            self.remove(key)
+        document = _Document(name, datablocks, asset_type)
+        self._documents[key] = document
+        for gram in document.trigrams:
+            self._postings[gram].add(key)
+        self._changed()
+
+    def remove(self, key):
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+        for gram in document.trigrams:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+        self._changed()
+
+    def clear(self):
+        self._documents.clear()
+        self._postings.clear()
+        self._changed()
+
+    def _changed(self):
+        self.generation += 1
+        self._cache.clear()
+
+    def _score_token(self, token, document, ratio):
+        if document.name == token:
+            return SCORE_EXACT
+        if document.name.startswith(token):
+            return SCORE_PREFIX
+        if token in document.name:
+            return SCORE_NAME
+        if any(token in block for block in document.datablocks):
+            return SCORE_DATABLOCK
+        if ratio >= FUZZY_THRESHOLD:
+            return SCORE_FUZZY * ratio
+        return 0.0
+
+    def _shared_trigrams(self, grams):
+        """Cuántos de los trigramas dados tiene cada asset que comparte alguno"""
+        counts = defaultdict(int)
+        for gram in grams:
+            for key in self._postings.get(gram, ()):
+                counts[key] += 1
+        return counts
+
+    def search(self, term, asset_type=None):
+        """Devuelve {clave: puntuación} de los assets que coinciden con todos los términos"""
+        cache_key = (term, asset_type)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        tokens = term.lower().split()
+        if asset_type:
+            keys = [key for key, document in self._documents.items() if document.asset_type == asset_type]
+        else:
+            keys = list(self._documents)
+
+        scores = dict.fromkeys(keys, 0.0)
+        for token in tokens:
+            grams = trigrams(token)
+            if grams:
+                # Solo pueden coincidir los assets que comparten algún trigrama del término
+                shared = self._shared_trigrams(grams)
+                candidates = [(key, shared[key] / len(grams)) for key in scores if key in shared]
+            else:
+                candidates = [(key, 0.0) for key in scores]
+            token_scores = {}
+            for key, ratio in candidates:
+                score = self._score_token(token, self._documents[key], ratio)
+                if score:
+                    token_scores[key] = scores[key] + score
+            scores = token_scores
+
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[cache_key] = scores
+        return scores
@@ -0,0 +1,13 @@
+"""Plugin de pytest: la carpeta del addon tiene un __init__.py que importa bpy, así que se
+recorre como una carpeta normal en lugar de importarla como paquete."""
+import os
+
+import pytest
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def pytest_collect_directory(path, parent):
+    if str(path) == ADDON_DIR:
+        return pytest.Dir.from_parent(parent, path=path)
+    return None
@@ -0,0 +1,118 @@
+"""Configuración de pytest para los módulos del addon que no dependen de bpy.
+
+El ``__init__.py`` del addon importa bpy, así que el paquete se registra como un paquete
+vacío que apunta a la carpeta del addon y los módulos se importan directamente.
+"""
+import importlib.util
+import os
+import struct
+import sys
+import types
+
+import pytest
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "asset_manager"
+# Nombre con el que se carga el addon completo en las pruebas que necesitan bpy
+ADDON_MODULE = "asset_manager_bpy_tests"
+
+if PACKAGE_NAME not in sys.modules:
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [ADDON_DIR]
+    sys.modules[PACKAGE_NAME] = package
+
+
+def _sdna(little_endian=True, pointer_size=8):
+    """Bloque DNA1 mínimo con ID {void *next; char name[66];} e Image {ID id; char filepath[1024];}"""
+    prefix = '<' if little_endian else '>'
+
+    def strings(values):
+        data = b''.join(value.encode('ascii') + b'\0' for value in values)
+        return data + b'\0' * (-len(data) % 4)
+
+    names = ['*next', 'name[66]', 'id', 'filepath[1024]']
+    types_ = ['char', 'void', 'ID', 'Image']
+    id_size = pointer_size + 66
+    data = b'SDNA' + b'NAME' + struct.pack(prefix + 'i', len(names)) + strings(names)
+    data += b'TYPE' + struct.pack(prefix + 'i', len(types_)) + strings(types_)
+    lengths = struct.pack(f'{prefix}{len(types_)}h', 1, 0, id_size, id_size + 1024)
+    data += b'TLEN' + lengths + b'\0' * (-len(lengths) % 4)
+    data += b'STRC' + struct.pack(prefix + 'i', 2)
+    data += struct.pack(prefix + 'hh', 2, 2) + struct.pack(prefix + 'hhhh', 1, 0, 0, 1)
+    data += struct.pack(prefix + 'hh', 3, 2) + struct.pack(prefix + 'hhhh', 2, 2, 0, 3)
+    return data, id_size
+
+
+def _build_blend(ids, images=(), version=402, header_format='4x', pointer_size=8, little_endian=True, with_dna=True):
+    """Bytes de un .blend sintético con los IDs ``[(código, nombre)]`` e imágenes ``[(nombre, ruta)]``
+
+    ``header_format`` es '4x' (cabecera de 12 bytes) o '5x' (cabecera de 17 bytes de Blender 5.0+).
+    """
+    prefix = '<' if little_endian else '>'
+    endian = b'v' if little_endian else b'V'
+    if header_format == '5x':
+        header = b'BLENDER17-01' + endian + f'{version:04d}'.encode('ascii')
+        bhead = struct.Struct(prefix + '4siQqq')
+
+        def block(code, data):
+            return bhead.pack(code, 0, 0, len(data), 1) + data
+    else:
+        header = b'BLENDER' + (b'-' if pointer_size == 8 else b'_') + endian + f'{version:03d}'.encode('ascii')
+        bhead = struct.Struct(prefix + ('4siQii' if pointer_size == 8 else '4siIii'))
+
+        def block(code, data):
+            return bhead.pack(code, len(data), 0, 0, 1) + data
+
+    dna, id_size = _sdna(little_endian, pointer_size)
+    id_name_offset = pointer_size if with_dna else 5 * pointer_size
+    out = [header]
+    for code, name in ids:
+        head = bytearray(max(id_size, id_name_offset + 66))
+        encoded = (code + name).encode('utf-8')
+        head[id_name_offset:id_name_offset + len(encoded)] = encoded
+        out.append(block(code.encode('ascii') + b'\0\0', bytes(head)))
+    for name, path in images:
+        head = bytearray(id_size + 1024)
+        encoded = ('IM' + name).encode('utf-8')
+        head[pointer_size:pointer_size + len(encoded)] = encoded
+        head[id_size:id_size + len(path)] = path.encode('utf-8')
+        out.append(block(b'IM\0\0', bytes(head)))
+    out.append(block(b'DATA', b'\0' * 64))
+    if with_dna:
+        out.append(block(b'DNA1', dna))
+    out.append(block(b'ENDB', b''))
+    return b''.join(out)
+
+
+@pytest.fixture
+def blend_file(tmp_path):
+    """Escribe un .blend sintético y devuelve su ruta"""
+    def write(name="asset.blend", data=None, **kwargs):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data if data is not None else _build_blend(**kwargs))
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def build_blend():
+    """Función que genera los bytes de un .blend sintético (ver _build_blend)"""
+    return _build_blend
+
+
+@pytest.fixture(scope="session")
+def addon():
+    """El addon completo (con bpy) registrado; las pruebas que lo usan se saltan sin bpy"""
+    pytest.importorskip("bpy")
+    module = sys.modules.get(ADDON_MODULE)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            ADDON_MODULE, os.path.join(ADDON_DIR, "__init__.py"), submodule_search_locations=[ADDON_DIR]
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[ADDON_MODULE] = module
+        spec.loader.exec_module(module)
+    module.register()
+    yield module
+    module.unregister()
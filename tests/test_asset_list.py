@@ -0,0 +1,56 @@
+"""Lista de assets y su índice de búsqueda; necesitan bpy (Blender o el módulo bpy de PyPI)."""
+import os
+
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+from asset_manager.library_index import IndexEntry  # noqa: E402
+
+
+@pytest.fixture
+def library_props(addon, tmp_path):
+    scene = bpy.data.scenes.new("AssetListTest")
+    props = scene.asset_library
+    props.library_path = str(tmp_path)
+    yield props
+    bpy.data.scenes.remove(scene)
+
+
+def entry(path):
+    return IndexEntry(path, 0, 0, 'COLLECTION', {'objects': [os.path.basename(path)]})
+
+
+def test_items_update_the_index_without_rebuilding_it(addon, library_props, tmp_path, monkeypatch):
+    paths = [str(tmp_path / f"asset_{i}.blend") for i in range(50)]
+    search_index = addon.get_search_index(library_props)
+    added = []
+    # La clase del addon cargado con bpy, no la del paquete de pruebas sin bpy
+    index_class = type(search_index)
+    original_add = index_class.add
+
+    def counting_add(self, key, *args, **kwargs):
+        added.append(key)
+        return original_add(self, key, *args, **kwargs)
+
+    monkeypatch.setattr(index_class, "add", counting_add)
+    for path in paths:
+        library_props.add_asset_item(path, entry(path))
+    assert added == paths
+    for path in paths[:10]:
+        library_props.remove_asset_item(path)
+
+    assert addon.get_search_index(library_props) is search_index
+    assert len(search_index) == len(library_props.assets) == 40
+    assert added == paths
+    assert set(search_index.search('asset')) == set(paths[10:])
+
+
+def test_index_is_rebuilt_from_items_when_discarded(addon, library_props, tmp_path):
+    path = str(tmp_path / "chair.blend")
+    library_props.add_asset_item(path, entry(path))
+    addon._clear_search_indexes()
+
+    search_index = addon.get_search_index(library_props)
+    assert path in search_index
+    assert len(search_index) == 1
@@ -0,0 +1,64 @@
+import gzip
+
+import pytest
+
+from asset_manager.blend_reader import BlendFileError, read_blend_info
+
+IDS = [('OB', 'Cube'), ('ME', 'Cube_mesh'), ('MA', 'Metal'), ('NT', 'Scatter'), ('GR', 'Props')]
+
+
+def test_reads_id_names_through_sdna(blend_file):
+    info = read_blend_info(blend_file(ids=IDS, images=[('Albedo', '//textures/albedo.png')]))
+    assert info.version == 402
+    assert info.pointer_size == 8
+    assert info.compression == 'NONE'
+    assert info.datablocks == {
+        'objects': ['Cube'], 'meshes': ['Cube_mesh'], 'materials': ['Metal'],
+        'node_groups': ['Scatter'], 'images': ['Albedo'], 'collections': ['Props'],
+    }
+    assert info.image_paths == [('Albedo', '//textures/albedo.png')]
+    assert info.bytes_read > 0
+
+
+def test_without_sdna_uses_default_id_layout(blend_file):
+    info = read_blend_info(blend_file(ids=[('OB', 'Cube')], with_dna=False))
+    assert info.datablocks['objects'] == ['Cube']
+
+
+def test_32_bit_pointers(blend_file):
+    info = read_blend_info(blend_file(ids=[('MA', 'Glass')], pointer_size=4))
+    assert info.pointer_size == 4
+    assert info.datablocks['materials'] == ['Glass']
+
+
+def test_blender_5_header(blend_file):
+    info = read_blend_info(blend_file(ids=IDS, header_format='5x', version=500))
+    assert info.version == 500
+    assert info.datablocks['objects'] == ['Cube']
+    assert info.datablocks['node_groups'] == ['Scatter']
+
+
+def test_gzip_compressed(blend_file, build_blend):
+    info = read_blend_info(blend_file(data=gzip.compress(build_blend(ids=IDS))))
+    assert info.compression == 'GZIP'
+    assert info.datablocks['materials'] == ['Metal']
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_truncated_file_raises_blend_file_error(blend_file, build_blend, compress):
+    data = build_blend(ids=IDS)
+    if compress:
+        data = gzip.compress(data)
+    with pytest.raises(BlendFileError):
+        read_blend_info(blend_file(data=data[:len(data) // 2]))
+
+
+@pytest.mark.parametrize("data", [b'', b'not a blend file', b'BLENDER?v402', b'BLENDER17-02v0500'])
+def test_invalid_headers(blend_file, data):
+    with pytest.raises(BlendFileError):
+        read_blend_info(blend_file(data=data))
+
+
+def test_missing_file_raises_os_error(tmp_path):
+    with pytest.raises(OSError):
+        read_blend_info(str(tmp_path / "missing.blend"))
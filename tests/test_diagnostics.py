@@ -0,0 +1,115 @@
+import json
+import threading
+
+import pytest
+
+from asset_manager import diagnostics
+from asset_manager.diagnostics import Recorder
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj manual para diagnostics.time.perf_counter"""
+    now = [0.0]
+    monkeypatch.setattr(diagnostics.time, "perf_counter", lambda: now[0])
+
+    def advance(seconds):
+        now[0] += seconds
+    return advance
+
+
+def test_counters_propagate_to_enclosing_span(clock):
+    recorder = Recorder()
+    with recorder.span("load", assets=2):
+        with recorder.span("load.read_file"):
+            recorder.count(files=1, bytes_read=100)
+            clock(0.5)
+        with recorder.span("load.read_file") as span:
+            span.count(files=1, bytes_read=50)
+            clock(0.25)
+        clock(0.1)
+
+    events = {event.name: event for event in recorder.events}
+    assert [event.name for event in recorder.events] == ["load.read_file", "load.read_file", "load"]
+    assert events["load"].counters == {"files": 2, "bytes_read": 150}
+    assert events["load"].depth == 0 and events["load.read_file"].depth == 1
+    assert events["load"].args == {"assets": 2}
+
+    rows = {row["name"]: row for row in recorder.summary()}
+    assert rows["load.read_file"]["count"] == 2
+    assert rows["load.read_file"]["total_ms"] == pytest.approx(750)
+    assert rows["load.read_file"]["max_ms"] == pytest.approx(500)
+    assert recorder.summary()[0]["name"] == "load"
+
+
+def test_disabled_recorder_records_nothing():
+    recorder = Recorder()
+    recorder.enabled = False
+    with recorder.span("save") as span:
+        span.count(files=1)
+        recorder.count(files=1)
+    assert not recorder.events
+    assert recorder.summary() == []
+
+
+def test_ring_buffer_keeps_latest_events():
+    recorder = Recorder(size=3)
+    for i in range(5):
+        with recorder.span(f"op{i}"):
+            pass
+    assert [event.name for event in recorder.events] == ["op2", "op3", "op4"]
+
+
+def test_frequent_spans_do_not_evict_events(clock):
+    recorder = Recorder(size=4)
+    with recorder.span("load"):
+        clock(1.0)
+    for _ in range(1000):
+        with recorder.span("ui.draw_panel", frequent=True):
+            clock(0.001)
+    with recorder.span("ui.draw_panel", frequent=True):
+        clock(diagnostics.FREQUENT_THRESHOLD * 2)
+
+    # Solo el redibujado lento pasa al buffer
+    assert [event.name for event in recorder.events] == ["load", "ui.draw_panel"]
+    rows = {row["name"]: row for row in recorder.summary()}
+    assert rows["ui.draw_panel"]["count"] == 1001
+    assert rows["ui.draw_panel"]["p50_ms"] == pytest.approx(1)
+    assert rows["ui.draw_panel"]["max_ms"] == pytest.approx(diagnostics.FREQUENT_THRESHOLD * 2000)
+    assert rows["load"]["count"] == 1
+
+    recorder.clear()
+    assert recorder.summary() == []
+
+
+def test_spans_from_threads_are_independent():
+    recorder = Recorder()
+
+    def work():
+        with recorder.span("cache.prefetch"):
+            recorder.count(files=1)
+
+    with recorder.span("load"):
+        thread = threading.Thread(target=work, name="asset_cache_0")
+        thread.start()
+        thread.join()
+    events = {event.name: event for event in recorder.events}
+    assert events["cache.prefetch"].depth == 0
+    assert events["load"].counters == {}
+
+
+def test_exports(tmp_path):
+    recorder = Recorder()
+    with recorder.span("scan.inspect_file", path="chair.blend"):
+        recorder.count(files=1)
+
+    recorder.export_json(str(tmp_path / "diagnostics.json"))
+    data = json.loads((tmp_path / "diagnostics.json").read_text(encoding='utf-8'))
+    assert data["events"][0]["name"] == "scan.inspect_file"
+    assert data["summary"][0]["counters"] == {"files": 1}
+
+    recorder.export_chrome_trace(str(tmp_path / "trace.json"))
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding='utf-8'))["traceEvents"]
+    complete = [event for event in trace if event["ph"] == "X"]
+    assert complete[0]["args"] == {"path": "chair.blend", "files": 1}
+    assert any(event["ph"] == "M" for event in trace)
@@ -0,0 +1,68 @@
+"""Huellas de deduplicación; necesitan bpy (Blender o el módulo bpy de PyPI)."""
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+
+@pytest.fixture(autouse=True)
+def empty_file():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def ramp_material(name, position):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    ramp = material.node_tree.nodes.new('ShaderNodeValToRGB')
+    ramp.color_ramp.elements[1].position = position
+    return material
+
+
+def value_material(name, value):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    node = material.node_tree.nodes.new('ShaderNodeValue')
+    node.outputs[0].default_value = value
+    return material
+
+
+def curve_material(name, y):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    curves = material.node_tree.nodes.new('ShaderNodeRGBCurve')
+    curves.mapping.curves[3].points.new(0.5, y)
+    return material
+
+
+@pytest.mark.parametrize("build, same, different", [
+    (ramp_material, 1.0, 0.5),
+    (value_material, 0.25, 0.75),
+    (curve_material, 0.5, 0.8),
+])
+def test_fingerprint_sees_nested_structs_and_outputs(addon, build, same, different):
+    fingerprint = addon.AssetManager.datablock_fingerprint
+    original = build("Asset", same)
+    assert fingerprint(original, {}) == fingerprint(build("Asset", same), {})
+    assert fingerprint(original, {}) != fingerprint(build("Asset", different), {})
+
+
+def test_deduplicate_keeps_materials_that_differ_only_in_a_ramp_stop(addon):
+    manager = addon.AssetManager
+    existing = ramp_material("Ramp", 1.0)
+    before = manager.snapshot_datablocks()
+    loaded = ramp_material("Ramp", 0.5)
+
+    replacements = manager.deduplicate_datablocks(before, {}, {})
+    assert replacements == {}
+    assert loaded.name in bpy.data.materials
+    assert existing.name in bpy.data.materials
+
+
+def test_deduplicate_replaces_identical_material(addon):
+    manager = addon.AssetManager
+    existing = ramp_material("Ramp", 0.5)
+    before = manager.snapshot_datablocks()
+    pointer = ramp_material("Ramp", 0.5).as_pointer()
+
+    replacements = manager.deduplicate_datablocks(before, {}, {})
+    assert replacements[pointer] == existing
+    assert len(bpy.data.materials) == 1
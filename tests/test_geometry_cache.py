@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+from asset_manager.geometry_cache import (ALIGNMENT, MAGIC, GeometryCacheError, GeometryFile, geometry_path,
+                                          write_geometry)
+from asset_manager.library_index import INDEX_DIRNAME
+
+
+def cube_mesh(name, offset=(0.0, 0.0, 0.0)):
+    co = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float32)
+    return {
+        'name': name,
+        'mesh': name + "_mesh",
+        'matrix': np.eye(4).ravel(),
+        'offset': offset,
+        'arrays': {
+            'co': co,
+            'loops': np.arange(24, dtype=np.int32) % 8,
+            'loop_start': np.arange(0, 24, 4, dtype=np.int32),
+            'uv': np.empty((0, 2), dtype=np.float32),
+        },
+    }
+
+
+def test_geometry_path_mirrors_library_layout(tmp_path):
+    path = geometry_path(str(tmp_path), str(tmp_path / "props" / "chair.blend"))
+    assert path == os.path.join(str(tmp_path), INDEX_DIRNAME, "geometry", "props", "chair.blend.amgeo")
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "chair.amgeo")
+    meshes = [cube_mesh("Seat"), cube_mesh("Leg", offset=(0.5, 0.5, -1.0))]
+    write_geometry(path, meshes, source_size=1234, source_mtime=5678)
+
+    with open(path, 'rb') as f:
+        assert f.read(len(MAGIC)) == MAGIC
+    with GeometryFile(path) as geometry:
+        assert geometry.matches(1234, 5678)
+        assert not geometry.matches(1234, 5679)
+        assert [obj['name'] for obj in geometry.objects] == ["Seat", "Leg"]
+        leg = geometry.objects[1]
+        assert leg['mesh'] == "Leg_mesh"
+        assert leg['offset'] == [0.5, 0.5, -1.0]
+        assert leg['matrix'] == list(np.eye(4).ravel())
+        for key, array in meshes[1]['arrays'].items():
+            stored = geometry.array(leg, key)
+            assert stored.dtype == array.dtype
+            np.testing.assert_array_equal(stored, array)
+            assert leg['arrays'][key]['offset'] % ALIGNMENT == 0
+        assert not geometry.array(leg, 'co').flags.writeable
+        assert geometry.array(leg, 'normals') is None
+        del stored
+
+
+def test_rewrite_replaces_file_atomically(tmp_path):
+    path = str(tmp_path / "sub" / "chair.amgeo")
+    write_geometry(path, [cube_mesh("A")], 1, 1)
+    write_geometry(path, [cube_mesh("B")], 2, 2)
+    assert os.listdir(os.path.dirname(path)) == ["chair.amgeo"]
+    with GeometryFile(path) as geometry:
+        assert [obj['name'] for obj in geometry.objects] == ["B"]
+        assert geometry.matches(2, 2)
+
+
+@pytest.mark.parametrize("data", [b'', b'NOTGEO\0\0' + b'\0' * 16, MAGIC + b'\x01\x00' + b'\xff' * 8 + b'{'])
+def test_invalid_files_raise_geometry_cache_error(tmp_path, data):
+    path = tmp_path / "bad.amgeo"
+    path.write_bytes(data)
+    with pytest.raises(GeometryCacheError):
+        GeometryFile(str(path))
+
+
+def test_missing_file_raises_geometry_cache_error(tmp_path):
+    with pytest.raises(GeometryCacheError):
+        GeometryFile(str(tmp_path / "missing.amgeo"))
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+
+from asset_manager.library_index import INDEX_DIRNAME, INDEX_FILENAME, SCHEMA_VERSION, LibraryIndex, classify_asset
+
+
+def test_classify_asset():
+    assert classify_asset({'materials': ['Metal'], 'objects': ['Cube']}) == 'MATERIAL'
+    assert classify_asset({'node_groups': ['Scatter'], 'objects': ['Cube']}) == 'NODES'
+    assert classify_asset({'objects': ['Cube']}) == 'MESH'
+    assert classify_asset({}) == 'UNKNOWN'
+
+
+def test_entries_persist_with_relative_paths(tmp_path):
+    library = tmp_path / "library"
+    path = str(library / "props" / "chair.blend")
+    index = LibraryIndex(str(library))
+    entry = index.upsert(path, 10, 200, 'MESH', {'objects': ['Chair']}, bounds=[0, 0, 0, 1, 1, 1])
+    index.commit()
+    index.close()
+    assert entry.path == 'props/chair.blend'
+    assert os.path.exists(library / INDEX_DIRNAME / INDEX_FILENAME)
+
+    reopened = LibraryIndex(str(library))
+    entry = reopened.get(path)
+    assert entry.asset_type == 'MESH'
+    assert entry.datablocks == {'objects': ['Chair']}
+    assert entry.bounds == (0, 0, 0, 1, 1, 1)
+    assert entry.counts == {'objects': 1}
+    assert reopened.abspath(entry.path) == os.path.abspath(path)
+    assert set(reopened.entries()) == {'props/chair.blend'}
+    reopened.close()
+
+
+def test_lookup_requires_matching_mtime_and_size(tmp_path):
+    index = LibraryIndex(str(tmp_path))
+    path = str(tmp_path / "chair.blend")
+    index.upsert(path, 10, 200, 'MESH', {'objects': ['Chair']})
+    assert index.lookup(path, 10, 200) is not None
+    assert index.lookup(path, 11, 200) is None
+    assert index.lookup(path, 10, 201) is None
+    assert index.get(str(tmp_path / "missing.blend")) is None
+
+    index.remove(path)
+    assert index.get(path) is None
+    index.close()
+
+
+def test_prune_removes_missing_files_optionally_per_folder(tmp_path):
+    index = LibraryIndex(str(tmp_path))
+    paths = [str(tmp_path / name) for name in ("a.blend", "b.blend", "props/c.blend", "props/d.blend")]
+    for path in paths:
+        index.upsert(path, 1, 1, 'MESH', {})
+
+    # Solo se podan las entradas directamente en 'props'
+    assert index.prune([paths[2]], folder='props') == 1
+    assert set(index.entries()) == {'a.blend', 'b.blend', 'props/c.blend'}
+    assert index.prune([paths[0]]) == 2
+    assert set(index.entries()) == {'a.blend'}
+    index.close()
+
+
+def test_folder_summary_is_keyed_by_mtime(tmp_path):
+    index = LibraryIndex(str(tmp_path))
+    index.set_folder_summary('props', 5, 12, True)
+    assert index.folder_summary('props', 5) == (12, True)
+    assert index.folder_summary('props', 6) is None
+    index.close()
+
+
+def test_schema_change_discards_old_entries(tmp_path):
+    index = LibraryIndex(str(tmp_path))
+    index.upsert(str(tmp_path / "chair.blend"), 1, 1, 'MESH', {})
+    index.commit()
+    index.close()
+    conn = sqlite3.connect(str(tmp_path / INDEX_DIRNAME / INDEX_FILENAME))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    conn.commit()
+    conn.close()
+
+    assert LibraryIndex(str(tmp_path)).entries() == {}
+
+
+def test_unwritable_library_falls_back_to_memory(tmp_path):
+    # La carpeta del índice no se puede crear porque ya existe un archivo con ese nombre
+    (tmp_path / INDEX_DIRNAME).write_text("")
+    index = LibraryIndex(str(tmp_path))
+    index.upsert(str(tmp_path / "chair.blend"), 1, 1, 'MESH', {})
+    index.commit()
+    assert set(index.entries()) == {'chair.blend'}
+    index.close()
@@ -0,0 +1,123 @@
+import itertools
+import os
+
+import pytest
+
+from asset_manager import local_cache
+from asset_manager.local_cache import LocalCache
+
+
+@pytest.fixture
+def library(tmp_path):
+    path = tmp_path / "library"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def make_cache(tmp_path, library, monkeypatch):
+    # Reloj que siempre avanza, para que el orden LRU no dependa de la resolución de time.time
+    clock = itertools.count(1000)
+    monkeypatch.setattr(local_cache.time, "time", lambda: float(next(clock)))
+    caches = []
+
+    def make(max_bytes=1 << 20):
+        cache = LocalCache(str(tmp_path / "cache"), str(library), max_bytes)
+        caches.append(cache)
+        return cache
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_fetch_copies_and_reuses_local_copy(library, make_cache):
+    cache = make_cache()
+    original = write(library / "props" / "chair.blend", b'chair')
+
+    local = cache.fetch(original)
+    assert local != original
+    assert local.startswith(cache.root)
+    assert open(local, 'rb').read() == b'chair'
+    assert cache.original_path(local) == original
+    assert cache.fetch(original) == local
+    assert cache.usage() == (1, 5)
+
+    # Otra sesión reutiliza el manifiesto y la copia
+    assert make_cache().fetch(original) == local
+
+
+def test_changed_original_invalidates_copy(library, make_cache):
+    cache = make_cache()
+    original = write(library / "chair.blend", b'old')
+    local = cache.fetch(original)
+
+    write(library / "chair.blend", b'new version')
+    stat = os.stat(original)
+    os.utime(original, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.fetch(original) == local
+    assert open(local, 'rb').read() == b'new version'
+
+
+def test_corrupt_copy_is_copied_again(library, make_cache):
+    original = write(library / "chair.blend", b'chair')
+    local = make_cache().fetch(original)
+    with open(local, 'wb') as f:
+        f.write(b'CHAIR')
+
+    assert make_cache().fetch(original) == local
+    assert open(local, 'rb').read() == b'chair'
+
+
+def test_missing_original_uses_valid_copy(library, make_cache):
+    cache = make_cache()
+    original = write(library / "chair.blend", b'chair')
+    local = cache.fetch(original)
+    os.remove(original)
+    assert cache.fetch(original) == local
+
+
+def test_paths_outside_library_are_not_cached(tmp_path, make_cache):
+    cache = make_cache()
+    outside = write(tmp_path / "elsewhere" / "chair.blend", b'chair')
+    assert cache.fetch(outside) == outside
+    assert cache.usage() == (0, 0)
+    assert cache.original_path(outside) is None
+
+
+def test_least_recently_used_copies_are_evicted(library, make_cache):
+    cache = make_cache(max_bytes=25)
+    paths = [write(library / f"asset_{i}.blend", bytes([i]) * 10) for i in range(3)]
+    first = cache.fetch(paths[0])
+    second = cache.fetch(paths[1])
+    # Se usa la primera otra vez, así que la que menos se ha usado es la segunda
+    cache.fetch(paths[0])
+    third = cache.fetch(paths[2])
+
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+    assert os.path.exists(third)
+    assert cache.usage() == (2, 20)
+
+    cache.clear()
+    assert cache.usage() == (0, 0)
+    assert not os.path.exists(first)
+
+
+def test_prefetch_copies_in_background(library, make_cache):
+    cache = make_cache()
+    paths = [write(library / f"asset_{i}.blend", bytes([i]) * 100) for i in range(local_cache.PREFETCH_QUEUE_LIMIT + 8)]
+    cache.prefetch(paths)
+    # fetch espera a la copia en curso en lugar de repetirla
+    locals_ = [cache.fetch(path) for path in paths[:4]]
+    assert all(open(local, 'rb').read() == open(path, 'rb').read() for local, path in zip(locals_, paths))
+
+    cache._executor.shutdown(wait=True)
+    assert not cache._pending
+    # La cola está limitada: solo se copian por adelantado PREFETCH_QUEUE_LIMIT archivos
+    assert cache.usage()[0] == local_cache.PREFETCH_QUEUE_LIMIT
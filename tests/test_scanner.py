@@ -0,0 +1,79 @@
+import threading
+import time
+
+from asset_manager.scanner import LibraryScan
+
+
+def drain_all(scan, timeout=5.0):
+    results = []
+    deadline = time.monotonic() + timeout
+    while not scan.finished and time.monotonic() < deadline:
+        results.extend(scan.drain(100))
+        time.sleep(0.001)
+    return results
+
+
+def test_results_keep_their_jobs():
+    jobs = [(f"/lib/asset_{i}.blend", i) for i in range(20)]
+    scan = LibraryScan("/lib", jobs, lambda path: path.upper(), max_workers=4)
+    results = drain_all(scan)
+    assert scan.finished
+    assert scan.progress == 1.0
+    assert sorted(job for job, _, _ in results) == sorted(jobs)
+    assert all(result == job[0].upper() and error is None for job, result, error in results)
+
+
+def test_errors_are_returned_with_their_job():
+    def inspect(path):
+        if path.endswith("bad.blend"):
+            raise ValueError("archivo corrupto")
+        return path
+
+    scan = LibraryScan("/lib", [("/lib/good.blend",), ("/lib/bad.blend",)], inspect)
+    results = {job[0]: (result, error) for job, result, error in drain_all(scan)}
+    assert results["/lib/good.blend"] == ("/lib/good.blend", None)
+    result, error = results["/lib/bad.blend"]
+    assert result is None
+    assert isinstance(error, ValueError)
+
+
+def test_extend_adds_to_running_scan():
+    scan = LibraryScan("/lib", [("/lib/a.blend",)], lambda path: path)
+    scan.extend([("/lib/b.blend",), ("/lib/c.blend",)])
+    assert scan.total == 3
+    assert len(drain_all(scan)) == 3
+
+
+def test_drain_limits_batch_size():
+    scan = LibraryScan("/lib", [(f"/lib/{i}.blend",) for i in range(10)], lambda path: path)
+    while scan._results.qsize() < 10:
+        time.sleep(0.001)
+    assert len(scan.drain(4)) == 4
+    assert scan.completed == 4
+    assert 0 < scan.progress < 1
+    assert not scan.finished
+
+
+def test_cancel_stops_pending_jobs():
+    release = threading.Event()
+    started = []
+
+    def inspect(path):
+        started.append(path)
+        release.wait(5.0)
+        return path
+
+    scan = LibraryScan("/lib", [(f"/lib/{i}.blend",) for i in range(50)], inspect, max_workers=2)
+    scan.cancel()
+    release.set()
+    assert scan.cancelled
+    assert scan.finished
+    time.sleep(0.05)
+    assert len(started) <= 2
+    assert scan.total == 50
+
+
+def test_empty_scan_is_finished():
+    scan = LibraryScan("/lib", [], lambda path: path)
+    assert scan.finished
+    assert scan.progress == 1.0
@@ -0,0 +1,68 @@
+from asset_manager.search_index import SCORE_EXACT, SCORE_FUZZY, SearchIndex, trigrams
+
+
+def make_index():
+    index = SearchIndex()
+    index.add('/lib/wooden_chair.blend', 'Wooden_Chair', 'COLLECTION', ['Chair', 'Oak'])
+    index.add('/lib/chair.blend', 'Chair', 'COLLECTION', ['Chair'])
+    index.add('/lib/brick.blend', 'Brick', 'MATERIAL', ['Brick_Red'])
+    return index
+
+
+def test_trigrams():
+    assert trigrams('chair') == {'cha', 'hai', 'air'}
+    assert trigrams('ab') == set()
+
+
+def test_ranks_exact_before_prefix_and_substring():
+    scores = make_index().search('chair')
+    assert scores['/lib/chair.blend'] == SCORE_EXACT
+    assert scores['/lib/chair.blend'] > scores['/lib/wooden_chair.blend']
+    assert '/lib/brick.blend' not in scores
+
+
+def test_matches_datablock_names_and_all_terms():
+    index = make_index()
+    assert set(index.search('oak')) == {'/lib/wooden_chair.blend'}
+    assert set(index.search('chair oak')) == {'/lib/wooden_chair.blend'}
+    assert set(index.search('red')) == {'/lib/brick.blend'}
+
+
+def test_fuzzy_match_tolerates_typos():
+    scores = make_index().search('brik_red')
+    assert 0 < scores['/lib/brick.blend'] <= SCORE_FUZZY
+
+
+def test_filters_by_asset_type():
+    index = make_index()
+    assert set(index.search('', 'MATERIAL')) == {'/lib/brick.blend'}
+    assert index.search('chair', 'MATERIAL') == {}
+
+
+def test_add_and_remove_keep_index_in_sync():
+    index = make_index()
+    generation = index.generation
+    index.add('/lib/chair.blend', 'Stool', 'COLLECTION', [])
+    assert len(index) == 3
+    assert '/lib/chair.blend' not in index.search('chair')
+    assert '/lib/chair.blend' in index.search('stool')
+
+    index.remove('/lib/chair.blend')
+    index.remove('/lib/missing.blend')
+    assert len(index) == 2
+    assert '/lib/chair.blend' not in index
+    assert index.search('stool') == {}
+    assert index.generation > generation
+    # No quedan listas de trigramas vacías de los documentos quitados
+    assert all(index._postings.values())
+
+
+def test_search_cache_is_invalidated_on_change():
+    index = make_index()
+    assert index.search('brick') is index.search('brick')
+    index.add('/lib/brick_wall.blend', 'Brick_Wall', 'COLLECTION', [])
+    assert '/lib/brick_wall.blend' in index.search('brick')
+
+    index.clear()
+    assert len(index) == 0
+    assert index.search('brick') == {}
@@ -0,0 +1,35 @@
+import gzip
+import struct
+
+from asset_manager.texture_store import collect_garbage, store_bytes, store_path, verify_store
+
+
+def test_verify_store_reports_referenced_and_unreferenced(tmp_path, blend_file):
+    library = str(tmp_path)
+    used, _ = store_bytes(library, b'used', '.png')
+    orphan, _ = store_bytes(library, b'orphan', '.png')
+    relative = '//' + used[len(library) + 1:].replace('\\', '/')
+    blend_file("wood.blend", ids=[('OB', 'Plank')], images=[('Albedo', relative)])
+
+    report = verify_store(library)
+    assert report.unreadable == []
+    assert report.missing == []
+    assert sorted(report.stored) == sorted([used, orphan])
+    assert report.unreferenced == [orphan]
+
+
+def test_corrupt_asset_is_reported_as_unreadable(tmp_path, blend_file, build_blend):
+    library = str(tmp_path)
+    store_bytes(library, b'orphan', '.png')
+    blend_file("good.blend", ids=[('OB', 'Plank')])
+    truncated = blend_file("truncated.blend", data=gzip.compress(build_blend(ids=[('OB', 'Cube')]))[:-12])
+    cut = blend_file("cut.blend", data=b'BLENDER-v402' + struct.pack('<4siQii', b'OB\0\0', 1000, 0, 0, 1) + b'\0' * 8)
+
+    report = verify_store(library)
+    assert sorted(path for path, _ in report.unreadable) == sorted([truncated, cut])
+    assert not report.safe_to_collect
+    # Con assets ilegibles no se borra ninguna textura
+    collect_garbage(library, report)
+    assert report.removed_bytes == 0
+    assert len(report.unreferenced) == 1
+    assert store_path(library) in report.unreferenced[0]
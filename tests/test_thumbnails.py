@@ -0,0 +1,102 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from asset_manager import thumbnails
+from asset_manager.library_index import INDEX_DIRNAME
+
+
+def read_png(path):
+    """Píxeles RGBA de un PNG escrito por write_png (sin filtros, un solo IDAT)"""
+    data = open(path, 'rb').read()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    pos, chunks = 8, {}
+    while pos < len(data):
+        length, tag = struct.unpack_from('>I4s', data, pos)
+        body = data[pos + 8:pos + 8 + length]
+        assert struct.unpack_from('>I', data, pos + 8 + length)[0] == zlib.crc32(tag + body) & 0xFFFFFFFF
+        chunks[tag] = body
+        pos += 12 + length
+    width, height = struct.unpack_from('>II', chunks[b'IHDR'])
+    raw = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8).reshape(height, width * 4 + 1)
+    return raw[:, 1:].reshape(height, width, 4)
+
+
+def quad():
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float64)
+    triangles = thumbnails.triangulate([0, 1, 2, 3], [0])
+    return vertices, triangles
+
+
+def test_triangulate_fans_polygons():
+    triangles = thumbnails.triangulate([0, 1, 2, 3, 4, 5, 6, 4, 6, 7], [0, 4, 7])
+    np.testing.assert_array_equal(triangles, [[0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7]])
+
+
+def test_triangulate_skips_degenerate_polygons():
+    assert thumbnails.triangulate([0, 1], [0]).shape == (0, 3)
+    assert thumbnails.triangulate([], []).shape == (0, 3)
+
+
+def test_render_draws_shaded_opaque_geometry():
+    vertices, triangles = quad()
+    image = thumbnails.render(vertices, triangles, size=32)
+    assert image.shape == (32, 32, 4)
+    assert image.dtype == np.uint8
+    covered = image[..., 3] == 255
+    assert covered.any() and not covered.all()
+    assert image[..., 3][0, 0] == 0
+    # El color es el gris por defecto sombreado, sin canales distintos
+    rgb = image[covered][:, :3]
+    assert (rgb[:, 0] == rgb[:, 1]).all() and (rgb[:, 1] == rgb[:, 2]).all()
+    np.testing.assert_array_equal(image, thumbnails.render(vertices, triangles, size=32))
+
+
+def test_render_uses_triangle_colors():
+    vertices, triangles = quad()
+    image = thumbnails.render(vertices, triangles, colors=[(1, 0, 0), (1, 0, 0)], size=16)
+    covered = image[image[..., 3] == 255]
+    assert (covered[:, 0] > 0).all()
+    assert (covered[:, 1:3] == 0).all()
+
+
+def test_render_without_triangles_is_transparent():
+    assert not thumbnails.render(np.zeros((0, 3)), np.zeros((0, 3)), size=8).any()
+
+
+def test_generate_thumbnail_writes_png(tmp_path):
+    path = thumbnails.thumbnail_path(str(tmp_path), str(tmp_path / "props" / "chair.blend"))
+    assert path == os.path.join(str(tmp_path), INDEX_DIRNAME, "thumbnails", "props", "chair.blend.png")
+    thumbnails.forget_listings()
+    assert not thumbnails.has_thumbnail(path)
+
+    vertices, triangles = quad()
+    assert thumbnails.generate_thumbnail(path, vertices, triangles, size=16) == path
+    # El listado recordado se actualiza al escribir
+    assert thumbnails.has_thumbnail(path)
+    np.testing.assert_array_equal(read_png(path), thumbnails.render(vertices, triangles, size=16))
+
+    thumbnails.remove_thumbnail(path)
+    assert not os.path.exists(path)
+    assert not thumbnails.has_thumbnail(path)
+
+
+def test_generate_thumbnail_without_geometry(tmp_path):
+    path = str(tmp_path / "empty.png")
+    assert thumbnails.generate_thumbnail(path, np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)) is None
+    assert not os.path.exists(path)
+
+
+def test_has_thumbnail_lists_each_folder_once(tmp_path):
+    thumbnails.forget_listings()
+    folder = tmp_path / "thumbs"
+    folder.mkdir()
+    (folder / "a.blend.png").write_bytes(b'')
+    assert thumbnails.has_thumbnail(str(folder / "a.blend.png"))
+    (folder / "b.blend.png").write_bytes(b'')
+    # Hasta olvidar el listado no se ve el archivo nuevo
+    assert not thumbnails.has_thumbnail(str(folder / "b.blend.png"))
+    thumbnails.forget_listings()
+    assert thumbnails.has_thumbnail(str(folder / "b.blend.png"))
@@ -0,0 +1,185 @@
+"""Almacén de texturas compartido y direccionado por contenido.
+
+Cada imagen se guarda una sola vez en ``<biblioteca>/.asset_manager/textures/<xx>/<hash><ext>``
+y los assets la referencian por ruta relativa en lugar de empaquetarla. La verificación
+recorre todos los assets con el lector de .blend (sin bpy) para encontrar las texturas que
+ya no usa ningún asset, las que faltan y las que están corruptas.
+"""
+import hashlib
+import os
+import tempfile
+
+from .blend_reader import BlendFileError, read_blend_info
+from .library_index import INDEX_DIRNAME
+
+STORE_DIRNAME = "textures"
+HASH_DIGEST_SIZE = 20
+HASH_CHUNK_SIZE = 1 << 20
+
+# Extensión para las imágenes empaquetadas sin ruta, según su formato de archivo
+FORMAT_EXTENSIONS = {
+    'PNG': '.png',
+    'JPEG': '.jpg',
+    'JPEG2000': '.jp2',
+    'TARGA': '.tga',
+    'TARGA_RAW': '.tga',
+    'BMP': '.bmp',
+    'TIFF': '.tif',
+    'OPEN_EXR': '.exr',
+    'OPEN_EXR_MULTILAYER': '.exr',
+    'HDR': '.hdr',
+    'WEBP': '.webp',
+}
+
+_file_hashes = {}
+
+
+def store_path(library_path):
+    return os.path.join(os.path.abspath(library_path), INDEX_DIRNAME, STORE_DIRNAME)
+
+
+def hash_bytes(data):
+    return hashlib.blake2b(data, digest_size=HASH_DIGEST_SIZE).hexdigest()
+
+
+def hash_file(path):
+    """Hash del contenido de un archivo, recordado mientras no cambie su tamaño o mtime"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _file_hashes.get(key)
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        digest = _file_hashes[key] = hasher.hexdigest()
+    return digest
+
+
+def stored_file_path(library_path, digest, extension):
+    return os.path.join(store_path(library_path), digest[:2], digest + extension.lower())
+
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def store_bytes(library_path, data, extension):
+    """Guarda los bytes en el almacén si no estaban ya y devuelve (ruta, si se ha escrito)"""
+    path = stored_file_path(library_path, hash_bytes(data), extension)
+    if os.path.exists(path):
+        return path, False
+    _write_atomic(path, lambda f: f.write(data))
+    return path, True
+
+
+def store_file(library_path, source_path):
+    """Copia el archivo al almacén si no estaba ya y devuelve (ruta, si se ha escrito)"""
+    extension = os.path.splitext(source_path)[1]
+    path = stored_file_path(library_path, hash_file(source_path), extension)
+    if os.path.exists(path):
+        return path, False
+
+    def copy(f):
+        with open(source_path, 'rb') as src:
+            for chunk in iter(lambda: src.read(HASH_CHUNK_SIZE), b''):
+                f.write(chunk)
+
+    _write_atomic(path, copy)
+    return path, True
+
+
+def resolve_blend_path(path, blend_filepath):
+    """Convierte una ruta de Blender (``//`` relativa al .blend) en una ruta absoluta normalizada"""
+    if path.startswith('//'):
+        path = os.path.join(os.path.dirname(blend_filepath), path[2:])
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def iter_asset_files(library_path, extension='.blend'):
+    """Recorre los archivos de asset de la biblioteca, sin entrar en carpetas ocultas"""
+    for root, dirs, files in os.walk(library_path):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if name.endswith(extension):
+                yield os.path.join(root, name)
+
+
+class StoreReport:
+    """Resultado de verificar el almacén de texturas"""
+
+    def __init__(self):
+        self.stored = []
+        self.referenced = set()
+        self.missing = []
+        self.unreferenced = []
+        self.corrupt = []
+        self.unreadable = []
+        self.removed_bytes = 0
+
+    @property
+    def safe_to_collect(self):
+        """Solo se borra si se han podido leer todos los assets"""
+        return not self.unreadable
+
+
+def verify_store(library_path, check_hashes=False):
+    """Cruza las texturas del almacén con las referencias de todos los assets"""
+    report = StoreReport()
+    root = store_path(library_path)
+
+    for asset_path in iter_asset_files(library_path):
+        try:
+            info = read_blend_info(asset_path)
+        except (BlendFileError, OSError) as e:
+            # Un asset corrupto o a medio guardar no detiene la verificación
+            report.unreadable.append((asset_path, str(e)))
+            continue
+        for _, image_path in info.image_paths:
+            if not image_path:
+                continue
+            resolved = resolve_blend_path(image_path, asset_path)
+            if not resolved.startswith(os.path.normcase(root) + os.sep):
+                continue
+            report.referenced.add(resolved)
+            if not os.path.exists(resolved):
+                report.missing.append((asset_path, resolved))
+
+    if os.path.isdir(root):
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                report.stored.append(path)
+                if os.path.normcase(os.path.normpath(path)) not in report.referenced:
+                    report.unreferenced.append(path)
+                elif check_hashes and hash_file(path) != os.path.splitext(name)[0]:
+                    report.corrupt.append(path)
+    return report
+
+
+def collect_garbage(library_path, report=None):
+    """Borra las texturas del almacén que no referencia ningún asset
+
+    Si algún asset no se ha podido leer no se borra nada, porque podría referenciar
+    alguna de las texturas aparentemente huérfanas.
+    """
+    report = report or verify_store(library_path)
+    if not report.safe_to_collect:
+        return report
+    for path in report.unreferenced:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            report.removed_bytes += size
+        except OSError as e:
+            print(f"Asset Manager: no se pudo borrar '{path}': {e}")
+    return report
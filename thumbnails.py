@@ -0,0 +1,184 @@
+"""Miniaturas de los assets.
+
+Las miniaturas se generan sin renderizar: la geometría de los objetos se proyecta en vista
+isométrica y se rasteriza con NumPy (muestreando puntos sobre cada triángulo con z-buffer),
+y el resultado se guarda como PNG en ``<biblioteca>/.asset_manager/thumbnails``. Este módulo
+no usa bpy, así que el rasterizado y la escritura pueden hacerse en hilos de trabajo.
+"""
+import os
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+
+from .library_index import INDEX_DIRNAME
+
+THUMBNAIL_DIRNAME = "thumbnails"
+THUMBNAIL_EXTENSION = ".png"
+THUMBNAIL_SIZE = 128
+SUPERSAMPLE = 2
+MARGIN = 0.06
+# Límite de puntos muestreados por miniatura, para acotar memoria y tiempo
+MAX_SAMPLES = 1_000_000
+DEFAULT_COLOR = (0.7, 0.7, 0.7)
+VIEW_DIRECTION = (1.0, -1.0, 0.8)
+LIGHT_DIRECTION = (0.4, -0.6, 1.0)
+AMBIENT = 0.35
+
+_listings = {}
+
+
+def thumbnail_path(library_path, asset_filepath):
+    """Ruta de la miniatura de un asset, dentro de la carpeta interna de la biblioteca"""
+    relpath = os.path.relpath(os.path.abspath(asset_filepath), os.path.abspath(library_path))
+    return os.path.join(os.path.abspath(library_path), INDEX_DIRNAME, THUMBNAIL_DIRNAME, relpath + THUMBNAIL_EXTENSION)
+
+
+def has_thumbnail(path):
+    """Indica si existe la miniatura, listando cada carpeta de miniaturas una sola vez"""
+    directory, name = os.path.split(path)
+    names = _listings.get(directory)
+    if names is None:
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries}
+        except OSError:
+            names = set()
+        _listings[directory] = names
+    return name in names
+
+
+def forget_listings():
+    """Olvida los listados de miniaturas, por ejemplo al refrescar la biblioteca"""
+    _listings.clear()
+
+
+def remove_thumbnail(path):
+    directory, name = os.path.split(path)
+    _listings.get(directory, set()).discard(name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def triangulate(loops, loop_start):
+    """Triangula en abanico los polígonos dados por sus loops; devuelve índices de vértice (t, 3)"""
+    loops = np.asarray(loops)
+    starts = np.asarray(loop_start, dtype=np.int64)
+    totals = np.diff(np.append(starts, len(loops)))
+    fan = np.maximum(totals - 2, 0)
+    if not fan.sum():
+        return np.empty((0, 3), dtype=np.int64)
+    first = np.repeat(starts, fan)
+    step = np.arange(fan.sum()) - np.repeat(np.cumsum(fan) - fan, fan) + 1
+    return np.stack((loops[first], loops[first + step], loops[first + step + 1]), axis=1)
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float64)
+    return vector / np.linalg.norm(vector)
+
+
+def render(vertices, triangles, colors=None, size=THUMBNAIL_SIZE):
+    """Rasteriza los triángulos en una imagen RGBA (size, size, 4) de uint8
+
+    ``vertices`` son posiciones en el mundo (n, 3), ``triangles`` índices (t, 3) y
+    ``colors`` un color RGB por triángulo (t, 3) en [0, 1].
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    if not len(triangles):
+        return np.zeros((size, size, 4), dtype=np.uint8)
+    canvas_size = size * SUPERSAMPLE
+    canvas = np.zeros((canvas_size * canvas_size, 4), dtype=np.float32)
+    if colors is None:
+        colors = np.broadcast_to(np.asarray(DEFAULT_COLOR, dtype=np.float32), (len(triangles), 3))
+
+    # Base de la cámara ortográfica: x a la derecha, y hacia arriba, profundidad hacia la cámara
+    toward = _unit(VIEW_DIRECTION)
+    right = _unit(np.cross(-toward, (0.0, 0.0, 1.0)))
+    up = np.cross(right, -toward)
+    screen = vertices @ np.stack((right, up, toward), axis=1)
+    low = screen[:, :2].min(axis=0)
+    high = screen[:, :2].max(axis=0)
+    scale = canvas_size * (1.0 - 2.0 * MARGIN) / max(float((high - low).max()), 1e-9)
+    screen[:, :2] = (screen[:, :2] - (low + high) / 2.0) * scale + canvas_size / 2.0
+
+    corners = screen[triangles]
+    edge_a = corners[:, 1] - corners[:, 0]
+    edge_b = corners[:, 2] - corners[:, 0]
+    area = np.abs(edge_a[:, 0] * edge_b[:, 1] - edge_a[:, 1] * edge_b[:, 0]) / 2.0
+
+    world = vertices[triangles]
+    normals = np.cross(world[:, 1] - world[:, 0], world[:, 2] - world[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals /= np.where(lengths > 0, lengths, 1.0)[:, None]
+    shade = AMBIENT + (1.0 - AMBIENT) * np.abs(normals @ _unit(LIGHT_DIRECTION))
+    shaded = np.clip(np.asarray(colors, dtype=np.float32) * shade[:, None].astype(np.float32), 0.0, 1.0)
+
+    # Unos tres puntos por píxel cubierto, con al menos uno por triángulo
+    counts = np.ceil(area * 3.0).astype(np.int64) + 1
+    total = int(counts.sum())
+    if total > MAX_SAMPLES:
+        counts = np.maximum((counts * (MAX_SAMPLES / total)).astype(np.int64), 1)
+        total = int(counts.sum())
+    owner = np.repeat(np.arange(len(triangles)), counts)
+    rng = np.random.default_rng(0)
+    u = rng.random(total)
+    v = rng.random(total)
+    outside = u + v > 1.0
+    u[outside] = 1.0 - u[outside]
+    v[outside] = 1.0 - v[outside]
+    points = corners[owner, 0] + edge_a[owner] * u[:, None] + edge_b[owner] * v[:, None]
+
+    px = np.floor(points[:, 0]).astype(np.int64)
+    py = np.floor(points[:, 1]).astype(np.int64)
+    inside = (px >= 0) & (px < canvas_size) & (py >= 0) & (py < canvas_size)
+    pixel = (canvas_size - 1 - py[inside]) * canvas_size + px[inside]
+    depth = points[inside, 2]
+    owner = owner[inside]
+    # Lo más cercano se escribe lo último y prevalece
+    order = np.argsort(depth, kind='stable')
+    canvas[pixel[order], :3] = shaded[owner[order]] * 255.0
+    canvas[pixel[order], 3] = 255.0
+
+    canvas = canvas.reshape(size, SUPERSAMPLE, size, SUPERSAMPLE, 4).mean(axis=(1, 3))
+    return np.round(canvas).astype(np.uint8)
+
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def write_png(path, pixels):
+    """Escribe una imagen RGBA (h, w, 4) de uint8 como PNG"""
+    height, width, _ = pixels.shape
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(height, -1)
+    data = b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+        _png_chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)),
+        _png_chunk(b'IEND', b''),
+    ))
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _listings.setdefault(directory, set()).add(os.path.basename(path))
+
+
+def generate_thumbnail(path, vertices, triangles, colors=None, size=THUMBNAIL_SIZE):
+    """Rasteriza y guarda la miniatura; devuelve la ruta o None si no hay geometría"""
+    if not len(triangles):
+        return None
+    write_png(path, render(vertices, triangles, colors, size))
+    return path